@@ -1,143 +1,249 @@
 import sqlite3
 import os
+from contextlib import contextmanager
+
+try:
+    from .HL_repository import DatabaseManager, DEFAULT_DB_PATH, INCOME_TYPE_ID, ledger_to_transaction
+except ImportError:
+    from HL_repository import DatabaseManager, DEFAULT_DB_PATH, INCOME_TYPE_ID, ledger_to_transaction
 
 # === DB 경로 고정 ===
+# ledger 테이블은 transactions 로 통합되었다 - 이 모듈은 예전 함수 이름을 그대로 제공하는 호환 계층
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "household_Ledger.db")
+DB_PATH = DEFAULT_DB_PATH
+LEGACY_DB_PATH = os.path.join(BASE_DIR, "household_Ledger.db")
+
+# 모듈 전체가 공유하는 저장소 - import 할 때가 아니라 처음 쓸 때 연다 (_database())
+_db = None
+
+# transactions 를 예전 ledger 행 모양으로 (serialNo, date, section, title, revenue, expense, remark)
+# serialNo 는 legacy_serial_no 참고 - ? = (ledger_id_map 의 source, serialNo 간격)
+LEDGER_VIEW = """
+    SELECT IFNULL(m.serial_no, r.id + ?), r.date, r.type, r.type || '.' || r.category,
+           CASE WHEN r.type = '수입' THEN r.amount ELSE 0 END,
+           CASE WHEN r.type = '수입' THEN 0 ELSE r.amount END,
+           r.remark
+    FROM transaction_rows r
+    LEFT JOIN ledger_id_map m ON m.transaction_id = r.id AND m.source = ?
+"""
+
+
+def to_won(value):
+    """금액 -> 원 단위 정수 (None/빈 문자열은 0, '2,000' 같은 문자열 허용)"""
+    if value is None or value == '':
+        return 0
+    if isinstance(value, str):
+        value = value.replace(',', '').strip()
+    amount = float(value)
+    if amount < 0 or not amount.is_integer():
+        raise ValueError(f"금액은 0 이상 원 단위 정수여야 합니다: {value!r}")
+    return int(amount)
+
+
+def _database():
+    """공유 저장소 (처음 부를 때 열면서 스키마 확인, 예전 ledger DB 는 한 번만 옮긴다)"""
+    global _db
+    if _db is None:
+        _db = DatabaseManager(DB_PATH, LEGACY_DB_PATH)
+    return _db
+
+
+def _legacy_source():
+    return os.path.abspath(LEGACY_DB_PATH)
+
+
+def serial_offset(conn):
+    """예전 ledger 에서 옮긴 가장 큰 serialNo (옮긴 적 없으면 0)
+
+    serialNo 규칙 (selectAll/update/delete 공통):
+    - 예전 ledger 에서 옮긴 거래는 ledger_id_map 의 원래 serialNo 를 그대로 쓴다
+    - 그 밖의 거래는 거래 id + serial_offset - 옮긴 serialNo 와 겹치지 않는다
+    예전 DB 를 옮긴 적 없으면 serialNo = 거래 id 이다.
+    """
+    return conn.execute('SELECT IFNULL(MAX(serial_no), 0) FROM ledger_id_map WHERE source = ?',
+                        (_legacy_source(),)).fetchone()[0]
+
+
+def transaction_id(conn, serial_no):
+    """serialNo -> 거래 id (해당하는 거래가 없으면 None)"""
+    offset = serial_offset(conn)
+    if serial_no > offset:
+        # 옮긴 거래는 예전 serialNo 로만 가리킨다 - id + offset 으로 보이는 번호는 없다
+        trans_id = serial_no - offset
+        mapped = conn.execute('SELECT 1 FROM ledger_id_map WHERE source = ? AND transaction_id = ?',
+                              (_legacy_source(), trans_id)).fetchone()
+        return None if mapped else trans_id
+    row = conn.execute('SELECT transaction_id FROM ledger_id_map WHERE source = ? AND serial_no = ?',
+                       (_legacy_source(), serial_no)).fetchone()
+    return row[0] if row else None
 
 
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    """독립된 새 연결 (호출한 쪽에서 close 할 것, 프로파일링 중이면 이 연결도 기록된다)"""
+    return sqlite3.connect(DB_PATH, factory=_database().engine.factory)
 
 
-def createTable():
-    conn = get_connection()
-    c = conn.cursor()
+def profiler():
+    """공유 저장소의 Profiler (HL_PROFILE 환경 변수로 켰을 때만, 아니면 None)
 
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS ledger (
-            serialNo INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT,
-            section TEXT,
-            title TEXT,
-            revenue INTEGER,
-            expense INTEGER,
-            remark TEXT
-        )
-    """)
+    p = HL_CRUD.profiler()
+    if p:
+        p.dump('profile.json')
+    """
+    return _database().profiler
 
-    conn.commit()
-    c.close()
-    conn.close()
 
+class Session:
+    """하나의 연결/트랜잭션 안에서 CRUD 실행 (session() 으로 생성)"""
 
-# 🔥 프로그램 시작 시 무조건 테이블 생성
-createTable()
+    def __init__(self, conn):
+        self.conn = conn
 
+    @staticmethod
+    def _row(date, section, title, revenue, expense, remark):
+        return ledger_to_transaction(date, section, title,
+                                     to_won(revenue), to_won(expense), remark)
 
-def insertData(date, section, title, revenue, expense, remark):
-    conn = get_connection()
-    c = conn.cursor()
+    def createTable(self):
+        _database().init_database()
 
-    c.execute("""
-        INSERT INTO ledger(date, section, title, revenue, expense, remark)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (date, section, title, revenue, expense, remark))
+    def insertData(self, date, section, title, revenue, expense, remark):
+        _database().insert_transaction(*self._row(date, section, title, revenue, expense, remark))
 
-    conn.commit()
-    c.close()
-    conn.close()
+    def insert(self, data):
+        """tuple 형태의 데이터를 받아서 insertData 호출"""
+        self.insertData(*data)
 
+    def insertManyData(self, tupleData):
+        _database().insert_transactions([self._row(*data) for data in tupleData])
 
-def insert(data):
-    """tuple 형태의 데이터를 받아서 insertData 호출"""
-    insertData(*data)
+    def selectAll(self):
+        """예전 ledger 행 목록 - 첫 열은 예전 serialNo (serial_offset 참고)"""
+        params = (serial_offset(self.conn), _legacy_source())
+        return self.conn.execute(LEDGER_VIEW + " ORDER BY r.id", params).fetchall()
 
+    def update(self, vo):
+        """vo = (date, section, title, revenue, expense, remark, serialNo) - 없는 serialNo 면 아무것도 안 함"""
+        *data, key = vo
+        row = self._row(*data)
+        trans_id = transaction_id(self.conn, key)
+        if trans_id is not None:
+            _database().update_transaction(trans_id, *row)
 
-def insertManyData(tupleData):
-    conn = get_connection()
-    c = conn.cursor()
+    def delete(self, key):
+        """serialNo 로 삭제 - 없는 serialNo 면 아무것도 안 함"""
+        trans_id = transaction_id(self.conn, key)
+        if trans_id is not None:
+            _database().delete_transaction(trans_id)
 
-    c.executemany("""
-        INSERT INTO ledger(date, section, title, revenue, expense, remark)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, tupleData)
+    def selectMonthlySum(self, year_month):
+        result = self.conn.execute("""
+            SELECT IFNULL(SUM(CASE WHEN type_id = ? THEN total END), 0),
+                   IFNULL(SUM(CASE WHEN type_id = ? THEN 0 ELSE total END), 0)
+            FROM monthly_rollup
+            WHERE year_month = ?
+        """, (INCOME_TYPE_ID, INCOME_TYPE_ID, year_month)).fetchone()
 
-    conn.commit()
-    c.close()
-    conn.close()
+        return result  # (revenue_sum, expense_sum)
 
+    def selectMonthList(self):
+        rows = self.conn.execute('''
+            SELECT DISTINCT year_month
+            FROM monthly_rollup
+            ORDER BY 1
+        ''').fetchall()
 
-def selectAll():
-    conn = get_connection()
-    c = conn.cursor()
+        return [row[0] for row in rows]
 
-    c.execute("SELECT * FROM ledger")
-    rows = c.fetchall()
+    def rebuildRollup(self):
+        """월별 집계 테이블을 transactions 로부터 다시 생성"""
+        _database().rebuild_rollup()
 
-    c.close()
-    conn.close()
-    return rows
+    def verifyAmounts(self):
+        """금액 검증 - 정수로 옮기지 못한 행 목록 (비어 있으면 정상)"""
+        return _database().verify_amounts()
 
+    def verifyRollup(self):
+        """월별 집계 검증 - 원본과 다른 월 목록 (비어 있으면 정상)"""
+        return sorted({row[0] for row in _database().verify_rollup()})
 
-def update(vo):
-    conn = get_connection()
-    c = conn.cursor()
 
-    c.execute("""
-        UPDATE ledger
-        SET date = ?, section = ?, title = ?, revenue = ?, expense = ?, remark = ?
-        WHERE serialNo = ?
-    """, vo)
+@contextmanager
+def session():
+    """여러 작업을 하나의 연결, 하나의 트랜잭션으로 묶기
 
-    conn.commit()
-    c.close()
-    conn.close()
+    with HL_CRUD.session() as s:
+        for row in rows:
+            s.insertData(*row)
 
+    블록이 끝날 때 한 번만 commit 하고, 예외가 나면 전부 rollback 한다.
+    블록 안에서 모듈 함수(insertData 등)를 불러도 같은 트랜잭션에 포함된다.
+    """
+    with _database().engine.transaction() as conn:
+        yield Session(conn)
 
-def delete(key):
-    conn = get_connection()
-    c = conn.cursor()
 
-    c.execute("DELETE FROM ledger WHERE serialNo = ?", (key,))
+def close():
+    """공유 연결 정리"""
+    if _db is not None:
+        _db.close()
 
-    conn.commit()
-    c.close()
-    conn.close()
 
+def createTable():
+    with session() as s:
+        s.createTable()
 
-def selectMonthlySum(year_month):
-    conn = get_connection()
-    c = conn.cursor()
 
-    c.execute("""
-        SELECT
-            IFNULL(SUM(revenue), 0),
-            IFNULL(SUM(expense), 0)
-        FROM ledger
-        WHERE substr(date, 1, 7) = ?
-    """, (year_month,))
+def insertData(date, section, title, revenue, expense, remark):
+    with session() as s:
+        s.insertData(date, section, title, revenue, expense, remark)
 
-    result = c.fetchone()
 
-    c.close()
-    conn.close()
+def insert(data):
+    """tuple 형태의 데이터를 받아서 insertData 호출"""
+    insertData(*data)
+
+
+def insertManyData(tupleData):
+    with session() as s:
+        s.insertManyData(tupleData)
+
+
+def selectAll():
+    with session() as s:
+        return s.selectAll()
+
+
+def update(vo):
+    with session() as s:
+        s.update(vo)
+
+
+def delete(key):
+    with session() as s:
+        s.delete(key)
+
+
+def selectMonthlySum(year_month):
+    with session() as s:
+        return s.selectMonthlySum(year_month)  # (revenue_sum, expense_sum)
 
-    return result  # (revenue_sum, expense_sum)
 
 def selectMonthList():
-    conn = get_connection()
-    c = conn.cursor()
+    with session() as s:
+        return s.selectMonthList()
+
+
+def rebuildRollup():
+    with session() as s:
+        s.rebuildRollup()
 
-    c.execute('''
-        SELECT DISTINCT substr(date, 1, 7)
-        FROM ledger
-        ORDER BY 1
-    ''')
 
-    rows = c.fetchall()
+def verifyRollup():
+    with session() as s:
+        return s.verifyRollup()
 
-    c.close()
-    conn.close()
 
-    return [row[0] for row in rows]
+def verifyAmounts():
+    with session() as s:
+        return s.verifyAmounts()
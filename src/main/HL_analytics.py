@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+"""
+대량 거래 분석
+transactions 를 열 단위 배열로 읽어 카테고리 비중, 일별 지출 분위수, 이상 지출일 등을 계산한다.
+NumPy 가 있으면 벡터 연산(bincount/searchsorted)을, 없으면 같은 결과를 내는 순수 파이썬 구현을 쓴다.
+
+열 구성 (날짜순 정렬)
+- days:     1970-01-01 부터의 일 수 (int32)
+- types:    type_id
+- codes:    카테고리 코드 (categories 를 id 순으로 0 부터 번호 매김)
+- amounts:  원 단위 금액 (int64)
+"""
+
+import sys
+import time
+import argparse
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .HL_repository import DatabaseManager, TRANSACTION_TYPES
+except ImportError:
+    from HL_repository import DatabaseManager, TRANSACTION_TYPES
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+BACKENDS = ('numpy', 'python')
+LOAD_BATCH = 65536
+
+# 날짜는 SQLite 에서 바로 일 수로 바꿔 읽는다 (문자열 파싱 없음)
+# 전체 기간은 인덱스를 거치지 않고 테이블을 순서대로 읽은 뒤 정렬하는 쪽이 2배 정도 빠르다
+COLUMNS_QUERY = '''
+    SELECT CAST(julianday(date) - 2440587.5 AS INTEGER), type_id, category_id, amount
+    FROM transactions
+'''
+COLUMNS_RANGE = COLUMNS_QUERY + 'WHERE date >= ? AND date < ? ORDER BY date'
+
+
+def to_day(value):
+    """'YYYY-MM-DD' -> 1970-01-01 부터의 일 수"""
+    return date.fromisoformat(value).toordinal() - EPOCH_ORDINAL
+
+
+def from_day(day):
+    """일 수 -> 'YYYY-MM-DD'"""
+    return date.fromordinal(EPOCH_ORDINAL + int(day)).isoformat()
+
+
+def default_backend():
+    return 'numpy' if np is not None else 'python'
+
+
+def _percentile(sorted_values, q):
+    """선형 보간 분위수 (numpy.percentile 기본 방식과 같음)"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class ColumnStore(ABC):
+    """열 배열 공통 부분 - 기간은 start <= date < end ('YYYY-MM-DD', None 이면 제한 없음)
+
+    저장 방식별 하위 클래스가 _bounds, category_totals, daily_totals 를 구현한다.
+    """
+
+    backend = None
+
+    def __init__(self, days, types, codes, amounts, categories):
+        self.days = days
+        self.types = types
+        self.codes = codes
+        self.amounts = amounts
+        self.categories = categories    # 코드 -> (구분, 카테고리)
+
+    def __len__(self):
+        return len(self.days)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(rows={len(self)}, categories={len(self.categories)})"
+
+    @abstractmethod
+    def _bounds(self, start, end):
+        """기간에 해당하는 행 위치 [lo, hi) - days 가 정렬되어 있으므로 이진 탐색"""
+
+    @abstractmethod
+    def category_totals(self, start=None, end=None, trans_type='지출'):
+        """카테고리별 (카테고리, 합계) - 합계 큰 순"""
+
+    @abstractmethod
+    def daily_totals(self, start=None, end=None, trans_type='지출'):
+        """거래가 있는 날의 [(날짜, 합계)] - 날짜순"""
+
+    def category_shares(self, start=None, end=None, trans_type='지출'):
+        """카테고리별 (카테고리, 합계, 비중 %) - 합계 큰 순"""
+        totals = self.category_totals(start, end, trans_type)
+        grand = sum(total for _, total in totals)
+        return [(category, total, total / grand * 100 if grand else 0.0)
+                for category, total in totals]
+
+    def daily_percentiles(self, percents=(50, 90, 99), start=None, end=None, trans_type='지출'):
+        """거래가 있는 날의 하루 합계 분위수 {percent: 금액}"""
+        totals = sorted(total for _, total in self.daily_totals(start, end, trans_type))
+        return {q: _percentile(totals, q) for q in percents}
+
+    def outlier_days(self, start=None, end=None, trans_type='지출', threshold=3.5):
+        """하루 합계가 중앙값 + threshold * MAD(정규화) 를 넘는 날 [(날짜, 합계)] - 합계 큰 순"""
+        daily = self.daily_totals(start, end, trans_type)
+        if len(daily) < 3:
+            return []
+        totals = sorted(total for _, total in daily)
+        median = _percentile(totals, 50)
+        mad = _percentile(sorted(abs(total - median) for total in totals), 50) * 1.4826
+        if not mad:
+            return []
+        limit = median + threshold * mad
+        return sorted(((day, total) for day, total in daily if total > limit),
+                      key=lambda item: item[1], reverse=True)
+
+
+class PythonColumns(ColumnStore):
+    """NumPy 없이 array 모듈로 저장"""
+
+    backend = 'python'
+
+    def _bounds(self, start, end):
+        lo = 0 if start is None else bisect_left(self.days, to_day(start))
+        hi = len(self.days) if end is None else bisect_left(self.days, to_day(end))
+        return lo, hi
+
+    def _rows(self, start, end, trans_type):
+        lo, hi = self._bounds(start, end)
+        type_id = TRANSACTION_TYPES[trans_type]
+        types = self.types
+        return (i for i in range(lo, hi) if types[i] == type_id)
+
+    def category_totals(self, start=None, end=None, trans_type='지출'):
+        """카테고리별 (카테고리, 합계) - 합계 큰 순"""
+        sums = [0] * len(self.categories)
+        codes, amounts = self.codes, self.amounts
+        for i in self._rows(start, end, trans_type):
+            sums[codes[i]] += amounts[i]
+        return sorted(((self.categories[code][1], total)
+                       for code, total in enumerate(sums) if total),
+                      key=lambda item: item[1], reverse=True)
+
+    def daily_totals(self, start=None, end=None, trans_type='지출'):
+        """거래가 있는 날의 [(날짜, 합계)] - 날짜순"""
+        result = []
+        days, amounts = self.days, self.amounts
+        current, total = None, 0
+        for i in self._rows(start, end, trans_type):
+            if days[i] != current:
+                if current is not None:
+                    result.append((from_day(current), total))
+                current, total = days[i], 0
+            total += amounts[i]
+        if current is not None:
+            result.append((from_day(current), total))
+        return result
+
+
+class NumpyColumns(ColumnStore):
+    """NumPy 배열로 저장 - 집계는 bincount / reduceat 로 한 번에"""
+
+    backend = 'numpy'
+
+    def _bounds(self, start, end):
+        lo = 0 if start is None else int(np.searchsorted(self.days, to_day(start), 'left'))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, to_day(end), 'left'))
+        return lo, hi
+
+    def _mask(self, start, end, trans_type):
+        lo, hi = self._bounds(start, end)
+        window = slice(lo, hi)
+        return window, self.types[window] == TRANSACTION_TYPES[trans_type]
+
+    def category_totals(self, start=None, end=None, trans_type='지출'):
+        """카테고리별 (카테고리, 합계) - 합계 큰 순"""
+        window, mask = self._mask(start, end, trans_type)
+        # bincount 의 가중치 합은 float64 - 2^53 원 미만이면 정확하다
+        sums = np.bincount(self.codes[window][mask],
+                           weights=self.amounts[window][mask],
+                           minlength=len(self.categories)).astype(np.int64)
+        order = np.argsort(-sums, kind='stable')
+        return [(self.categories[code][1], int(sums[code])) for code in order if sums[code]]
+
+    def daily_totals(self, start=None, end=None, trans_type='지출'):
+        """거래가 있는 날의 [(날짜, 합계)] - 날짜순"""
+        window, mask = self._mask(start, end, trans_type)
+        days = self.days[window][mask]
+        if not len(days):
+            return []
+        # days 는 정렬되어 있으므로 날짜가 바뀌는 위치마다 구간 합 (정수 그대로)
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        sums = np.add.reduceat(self.amounts[window][mask], starts)
+        return [(from_day(day), int(total)) for day, total in zip(days[starts], sums)]
+
+
+def load_columns(db, start=None, end=None, backend=None):
+    """transactions 를 열 배열로 읽기 (backend: 'numpy' / 'python', 기본은 가능한 쪽)"""
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 분석 방식: {backend}")
+    if backend == 'numpy' and np is None:
+        raise ValueError("NumPy 가 설치되어 있지 않습니다")
+
+    with db.engine.connection() as conn:
+        categories = conn.execute(
+            'SELECT c.id, ty.name, c.name FROM categories c '
+            'JOIN types ty ON ty.id = c.type_id ORDER BY c.id'
+        ).fetchall()
+        if start is None and end is None:
+            cursor = conn.execute(COLUMNS_QUERY)
+        else:
+            cursor = conn.execute(COLUMNS_RANGE, (start or '0000', end or '9999'))
+
+        code_of = {category_id: code for code, (category_id, _, _) in enumerate(categories)}
+        names = [(trans_type, name) for _, trans_type, name in categories]
+
+        if backend == 'python':
+            days, types, codes, amounts = array('i'), array('b'), array('i'), array('q')
+            while True:
+                batch = cursor.fetchmany(LOAD_BATCH)
+                if not batch:
+                    break
+                for day, type_id, category_id, amount in batch:
+                    days.append(day)
+                    types.append(type_id)
+                    codes.append(code_of[category_id])
+                    amounts.append(amount)
+            if any(days[i] < days[i - 1] for i in range(1, len(days))):
+                order = sorted(range(len(days)), key=days.__getitem__)
+                days, types, codes, amounts = (array(column.typecode, (column[i] for i in order))
+                                               for column in (days, types, codes, amounts))
+            return PythonColumns(days, types, codes, amounts, names)
+
+        chunks = []
+        while True:
+            batch = cursor.fetchmany(LOAD_BATCH)
+            if not batch:
+                break
+            chunks.append(np.array(batch, dtype=np.int64).reshape(-1, 4))
+
+    table = np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int64)
+    if np.any(table[1:, 0] < table[:-1, 0]):
+        table = table[np.argsort(table[:, 0], kind='stable')]
+    lookup = np.zeros(max(code_of, default=0) + 1, dtype=np.int32)
+    for category_id, code in code_of.items():
+        lookup[category_id] = code
+
+    return NumpyColumns(table[:, 0].astype(np.int32),
+                        table[:, 1].astype(np.int8),
+                        lookup[table[:, 2]],
+                        table[:, 3].copy(),
+                        names)
+
+
+def main(argv=None):
+    """명령행 실행"""
+    parser = argparse.ArgumentParser(description="거래 내역 분석")
+    parser.add_argument('--start', help="시작일 포함 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="종료일 미포함 (YYYY-MM-DD)")
+    parser.add_argument('--type', default='지출', choices=list(TRANSACTION_TYPES))
+    parser.add_argument('--backend', choices=BACKENDS, help="기본: NumPy 가 있으면 numpy")
+    parser.add_argument('--top', type=int, default=10, help="이상 지출일 표시 개수")
+    parser.add_argument('--db', help="DB 파일 경로 (기본: ~/household_account.db)")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    try:
+        started = time.perf_counter()
+        columns = load_columns(db, args.start, args.end, args.backend)
+        loaded = time.perf_counter()
+
+        shares = columns.category_shares(trans_type=args.type)
+        percentiles = columns.daily_percentiles(trans_type=args.type)
+        outliers = columns.outlier_days(trans_type=args.type)
+        finished = time.perf_counter()
+    finally:
+        db.close()
+
+    print(f"{columns.backend}: {len(columns):,}건 읽기 {loaded - started:.2f}초, "
+          f"분석 {finished - loaded:.2f}초")
+    print(f"\n[카테고리별 {args.type}]")
+    for category, total, share in shares:
+        print(f"  {category:<8} ₩{total:>15,} {share:6.1f}%")
+    print(f"\n[하루 {args.type} 분위수]")
+    for q, value in percentiles.items():
+        print(f"  {q:>3}%  " + ("-" if value is None else f"₩{value:,.0f}"))
+    print(f"\n[이상 {args.type}일] {len(outliers):,}일")
+    for day, total in outliers[:args.top]:
+        print(f"  {day}  ₩{total:,}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
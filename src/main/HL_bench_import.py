@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+CSV 가져오기 벤치마크
+같은 시드로 항상 같은 거래 CSV 를 만들고, 빈 임시 DB 에 가져와 초당 건수를 잰다.
+
+    python HL_bench_import.py                 # 30만 건, 일괄 모드
+    python HL_bench_import.py --rows 100000 --per-row
+    python HL_bench_import.py --csv sample.csv --keep   # 만든 CSV 를 남김
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+try:
+    from .HL_repository import DatabaseManager
+    from .HL_import import import_csv, read_lines, validate_chunk, iter_chunks, ImportResult
+except ImportError:
+    from HL_repository import DatabaseManager
+    from HL_import import import_csv, read_lines, validate_chunk, iter_chunks, ImportResult
+
+
+SEED = 20240501
+CATEGORIES = {
+    '수입': ('급여', '용돈', '이자', '기타'),
+    '지출': ('식비', '교통', '쇼핑', '주거', '통신', '의료', '문화', '교육', '경조사', '기타'),
+}
+REMARKS = ('점심', '저녁', '커피', '쿠팡', '마트', '버스', '지하철', '택시', '관리비', '월세',
+           '휴대폰', '병원', '약국', '영화', '책', '학원', '축의금', '편의점', '배달', '')
+
+
+def write_sample(path, rows, seed=SEED):
+    """rows 건의 거래 CSV (날짜,구분,카테고리,금액,비고) - 같은 seed 면 같은 파일"""
+    rng = random.Random(seed)
+    first = date(2021, 1, 1).toordinal()
+    days = 365 * 3
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('date,type,category,amount,remark\n')
+        for _ in range(rows):
+            trans_type = '수입' if rng.random() < 0.08 else '지출'
+            day = date.fromordinal(first + rng.randrange(days)).isoformat()
+            category = rng.choice(CATEGORIES[trans_type])
+            amount = rng.randrange(1, 500) * 100
+            remark = f"{rng.choice(REMARKS)} {rng.randrange(1000)}"
+            f.write(f"{day},{trans_type},{category},{amount},{remark}\n")
+
+
+def measure_parse(path, batch_size=50000):
+    """검증만 (DB 없이) - 초당 건수"""
+    started = time.perf_counter()
+    result = ImportResult(path)
+    count = 0
+    for chunk in iter_chunks(read_lines(path), batch_size):
+        count += len(validate_chunk(chunk, None, result))
+    return count / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    """명령행 실행"""
+    parser = argparse.ArgumentParser(description="CSV 가져오기 벤치마크")
+    parser.add_argument('--rows', type=int, default=300000)
+    parser.add_argument('--csv', help="샘플 CSV 경로 (기본: 임시 파일)")
+    parser.add_argument('--keep', action='store_true', help="샘플 CSV 와 DB 를 지우지 않음")
+    parser.add_argument('--per-row', action='store_true', help="일괄 모드 대신 행 단위 트리거로 가져오기")
+    parser.add_argument('--batch-size', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='hl_bench_')
+    csv_path = args.csv or os.path.join(workdir, 'sample.csv')
+    db_path = os.path.join(workdir, 'bench.db')
+    if not os.path.exists(csv_path):
+        write_sample(csv_path, args.rows)
+
+    print(f"샘플: {csv_path} ({os.path.getsize(csv_path) / 1e6:.1f} MB)")
+    print(f"검증만:   {measure_parse(csv_path, args.batch_size):>10,.0f}건/초")
+
+    db = DatabaseManager(db_path)
+    try:
+        started = time.perf_counter()
+        result = import_csv(db, csv_path, batch_size=args.batch_size, bulk=not args.per_row)
+        elapsed = time.perf_counter() - started
+        mismatches = db.verify_rollup()
+    finally:
+        db.close()
+
+    mode = '행 단위' if args.per_row else '일괄'
+    print(f"가져오기({mode}): {result.imported / elapsed:>10,.0f}건/초 "
+          f"({result.imported:,}건, {elapsed:.2f}초, 월별 집계 불일치 {len(mismatches)}건)")
+
+    if not args.keep:
+        for path in (db_path, db_path + '-wal', db_path + '-shm', csv_path):
+            if path != args.csv and os.path.exists(path):
+                os.remove(path)
+        if not os.listdir(workdir):
+            os.rmdir(workdir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+"""
+월 예산
+지출 카테고리별 월 예산을 budgets 테이블에 두고, 메모리의 {카테고리: 예산} 사전으로 확인한다.
+월별 누적 지출은 그 달을 처음 볼 때 월별 집계에서 한 번 읽고,
+이후 거래를 추가할 때는 해당 카테고리 합계에 더하기만 한다 (거래 한 건당 O(1)).
+
+budgets.csv 형식:  지출.카테고리,금액   (예: 지출.식대,10000.0)
+기본 budgets.csv 는 처음 한 번만 가져온다 (import_checkpoints 에 기록) - 지운 예산은 다시 생기지 않는다.
+"""
+
+import os
+import csv
+from collections import namedtuple
+
+try:
+    from .HL_import import parse_amount, split_category, get_checkpoint, save_checkpoint
+except ImportError:
+    from HL_import import parse_amount, split_category, get_checkpoint, save_checkpoint
+
+
+BUDGETS_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "budgets.csv")
+
+# 예전 budgets.csv 에 쓰던 이름 -> 기본 지출 카테고리 (그 이름의 카테고리가 없을 때만)
+CATEGORY_ALIASES = {
+    '식대': '식비',
+    '교통': '교통비',
+    '통신': '통신비',
+}
+
+
+class BudgetStatus(namedtuple('BudgetStatus', 'category budget spent')):
+    """카테고리 하나의 예산 사용 현황"""
+
+    __slots__ = ()
+
+    @property
+    def remaining(self):
+        return self.budget - self.spent
+
+    @property
+    def ratio(self):
+        if not self.budget:
+            return float('inf') if self.spent else 0.0
+        return self.spent / self.budget
+
+    @property
+    def over(self):
+        return self.spent > self.budget
+
+
+def read_budgets_csv(path, encoding='utf-8-sig'):
+    """budgets.csv -> [(지출 카테고리, 금액)], 잘못된 줄은 ValueError (줄 번호 포함)"""
+    budgets = []
+    with open(path, newline='', encoding=encoding) as f:
+        for line_no, fields in enumerate(csv.reader(f), start=1):
+            fields = [field.strip() for field in fields]
+            if not any(fields):
+                continue
+            try:
+                if len(fields) < 2:
+                    raise ValueError("열 개수 부족")
+                trans_type, _, category = fields[0].partition('.')
+                if trans_type != '지출':
+                    raise ValueError(f"예산은 지출 카테고리만 가능합니다: {fields[0]!r}")
+                category = split_category(trans_type, category)
+                if not category:
+                    raise ValueError("카테고리 없음")
+                budgets.append((category, parse_amount(fields[1])))
+            except ValueError as e:
+                raise ValueError(f"{path} {line_no}번째 줄: {e}") from None
+    return budgets
+
+
+def resolve_categories(db, budgets):
+    """예산 카테고리를 있는 지출 카테고리로 맞추기 (CATEGORY_ALIASES), 없는 카테고리는 ValueError"""
+    existing = set(db.get_categories('지출'))
+    resolved = []
+    unknown = []
+    for category, amount in budgets:
+        if category not in existing:
+            category = CATEGORY_ALIASES.get(category, category)
+        if category in existing:
+            resolved.append((category, amount))
+        else:
+            unknown.append(category)
+    if unknown:
+        raise ValueError(f"없는 지출 카테고리: {', '.join(unknown)} (카테고리를 먼저 추가하세요)")
+    return resolved
+
+
+def import_budgets_csv(db, path):
+    """budgets.csv 를 budgets 테이블에 저장 - 저장한 예산 수"""
+    budgets = resolve_categories(db, read_budgets_csv(path))
+    db.set_budgets(budgets)
+    return len(budgets)
+
+
+def seed_budgets_csv(db, path):
+    """기본 예산 CSV 를 DB 마다 한 번만 가져오기 - 가져온 예산 수
+
+    이미 가져왔거나 (import_checkpoints 의 done) DB 에 예산이 있으면 가져오지 않고 기록만 한다.
+    가져오다 실패하면 기록하지 않으므로 CSV 를 고친 뒤 다음 실행에서 다시 시도한다.
+    """
+    source = os.path.abspath(path)
+    if get_checkpoint(db, source)[1] or not os.path.exists(path):
+        return 0
+
+    with db.engine.transaction() as conn:
+        count = 0 if db.get_budgets() else import_budgets_csv(db, path)
+        save_checkpoint(conn, source, 0, count, done=True)
+    return count
+
+
+class BudgetTracker:
+    """월 예산 대비 지출 추적
+
+    budgets: {지출 카테고리: 월 예산}
+    거래 추가는 record(), 수정/삭제/대량 추가 뒤에는 forget() 으로 월 합계를 다시 읽게 한다.
+    """
+
+    WARN_RATIO = 0.8    # 이 비율 이상 쓰면 주의
+
+    def __init__(self, db):
+        self.db = db
+        self.budgets = {}
+        self._spent = {}    # 'YYYY-MM' -> {카테고리: 누적 지출}
+
+    def load(self, csv_path=None):
+        """DB 의 예산 읽기 (csv_path 를 아직 가져온 적 없으면 먼저 가져온다 - seed_budgets_csv)"""
+        if csv_path:
+            seed_budgets_csv(self.db, csv_path)
+        self.budgets = dict(self.db.get_budgets())
+        return self.budgets
+
+    def set_budget(self, category, amount):
+        self.db.set_budgets([(category, amount)])
+        self.budgets[category] = amount
+
+    def remove_budget(self, category):
+        self.db.delete_budget(category)
+        self.budgets.pop(category, None)
+
+    def observe(self, year_month, overview):
+        """이미 조회한 월 집계(MonthlyOverview)로 그 달 합계 채우기"""
+        self._spent[year_month] = dict(overview.categories)
+
+    def forget(self, year_month=None):
+        """월 합계 버리기 (None 이면 전부) - 다음에 볼 때 DB 에서 다시 읽는다"""
+        if year_month is None:
+            self._spent.clear()
+        else:
+            self._spent.pop(year_month, None)
+
+    def _month(self, year_month):
+        spent = self._spent.get(year_month)
+        if spent is None:
+            spent = self._spent[year_month] = dict(self.db.get_month_overview(year_month).categories)
+        return spent
+
+    def record(self, date, trans_type, category, amount):
+        """저장된 거래 한 건 반영 - 예산이 있는 카테고리면 BudgetStatus, 아니면 None"""
+        if trans_type != '지출':
+            return None
+
+        year_month = date[:7]
+        spent = self._spent.get(year_month)
+        if spent is not None:
+            spent[category] = spent.get(category, 0) + amount
+
+        budget = self.budgets.get(category)
+        if budget is None:
+            return None
+        # 처음 보는 달이면 방금 저장한 거래까지 포함된 합계를 읽는다
+        return BudgetStatus(category, budget, self._month(year_month).get(category, 0))
+
+    def status(self, year_month):
+        """예산이 있는 카테고리별 현황 - 사용 비율 큰 순"""
+        spent = self._month(year_month)
+        return sorted((BudgetStatus(category, budget, spent.get(category, 0))
+                       for category, budget in self.budgets.items()),
+                      key=lambda status: status.ratio, reverse=True)
+
+    def overspent(self, year_month):
+        """예산을 넘긴 카테고리 현황"""
+        return [status for status in self.status(year_month) if status.over]
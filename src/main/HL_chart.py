@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tk 캔버스 차트
+하나의 tk.Canvas 에 그리고, 다시 그릴 때는 기존 캔버스 항목을 재사용(coords/itemconfigure)한다.
+- CategoryBarChart: 카테고리별 가로 막대 (화면에 안 들어가는 작은 항목은 '그 외' 로 묶음)
+- SeriesChart:      긴 시계열 꺾은선 (픽셀 폭에 맞춰 구간별 최소/최대만 남겨 그림)
+축 범위는 데이터에 맞춰 보기 좋은 눈금(1, 2, 2.5, 5 x 10^n)으로 자동 조정된다.
+"""
+
+import math
+import tkinter as tk
+
+
+FONT = ('맑은 고딕', 9)
+TEXT_COLOR = "#212529"
+AXIS_COLOR = "#adb5bd"
+GRID_COLOR = "#f0f2f5"
+BAR_COLOR = "#dc3545"
+SERIES_COLORS = ("#28a745", "#dc3545", "#2980b9", "#6c757d", "#f39c12", "#8e44ad")
+
+
+def nice_step(span, max_ticks=5):
+    """span 을 max_ticks 개 이하로 나누는 보기 좋은 눈금 간격"""
+    if span <= 0:
+        return 1
+    raw = span / max_ticks
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 2.5, 5, 10):
+        if multiple * magnitude >= raw:
+            return multiple * magnitude
+    return 10 * magnitude
+
+
+def nice_scale(low, high, max_ticks=5):
+    """[low, high] 를 감싸는 (축 최소, 축 최대, 눈금 간격) - 0 은 항상 포함"""
+    low, high = min(low, 0), max(high, 0)
+    step = nice_step(high - low, max_ticks)
+    low = math.floor(low / step) * step
+    high = math.ceil(high / step) * step
+    if high == low:
+        high = low + step
+    return low, high, step
+
+
+def ticks(low, high, step):
+    """눈금 값 목록"""
+    count = int(round((high - low) / step))
+    return [low + step * i for i in range(count + 1)]
+
+
+def format_won(value):
+    """축/막대 레이블용 짧은 금액 (억/만 단위)"""
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    if value >= 100_000_000:
+        return f"{sign}{value / 100_000_000:,.1f}억".replace(".0억", "억")
+    if value >= 10_000:
+        return f"{sign}{value / 10_000:,.1f}만".replace(".0만", "만")
+    return f"{sign}{value:,.0f}"
+
+
+def decimate(values, buckets):
+    """긴 시계열을 buckets 개 구간으로 나눠 구간마다 최소/최대 점만 남기기 - [(위치, 값)]
+
+    값이 2 * buckets 개 이하이면 그대로 돌려준다. 봉우리와 골짜기는 그대로 남는다.
+    """
+    count = len(values)
+    if count <= 2 * buckets or buckets < 1:
+        return list(enumerate(values))
+
+    points = []
+    for bucket in range(buckets):
+        start = bucket * count // buckets
+        end = (bucket + 1) * count // buckets
+        if start >= end:
+            continue
+        window = values[start:end]
+        low = min(range(len(window)), key=window.__getitem__)
+        high = max(range(len(window)), key=window.__getitem__)
+        for offset in sorted({low, high}):
+            points.append((start + offset, window[offset]))
+    return points
+
+
+def bin_items(items, max_items, other_label="그 외"):
+    """(레이블, 값) 을 값 큰 순으로 max_items 개까지, 나머지는 하나로 합치기"""
+    items = sorted(items, key=lambda item: item[1], reverse=True)
+    if len(items) <= max_items:
+        return items
+    keep = max(max_items - 1, 0)
+    rest = items[keep:]
+    return items[:keep] + [(f"{other_label} {len(rest)}개", sum(value for _, value in rest))]
+
+
+class ItemPool:
+    """같은 종류의 캔버스 항목 재사용
+
+    begin() 후 take() 로 필요한 만큼 꺼내 쓰고 end() 를 부르면 남은 항목은 숨긴다.
+    """
+
+    def __init__(self, canvas, kind, **defaults):
+        self.canvas = canvas
+        self.kind = kind
+        self.defaults = defaults
+        self.items = []
+        self.used = 0
+
+    def begin(self):
+        self.used = 0
+
+    def take(self, *coords, **options):
+        if self.used < len(self.items):
+            item = self.items[self.used]
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfigure(item, state='normal', **options)
+        else:
+            create = getattr(self.canvas, 'create_' + self.kind)
+            item = create(*coords, **dict(self.defaults, **options))
+            self.items.append(item)
+        self.used += 1
+        return item
+
+    def end(self):
+        for item in self.items[self.used:]:
+            self.canvas.itemconfigure(item, state='hidden')
+
+
+class Chart(tk.Canvas):
+    """차트 공통 - 크기가 바뀌거나 데이터가 바뀌면 유휴 시간에 한 번만 다시 그림"""
+
+    def __init__(self, parent, **options):
+        options.setdefault('bg', 'white')
+        options.setdefault('highlightthickness', 0)
+        super().__init__(parent, **options)
+        self._pools = []
+        self._redraw_pending = None
+        self.bind('<Configure>', lambda event: self.schedule_redraw())
+
+    def pool(self, kind, **defaults):
+        pool = ItemPool(self, kind, **defaults)
+        self._pools.append(pool)
+        return pool
+
+    def schedule_redraw(self):
+        if self._redraw_pending is None:
+            self._redraw_pending = self.after_idle(self.redraw)
+
+    def redraw(self):
+        self._redraw_pending = None
+        width, height = self.winfo_width(), self.winfo_height()
+        if width < 2 or height < 2:
+            return
+        for pool in self._pools:
+            pool.begin()
+        self.draw(width, height)
+        for pool in self._pools:
+            pool.end()
+
+    def draw(self, width, height):
+        """width x height 영역 그리기 - 하위 클래스에서 재정의 (기본: 빈 차트, 풀의 항목은 모두 숨김)"""
+
+
+class CategoryBarChart(Chart):
+    """카테고리별 가로 막대 - set_data([(카테고리, 금액)])"""
+
+    ROW_HEIGHT = 24
+    LABEL_WIDTH = 90
+    VALUE_WIDTH = 120
+    AXIS_HEIGHT = 20
+
+    def __init__(self, parent, color=BAR_COLOR, **options):
+        super().__init__(parent, **options)
+        self.color = color
+        self.items = []
+        self.total = 0
+        self._grid = self.pool('line', fill=GRID_COLOR)
+        self._bars = self.pool('rectangle', outline='')
+        self._texts = self.pool('text', font=FONT, fill=TEXT_COLOR)
+
+    def set_data(self, items, total=None):
+        """items: [(레이블, 값)], total: 비율 기준 (기본: 값 합계)"""
+        self.items = list(items)
+        self.total = sum(value for _, value in self.items) if total is None else total
+        self.schedule_redraw()
+
+    def draw(self, width, height):
+        rows = max((height - self.AXIS_HEIGHT) // self.ROW_HEIGHT, 1)
+        items = bin_items(self.items, rows)
+        if not items:
+            self._texts.take(width / 2, height / 2, text="데이터 없음", anchor='center',
+                             fill=TEXT_COLOR)
+            return
+
+        left = self.LABEL_WIDTH
+        right = max(width - self.VALUE_WIDTH, left + 10)
+        low, high, step = nice_scale(min(value for _, value in items),
+                                     max(value for _, value in items), max_ticks=4)
+        scale = (right - left) / (high - low)
+        zero = left + (0 - low) * scale
+        bottom = len(items) * self.ROW_HEIGHT
+
+        # 눈금
+        for tick in ticks(low, high, step):
+            x = left + (tick - low) * scale
+            self._grid.take(x, 0, x, bottom)
+            self._texts.take(x, bottom + 4, text=format_won(tick), anchor='n', fill=AXIS_COLOR)
+
+        # 막대
+        for row, (label, value) in enumerate(items):
+            top = row * self.ROW_HEIGHT + 4
+            middle = top + (self.ROW_HEIGHT - 8) / 2
+            x = zero + value * scale
+            self._bars.take(min(zero, x), top, max(zero, x), top + self.ROW_HEIGHT - 8,
+                            fill=self.color)
+            self._texts.take(left - 6, middle, text=label, anchor='e', fill=TEXT_COLOR)
+            percent = value / self.total * 100 if self.total else 0
+            self._texts.take(right + 6, middle, text=f"₩{value:,.0f} ({percent:.1f}%)",
+                             anchor='w', fill=TEXT_COLOR)
+
+
+class SeriesChart(Chart):
+    """꺾은선 - set_data(x 레이블 목록, [(이름, 값 목록)])
+
+    점이 많으면 폭 2픽셀마다 한 구간으로 묶어 구간별 최소/최대만 그린다.
+    선 하나는 캔버스 항목 하나(create_line 한 번)이다.
+    """
+
+    MARGIN_LEFT = 60
+    MARGIN_RIGHT = 15
+    MARGIN_TOP = 25
+    MARGIN_BOTTOM = 25
+    MAX_X_LABELS = 8
+
+    def __init__(self, parent, colors=SERIES_COLORS, **options):
+        super().__init__(parent, **options)
+        self.colors = colors
+        self.labels = []
+        self.series = []
+        self._grid = self.pool('line', fill=GRID_COLOR)
+        self._lines = self.pool('line', width=2)
+        self._texts = self.pool('text', font=FONT, fill=TEXT_COLOR)
+        self._keys = self.pool('rectangle', outline='')
+
+    def set_data(self, labels, series):
+        self.labels = list(labels)
+        self.series = [(name, list(values)) for name, values in series]
+        self.schedule_redraw()
+
+    def draw(self, width, height):
+        values = [value for _, series in self.series for value in series]
+        if not values or not self.labels:
+            self._texts.take(width / 2, height / 2, text="데이터 없음", anchor='center',
+                             fill=TEXT_COLOR)
+            return
+
+        left, right = self.MARGIN_LEFT, max(width - self.MARGIN_RIGHT, self.MARGIN_LEFT + 10)
+        top, bottom = self.MARGIN_TOP, max(height - self.MARGIN_BOTTOM, self.MARGIN_TOP + 10)
+        low, high, step = nice_scale(min(values), max(values))
+        y_scale = (bottom - top) / (high - low)
+        count = len(self.labels)
+        x_scale = (right - left) / max(count - 1, 1)
+
+        # y 눈금
+        for tick in ticks(low, high, step):
+            y = bottom - (tick - low) * y_scale
+            self._grid.take(left, y, right, y, fill=AXIS_COLOR if tick == 0 else GRID_COLOR)
+            self._texts.take(left - 6, y, text=format_won(tick), anchor='e', fill=AXIS_COLOR)
+
+        # x 레이블 (최대 MAX_X_LABELS 개)
+        every = max(math.ceil(count / self.MAX_X_LABELS), 1)
+        for index in range(0, count, every):
+            self._texts.take(left + index * x_scale, bottom + 4, text=self.labels[index],
+                             anchor='n', fill=AXIS_COLOR)
+
+        # 선 + 범례
+        buckets = max(int(right - left) // 2, 1)
+        legend_x = left
+        for number, (name, series) in enumerate(self.series):
+            color = self.colors[number % len(self.colors)]
+            coords = []
+            for index, value in decimate(series, buckets):
+                coords.append(left + index * x_scale)
+                coords.append(bottom - (value - low) * y_scale)
+            if len(coords) == 2:
+                coords += coords
+            if coords:
+                self._lines.take(*coords, fill=color)
+
+            self._keys.take(legend_x, 8, legend_x + 10, 18, fill=color)
+            self._texts.take(legend_x + 14, 13, text=name, anchor='w', fill=TEXT_COLOR)
+            legend_x += 30 + 13 * len(name)
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQLite 연결 관리
+연결을 매번 새로 열지 않고 풀에 보관해 재사용한다.
+"""
+
+import sys
+import time
+import sqlite3
+import threading
+import queue
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+# 연결마다 한 번만 적용되는 성능 PRAGMA
+DEFAULT_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -16000),       # 약 16MB 페이지 캐시
+    ('mmap_size', 268435456),     # 256MB 메모리 맵
+    ('temp_store', 'MEMORY'),
+    ('foreign_keys', 'ON'),
+)
+
+
+class ConnectionManager:
+    """SQLite 연결 풀
+
+    - 연결은 한 번 열면 close() 전까지 유지된다.
+    - 같은 스레드에서 중첩 호출하면 같은 연결을 그대로 돌려준다.
+    - sqlite3 의 문장 캐시(cached_statements)로 준비된 쿼리를 재사용한다.
+    - factory 로 sqlite3.Connection 하위 클래스를 넘기면 그 클래스로 연결을 연다 (프로파일링 등).
+    """
+
+    def __init__(self, db_path, pool_size=4, cached_statements=256,
+                 timeout=10.0, pragmas=DEFAULT_PRAGMAS, factory=sqlite3.Connection):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self.pragmas = pragmas
+        self.factory = factory
+
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def _open(self):
+        """새 연결을 열고 PRAGMA 적용"""
+        conn = sqlite3.connect(self.db_path,
+                               timeout=self.timeout,
+                               check_same_thread=False,
+                               cached_statements=self.cached_statements,
+                               factory=self.factory)
+        for name, value in self.pragmas:
+            conn.execute(f'PRAGMA {name}={value}')
+        return conn
+
+    def _acquire(self):
+        """풀에서 연결 하나 꺼내기 (없으면 새로 열거나 대기)"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("ConnectionManager is closed")
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.pool_size:
+                conn = self._open()
+                self._all.append(conn)
+                return conn
+
+        return self._idle.get(timeout=self.timeout)
+
+    def _release(self, conn):
+        """연결을 풀에 반납"""
+        if self._closed:
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """연결 빌리기 (같은 스레드에서는 중첩 사용 가능)"""
+        local = self._local
+        if getattr(local, 'conn', None) is not None:
+            yield local.conn
+            return
+
+        conn = self._acquire()
+        local.conn = conn
+        local.tx_depth = 0
+        local.after = []
+        try:
+            yield conn
+        finally:
+            local.conn = None
+            if conn.in_transaction:
+                # 트랜잭션 밖에서 남긴 변경은 반영하지 않는다
+                conn.rollback()
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """트랜잭션 (가장 바깥쪽 블록에서만 commit/rollback)"""
+        with self.connection() as conn:
+            local = self._local
+            if local.tx_depth:
+                local.tx_depth += 1
+                try:
+                    yield conn
+                finally:
+                    local.tx_depth -= 1
+                return
+
+            local.tx_depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                local.tx_depth = 0
+                callbacks, local.after = local.after, []
+                for callback in callbacks:
+                    callback()
+
+    def transaction_depth(self):
+        """현재 스레드의 트랜잭션 중첩 깊이 (트랜잭션 밖이면 0)"""
+        local = self._local
+        if getattr(local, 'conn', None) is None:
+            return 0
+        return local.tx_depth
+
+    def call_after_transaction(self, func):
+        """현재 스레드의 가장 바깥 트랜잭션이 끝나면(commit/rollback) func 실행
+
+        트랜잭션 밖에서 부르면 바로 실행한다.
+        """
+        if not self.transaction_depth():
+            func()
+            return
+        self._local.after.append(func)
+
+    def execute(self, sql, params=()):
+        """조회 쿼리 실행 후 전체 결과 반환"""
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self):
+        """모든 연결 닫기"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            conns, self._all = self._all, []
+
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+def estimate_size(value):
+    """조회 결과의 대략적인 메모리 크기 (바이트, 컨테이너는 내용까지 합산)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return size
+
+
+class QueryCache:
+    """조회 결과 LRU 캐시
+
+    항목마다 결과가 의존하는 태그(월 'YYYY-MM' 집합)를 기록해 두고
+    invalidate(tags) 가 오면 태그가 겹치는 항목만 버린다.
+    태그가 None 인 항목과 invalidate(None) 은 '전체'를 뜻한다.
+    결과 크기 추정치 합계가 max_bytes 를 넘으면 오래 안 쓴 항목부터 버린다 (0 이면 캐시 안 함).
+    캐시한 결과는 여러 호출자가 공유하므로 읽기 전용으로 다룬다.
+    """
+
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()   # key -> (value, size, tags)
+        self._bytes = 0
+        self._generation = 0            # invalidate 할 때마다 증가
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key, compute, tags=None):
+        """key 의 캐시된 결과, 없으면 compute() 결과를 캐시하고 반환"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        value = compute()
+        size = estimate_size(value)
+
+        with self._lock:
+            # 계산하는 동안 쓰기가 있었으면 이미 낡은 결과일 수 있다
+            if generation != self._generation or size > self.max_bytes:
+                return value
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, None if tags is None else frozenset(tags))
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def invalidate(self, tags=None):
+        """tags 와 겹치는 항목 버리기 (None 이면 전부)"""
+        with self._lock:
+            self._generation += 1
+            if tags is None:
+                stale = list(self._entries)
+            else:
+                tags = frozenset(tags)
+                stale = [key for key, (_, _, entry_tags) in self._entries.items()
+                         if entry_tags is None or entry_tags & tags]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """모든 항목과 통계 초기화"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        """적중/실패 횟수와 사용량"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+def month_range(year_month):
+    """'YYYY-MM' -> 인덱스를 탈 수 있는 날짜 범위 (start <= date < end)"""
+    year, month = (int(part) for part in year_month.split('-')[:2])
+    if month == 12:
+        next_year, next_month = year + 1, 1
+    else:
+        next_year, next_month = year, month + 1
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+
+def get_schema_version(conn):
+    """PRAGMA user_version 에 기록된 스키마 버전"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, migrations):
+    """아직 적용되지 않은 마이그레이션을 순서대로 적용
+
+    migrations 의 각 항목은 SQL 문 tuple 이거나 conn 을 받는 함수이다.
+    n 번째 항목까지 적용되면 user_version 이 n 이 된다.
+    트랜잭션 안에서 실행하므로 commit/rollback 은 호출한 쪽에서 한다 (engine.transaction()).
+    """
+    if not conn.in_transaction:
+        # sqlite3 는 DDL 앞에서 트랜잭션을 자동으로 시작하지 않는다 - 스키마 변경과 user_version 을 함께 반영
+        conn.execute('BEGIN IMMEDIATE')
+    current = get_schema_version(conn)
+    for version, step in enumerate(migrations[current:], start=current + 1):
+        if callable(step):
+            step(conn)
+        else:
+            for sql in step:
+                conn.execute(sql)
+        conn.execute(f'PRAGMA user_version = {version}')
+    return get_schema_version(conn)
+
+
+def explain(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN 의 detail 목록"""
+    rows = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def find_full_scans(conn, sql, params=()):
+    """인덱스 검색 없이 테이블/인덱스 전체를 훑는 단계만 골라내기
+
+    FTS 같은 가상 테이블 검색과 이미 걸러진 서브쿼리 결과를 훑는 단계는 제외한다.
+    """
+    details = explain(conn, sql, params)
+    subqueries = {detail.split()[-1] for detail in details
+                  if detail.startswith(('MATERIALIZE ', 'CO-ROUTINE '))}
+    return [detail for detail in details
+            if detail.startswith('SCAN ')
+            and 'CONSTANT ROW' not in detail
+            and 'VIRTUAL TABLE' not in detail
+            and detail.split()[1] not in subqueries]
+
+
+class QueryWorker:
+    """백그라운드 조회 스레드
+
+    작업 스레드는 풀에서 연결 하나를 빌려 종료할 때까지 혼자 쓴다.
+    결과는 results 큐에 쌓이고, UI 스레드가 poll() 로 꺼내 콜백을 실행한다.
+    같은 channel 로 새 작업을 넣으면 이전 작업은 낡은 것으로 보고
+    실행하지 않거나 결과를 버린다.
+    profiler 가 있으면 작업 실행(job.<channel>)과 콜백(callback.<channel>) 시간을 기록한다.
+    """
+
+    def __init__(self, engine, profiler=None):
+        self.engine = engine
+        self.profiler = profiler
+        self.results = queue.Queue()
+
+        self._jobs = queue.Queue()
+        self._latest = {}       # channel -> 최신 작업 번호
+        self._pending = set()   # 결과를 아직 전달하지 않은 (channel, 번호)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._run, name='QueryWorker', daemon=True)
+        self._thread.start()
+
+    def submit(self, channel, func, *args, callback=None, errback=None):
+        """작업 추가 - 같은 channel 의 이전 작업은 취소된다"""
+        with self._lock:
+            self._counter += 1
+            job_id = self._counter
+            self._latest[channel] = job_id
+            self._pending = {job for job in self._pending if job[0] != channel}
+            self._pending.add((channel, job_id))
+        self._jobs.put((channel, job_id, func, args, callback, errback))
+        return job_id
+
+    def cancel(self, channel):
+        """channel 의 대기/실행 중 작업 취소"""
+        with self._lock:
+            self._counter += 1
+            self._latest[channel] = self._counter
+            self._pending = {job for job in self._pending if job[0] != channel}
+
+    def is_current(self, channel, job_id):
+        with self._lock:
+            return self._latest.get(channel) == job_id
+
+    def is_pending(self, channel=None):
+        """결과를 기다리는 작업이 있는지"""
+        with self._lock:
+            if channel is None:
+                return bool(self._pending)
+            return any(job[0] == channel for job in self._pending)
+
+    def _run(self):
+        with self.engine.connection():
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+
+                channel, job_id, func, args, callback, errback = job
+                if not self.is_current(channel, job_id):
+                    continue
+
+                started = time.perf_counter()
+                try:
+                    result, error = func(*args), None
+                except Exception as e:
+                    result, error = None, e
+                if self.profiler is not None:
+                    self.profiler.record_callback('job.' + channel,
+                                                  (time.perf_counter() - started) * 1000)
+                self.results.put((channel, job_id, callback, errback, result, error))
+
+    def poll(self):
+        """완료된 작업의 콜백 실행 (UI 스레드에서 호출)"""
+        while True:
+            try:
+                channel, job_id, callback, errback, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            with self._lock:
+                if self._latest.get(channel) != job_id:
+                    continue
+                self._pending.discard((channel, job_id))
+
+            started = time.perf_counter()
+            if error is not None:
+                if errback:
+                    errback(error)
+            elif callback:
+                callback(result)
+            if self.profiler is not None:
+                self.profiler.record_callback('callback.' + channel,
+                                              (time.perf_counter() - started) * 1000)
+
+    def stop(self, timeout=2.0):
+        """작업 스레드 종료"""
+        self._jobs.put(None)
+        self._thread.join(timeout)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+"""
+거래 내역 내보내기
+DB 커서에서 일정 건수씩 읽어 바로 파일에 쓰므로 테이블 크기와 상관없이 메모리 사용량이 일정하다.
+
+형식
+- csv:      id,date,type,category,amount,remark
+- jsonl:    한 줄에 거래 하나 (JSON 객체)
+- columnar: 행 묶음(row group) 단위 열 저장 바이너리 (.hlc)
+"""
+
+import csv
+import json
+import os
+import struct
+import sys
+import argparse
+from array import array
+from datetime import date
+
+try:
+    from .HL_repository import DatabaseManager
+    from .HL_engine import month_range
+except ImportError:
+    from HL_repository import DatabaseManager
+    from HL_engine import month_range
+
+
+COLUMNS = ('id', 'date', 'type', 'category', 'amount', 'remark')
+FORMATS = ('csv', 'jsonl', 'columnar')
+EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.hlc': 'columnar'}
+
+# columnar 파일 구조
+#   MAGIC
+#   row group 반복: <I 행 수> + 열 블록 6개
+#   <I 0> (끝 표시)
+# 열 블록
+#   id:              <I 바이트 수> + int64 배열
+#   date:            <I 바이트 수> + int32(날짜 서수) 배열
+#                    + 서수로 못 바꾼 날짜(서수 0)의 원문 - 문자열 목록 (HLC3 부터)
+#   amount:          <I 바이트 수> + int64 배열 (원 단위, HLC1 은 float64)
+#   type, category:  사전 인코딩 - <I 사전 크기> + 문자열들 + <I 바이트 수> + uint16 코드 배열
+#   remark:          <I 바이트 수> + uint32 끝 위치 배열 + <I 바이트 수> + UTF-8 본문
+MAGIC = b'HLC3'
+AMOUNT_TYPECODES = {b'HLC1': 'd', b'HLC2': 'q', b'HLC3': 'q'}
+RAW_DATE_VERSIONS = (b'HLC3',)  # 날짜 원문 목록이 있는 버전
+ROW_GROUP_SIZE = 65536
+
+_U32 = struct.Struct('<I')
+
+
+def detect_format(path):
+    """확장자로 형식 추정 (모르면 csv)"""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def write_csv(rows, f):
+    writer = csv.writer(f)
+    writer.writerow(COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, f):
+    count = 0
+    for row in rows:
+        f.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def _write_block(f, data):
+    f.write(_U32.pack(len(data)))
+    f.write(data)
+
+
+def _write_strings(f, values):
+    """문자열 목록 - 끝 위치 배열 + UTF-8 본문"""
+    ends = array('I')
+    body = bytearray()
+    for value in values:
+        body += (value or '').encode('utf-8')
+        ends.append(len(body))
+    _write_block(f, ends.tobytes())
+    _write_block(f, bytes(body))
+
+
+def _write_dictionary(f, values):
+    """반복이 많은 문자열 - 사전 + uint16 코드"""
+    lookup = {}
+    codes = array('H')
+    for value in values:
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(lookup)
+        codes.append(code)
+    f.write(_U32.pack(len(lookup)))
+    _write_strings(f, list(lookup))
+    _write_block(f, codes.tobytes())
+
+
+def _date_ordinal(value):
+    """'YYYY-MM-DD' -> 날짜 서수, 달력에 없거나 형식이 다르면 0 (원문을 따로 저장)"""
+    try:
+        ordinal = date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return 0
+    return ordinal if date.fromordinal(ordinal).isoformat() == value else 0
+
+
+def _write_dates(f, dates):
+    """날짜 - 서수 배열 + 서수로 못 바꾼 날짜의 원문 (CSV/JSONL 처럼 저장된 값을 그대로 보존)"""
+    ordinals = array('i')
+    raw = []
+    cache = {}
+    for value in dates:
+        ordinal = cache.get(value)
+        if ordinal is None:
+            ordinal = cache[value] = _date_ordinal(value)
+        if not ordinal:
+            raw.append(str(value))
+        ordinals.append(ordinal)
+    _write_block(f, ordinals.tobytes())
+    _write_strings(f, raw)
+
+
+def _write_row_group(f, group):
+    ids, dates, types, categories, amounts, remarks = zip(*group)
+    f.write(_U32.pack(len(group)))
+    _write_block(f, array('q', ids).tobytes())
+    _write_dates(f, dates)
+    _write_dictionary(f, types)
+    _write_dictionary(f, categories)
+    _write_block(f, array('q', amounts).tobytes())
+    _write_strings(f, remarks)
+
+
+def write_columnar(rows, f):
+    f.write(MAGIC)
+    count = 0
+    group = []
+    for row in rows:
+        group.append(row)
+        if len(group) == ROW_GROUP_SIZE:
+            _write_row_group(f, group)
+            count += len(group)
+            group = []
+    if group:
+        _write_row_group(f, group)
+        count += len(group)
+    f.write(_U32.pack(0))
+    return count
+
+
+def _read_block(f):
+    size, = _U32.unpack(f.read(4))
+    return f.read(size)
+
+
+def _read_array(f, typecode):
+    values = array(typecode)
+    values.frombytes(_read_block(f))
+    return values
+
+
+def _read_strings(f):
+    ends = _read_array(f, 'I')
+    body = _read_block(f)
+    values, start = [], 0
+    for end in ends:
+        values.append(body[start:end].decode('utf-8'))
+        start = end
+    return values
+
+
+def _read_dictionary(f):
+    f.read(4)   # 사전 크기
+    lookup = _read_strings(f)
+    return [lookup[code] for code in _read_array(f, 'H')]
+
+
+def read_columnar(path):
+    """columnar 파일을 row group 단위로 읽어 거래 행을 하나씩 생성"""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+        amount_typecode = AMOUNT_TYPECODES.get(magic)
+        if amount_typecode is None:
+            raise ValueError(f"columnar 파일이 아닙니다: {path}")
+        while True:
+            count, = _U32.unpack(f.read(4))
+            if not count:
+                return
+            ids = _read_array(f, 'q')
+            ordinals = _read_array(f, 'i')
+            raw = iter(_read_strings(f) if magic in RAW_DATE_VERSIONS else ())
+            dates = [date.fromordinal(day).isoformat() if day else next(raw) for day in ordinals]
+            types = _read_dictionary(f)
+            categories = _read_dictionary(f)
+            amounts = _read_array(f, amount_typecode)
+            remarks = _read_strings(f)
+            yield from zip(ids, dates, types, categories, amounts, remarks)
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'columnar': write_columnar}
+
+
+def export_transactions(db, path, fmt=None, month=None, start=None, end=None):
+    """거래 내역을 파일로 내보내기 - 내보낸 건수 반환
+
+    month ('YYYY-MM') 또는 start/end ('YYYY-MM-DD', start <= date < end) 로 범위 제한.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    if month:
+        start, end = month_range(month)
+
+    rows = db.iter_transactions(start, end)
+    tmp_path = path + '.part'
+    try:
+        if fmt == 'columnar':
+            with open(tmp_path, 'wb') as f:
+                count = write_columnar(rows, f)
+        else:
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                count = WRITERS[fmt](rows, f)
+    except BaseException:
+        rows.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+def main(argv=None):
+    """명령행 실행"""
+    parser = argparse.ArgumentParser(description="거래 내역 내보내기")
+    parser.add_argument('output', help="저장할 파일 (.csv / .jsonl / .hlc)")
+    parser.add_argument('--format', choices=FORMATS, help="형식 (기본: 확장자로 추정)")
+    parser.add_argument('--month', help="해당 월만 (YYYY-MM)")
+    parser.add_argument('--start', help="시작일 포함 (YYYY-MM-DD)")
+    parser.add_argument('--end', help="종료일 미포함 (YYYY-MM-DD)")
+    parser.add_argument('--db', help="DB 파일 경로 (기본: ~/household_account.db)")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    try:
+        count = export_transactions(db, args.output, args.format,
+                                    args.month, args.start, args.end)
+    finally:
+        db.close()
+    print(f"{args.output}: {count:,}건 내보냄")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
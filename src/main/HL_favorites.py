@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+즐겨찾기 (자주 쓰는 거래 틀)
+시작할 때 favorites.csv 를 한 번 읽어 메모리에 두고, 입력 폼 채우기와 월 일괄 추가에 쓴다.
+
+favorites.csv 형식:  구분,구분.카테고리,금액[,비고]   (예: 수입,수입.급여,0,)
+금액이 0 인 항목은 금액만 비워 둔 틀 - 폼에 채우기만 하고 일괄 추가에서는 빠진다.
+"""
+
+import os
+import csv
+import calendar
+from collections import Counter, namedtuple
+
+try:
+    from .HL_import import parse_record
+except ImportError:
+    from HL_import import parse_record
+
+
+FAVORITES_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "favorites.csv")
+
+# parse_record 는 날짜 없는 행에 날짜가 필요하다 (즐겨찾기에서는 쓰지 않음)
+_NO_DATE = '0000-01-01'
+
+
+class Favorite(namedtuple('Favorite', 'type category amount remark')):
+    """거래 틀 하나"""
+
+    __slots__ = ()
+
+    @property
+    def fixed(self):
+        """금액이 정해진 항목인지 (일괄 추가 대상)"""
+        return self.amount > 0
+
+    @property
+    def label(self):
+        text = f"{self.type}.{self.category}"
+        if self.fixed:
+            text += f" ₩{self.amount:,}"
+        if self.remark:
+            text += f" ({self.remark})"
+        return text
+
+    def to_row(self, date):
+        """(date, type, category, amount, remark) - insert_transaction(s) 에 바로 넘길 수 있는 행"""
+        return date, self.type, self.category, self.amount, self.remark
+
+
+def read_favorites_csv(path, encoding='utf-8-sig'):
+    """favorites.csv -> [Favorite], 잘못된 줄은 ValueError (줄 번호 포함)"""
+    favorites = []
+    with open(path, newline='', encoding=encoding) as f:
+        for line_no, fields in enumerate(csv.reader(f), start=1):
+            try:
+                record = parse_record(fields, _NO_DATE)
+            except ValueError as e:
+                raise ValueError(f"{path} {line_no}번째 줄: {e}") from None
+            if record is not None:
+                favorites.append(Favorite(*record[1:]))
+    return favorites
+
+
+def write_favorites_csv(path, favorites, encoding='utf-8'):
+    """즐겨찾기 목록을 favorites.csv 형식으로 저장"""
+    tmp_path = path + '.part'
+    with open(tmp_path, 'w', newline='', encoding=encoding) as f:
+        writer = csv.writer(f)
+        for favorite in favorites:
+            writer.writerow((favorite.type, f"{favorite.type}.{favorite.category}",
+                             favorite.amount, favorite.remark))
+    os.replace(tmp_path, path)
+
+
+class FavoriteBook:
+    """메모리에 둔 즐겨찾기 목록"""
+
+    def __init__(self, path=FAVORITES_CSV):
+        self.path = path
+        self.favorites = []
+
+    def __len__(self):
+        return len(self.favorites)
+
+    def __getitem__(self, index):
+        return self.favorites[index]
+
+    def __iter__(self):
+        return iter(self.favorites)
+
+    def load(self):
+        """CSV 읽기 (파일이 없으면 빈 목록)"""
+        self.favorites = read_favorites_csv(self.path) if os.path.exists(self.path) else []
+        return self.favorites
+
+    def add(self, favorite):
+        """추가 후 바로 저장 (같은 항목이 있으면 그대로)"""
+        if favorite not in self.favorites:
+            self.favorites.append(favorite)
+            write_favorites_csv(self.path, self.favorites)
+
+    def remove(self, index):
+        del self.favorites[index]
+        write_favorites_csv(self.path, self.favorites)
+
+    def monthly_rows(self, year_month, day=1):
+        """금액이 정해진 즐겨찾기를 year_month 의 day 일 거래 행으로 (달에 없는 날은 말일로)"""
+        year, month = map(int, year_month.split('-'))
+        day = min(day, calendar.monthrange(year, month)[1])
+        date = f"{year_month}-{day:02d}"
+        return [favorite.to_row(date) for favorite in self.favorites if favorite.fixed]
+
+    def apply_month(self, db, year_month, day=1):
+        """금액이 정해진 즐겨찾기를 한 트랜잭션으로 추가 - 추가한 행 목록
+
+        그 날짜에 같은 거래가 이미 있으면 건너뛰므로 같은 달에 다시 적용해도 두 번 들어가지 않는다.
+        """
+        rows = self.monthly_rows(year_month, day)
+        with db.engine.transaction():
+            existing = Counter((date, trans_type, category, amount, remark or '')
+                               for _, date, trans_type, category, amount, remark
+                               in db.get_transactions_by_month(year_month))
+            new_rows = []
+            for row in rows:
+                if existing[row]:
+                    existing[row] -= 1
+                else:
+                    new_rows.append(row)
+            if new_rows:
+                db.insert_transactions(new_rows)
+        return new_rows
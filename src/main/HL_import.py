@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+"""
+CSV 대량 가져오기
+카드/은행 내역 CSV 를 한 줄씩 읽어 검증한 뒤 큰 트랜잭션 단위로 저장한다.
+
+지원하는 행 형식
+- 거래:      날짜,구분,카테고리,금액[,비고]      (예: 2024-05-03,지출,식비,12000,점심)
+- 즐겨찾기:  구분,구분.카테고리,금액[,비고]     (예: 수입,수입.급여,0,)  -> 날짜는 default_date
+- 예산:      구분.카테고리,금액                  (예: 지출.식대,10000.0) -> 날짜는 default_date
+"""
+
+import csv
+import os
+import re
+import sys
+import argparse
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+
+try:
+    from .HL_repository import DatabaseManager
+except ImportError:
+    from HL_repository import DatabaseManager
+
+
+TRANSACTION_TYPES = ("수입", "지출")
+HEADER_NAMES = ("date", "날짜", "type", "구분")
+
+_DATE_RE = re.compile(r'^(\d{4})[-./](\d{1,2})[-./](\d{1,2})$')
+
+
+class ImportResult:
+    """가져오기 결과"""
+
+    def __init__(self, source):
+        self.source = source
+        self.imported = 0       # 이번 실행에서 저장한 행 수
+        self.skipped = 0        # 이어하기로 건너뛴 줄 수
+        self.errors = []        # [(줄 번호, 사유)]
+        self.last_line = 0
+
+    def __repr__(self):
+        return (f"ImportResult(source={self.source!r}, imported={self.imported}, "
+                f"skipped={self.skipped}, errors={len(self.errors)})")
+
+
+@lru_cache(maxsize=8192)
+def parse_date(text):
+    """'YYYY-MM-DD' (또는 . / 구분) -> 'YYYY-MM-DD', 잘못된 날짜는 ValueError"""
+    match = _DATE_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"날짜 형식 오류: {text!r}")
+    year, month, day = (int(part) for part in match.groups())
+    return date(year, month, day).isoformat()
+
+
+def parse_amount(text):
+    """'12,000' / '₩12000' / '10000.0' -> 원 단위 정수, 음수/소수/숫자가 아니면 ValueError"""
+    if text.isdigit():
+        return int(text)
+
+    cleaned = text.strip().replace(',', '').replace('₩', '').replace('원', '')
+    if not cleaned:
+        raise ValueError("금액 없음")
+    amount = float(cleaned)
+    if amount < 0 or not amount.is_integer():
+        raise ValueError(f"금액 오류 (0 이상 원 단위 정수만 가능): {text!r}")
+    return int(amount)
+
+
+def split_category(trans_type, category):
+    """'지출.식비' 처럼 구분이 붙은 카테고리에서 구분 떼기"""
+    if '.' not in category and '_' not in category:
+        return category
+    for sep in ('.', '_'):
+        prefix = trans_type + sep
+        if category.startswith(prefix):
+            return category[len(prefix):]
+    return category
+
+
+def parse_record(fields, default_date=None):
+    """CSV 한 행 -> (date, type, category, amount, remark)"""
+    fields = [field.strip() for field in fields]
+    while fields and not fields[-1]:
+        fields.pop()
+    if not fields:
+        return None
+
+    if fields[0][:1].isdigit():
+        # 거래 형식
+        if len(fields) < 4:
+            raise ValueError("열 개수 부족")
+        date_str, trans_type, category, amount = fields[:4]
+        remark = ",".join(fields[4:])
+        date_str = parse_date(date_str)
+    else:
+        if fields[0] in TRANSACTION_TYPES:
+            # 즐겨찾기 형식
+            if len(fields) < 3:
+                raise ValueError("열 개수 부족")
+            trans_type, category, amount = fields[:3]
+            remark = ",".join(fields[3:])
+        elif '.' in fields[0] and len(fields) >= 2:
+            # 예산 형식
+            trans_type, _, category = fields[0].partition('.')
+            amount, remark = fields[1], ""
+        else:
+            raise ValueError(f"알 수 없는 행 형식: {fields[0]!r}")
+
+        if default_date is None:
+            raise ValueError("날짜 없는 행 - default_date 필요")
+        date_str = default_date
+
+    if trans_type not in TRANSACTION_TYPES:
+        raise ValueError(f"구분 오류: {trans_type!r}")
+
+    category = split_category(trans_type, category)
+    if not category:
+        raise ValueError("카테고리 없음")
+
+    return date_str, trans_type, category, parse_amount(amount), remark
+
+
+def read_lines(path, encoding='utf-8-sig'):
+    """(줄 번호, 필드 목록) 을 하나씩 생성"""
+    with open(path, newline='', encoding=encoding) as f:
+        for line_no, fields in enumerate(csv.reader(f), start=1):
+            yield line_no, fields
+
+
+def iter_chunks(iterable, size):
+    """size 개씩 묶어서 생성"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_chunk(lines, default_date, result):
+    """한 묶음 검증 - 저장할 행 목록 (오류는 result.errors 에 기록)"""
+    records = []
+    for line_no, fields in lines:
+        if line_no == 1 and fields and fields[0].strip().lower() in HEADER_NAMES:
+            continue
+        try:
+            record = parse_record(fields, default_date)
+        except ValueError as e:
+            result.errors.append((line_no, str(e)))
+            continue
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def get_checkpoint(db, source):
+    """이어하기 지점 (line_no, done) - 없으면 (0, False)"""
+    rows = db.engine.execute(
+        'SELECT line_no, done FROM import_checkpoints WHERE source = ?', (source,)
+    )
+    if not rows:
+        return 0, False
+    return rows[0][0], bool(rows[0][1])
+
+
+def save_checkpoint(conn, source, line_no, imported, done=False):
+    """이어하기 지점 기록 (conn 의 트랜잭션 안에서 호출)"""
+    conn.execute(
+        '''INSERT INTO import_checkpoints (source, line_no, imported, done, updated_at)
+           VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT (source) DO UPDATE SET
+               line_no = excluded.line_no,
+               imported = imported + excluded.imported,
+               done = excluded.done,
+               updated_at = excluded.updated_at''',
+        (source, line_no, imported, int(done), datetime.now().isoformat(timespec='seconds'))
+    )
+
+
+def import_csv(db, path, default_date=None, batch_size=50000, encoding='utf-8-sig',
+               restart=False, progress=None, bulk=True):
+    """CSV 파일 가져오기
+
+    batch_size 줄마다 한 트랜잭션으로 저장하면서 같은 트랜잭션에 이어하기 지점을 기록한다.
+    도중에 실패하면 마지막으로 저장된 묶음 다음 줄부터 다시 시작한다.
+    progress(result) 는 묶음을 저장할 때마다 호출된다.
+    bulk 이면 묶음마다 월별 집계/FTS 를 한 번에 반영한다 (bulk_insert_transactions).
+    """
+    insert = db.bulk_insert_transactions if bulk else db.insert_transactions
+    source = os.path.abspath(path)
+    result = ImportResult(source)
+
+    if restart:
+        # 처음부터 다시 가져오므로 예전 기록(가져온 수 포함)은 버린다
+        with db.engine.transaction() as conn:
+            conn.execute('DELETE FROM import_checkpoints WHERE source = ?', (source,))
+    start_line, done = get_checkpoint(db, source)
+    if done:
+        result.skipped = start_line
+        return result
+
+    lines = read_lines(path, encoding)
+    if start_line:
+        lines = islice(lines, start_line, None)
+        result.skipped = start_line
+
+    last_line = start_line
+    for chunk in iter_chunks(lines, batch_size):
+        records = validate_chunk(chunk, default_date, result)
+        last_line = chunk[-1][0]
+        
+        # 날짜순으로 넣으면 인덱스 페이지를 덜 건드린다
+        records.sort(key=itemgetter(0))
+
+        with db.engine.transaction() as conn:
+            if records:
+                insert(records)
+            save_checkpoint(conn, source, last_line, len(records))
+
+        result.imported += len(records)
+        result.last_line = last_line
+        if progress:
+            progress(result)
+
+    with db.engine.transaction() as conn:
+        save_checkpoint(conn, source, last_line, 0, done=True)
+    result.last_line = last_line
+    return result
+
+
+def main(argv=None):
+    """명령행 실행"""
+    parser = argparse.ArgumentParser(description="CSV 거래 내역 가져오기")
+    parser.add_argument('files', nargs='+', help="가져올 CSV 파일")
+    parser.add_argument('--date', help="날짜 없는 행에 쓸 날짜 (YYYY-MM-DD)")
+    parser.add_argument('--db', help="DB 파일 경로 (기본: ~/household_account.db)")
+    parser.add_argument('--batch-size', type=int, default=50000)
+    parser.add_argument('--encoding', default='utf-8-sig')
+    parser.add_argument('--restart', action='store_true', help="이어하기 지점 무시하고 처음부터")
+    parser.add_argument('--per-row', action='store_true',
+                        help="일괄 반영 대신 행 단위 트리거로 월별 집계/FTS 갱신")
+    args = parser.parse_args(argv)
+
+    default_date = parse_date(args.date) if args.date else None
+    db = DatabaseManager(args.db)
+    failed = False
+    try:
+        for path in args.files:
+            started = datetime.now()
+
+            def report(result):
+                print(f"  {result.last_line:,}줄 처리, {result.imported:,}건 저장", flush=True)
+
+            print(f"{path} 가져오는 중...")
+            result = import_csv(db, path, default_date, args.batch_size,
+                                args.encoding, args.restart, report, not args.per_row)
+            elapsed = (datetime.now() - started).total_seconds()
+            rate = result.imported / elapsed if elapsed else 0
+            print(f"완료: {result.imported:,}건 저장, {result.skipped:,}줄 건너뜀, "
+                  f"오류 {len(result.errors):,}건 ({elapsed:.2f}초, {rate:,.0f}건/초)")
+            for line_no, message in result.errors[:20]:
+                print(f"  {line_no}번째 줄: {message}")
+            failed = failed or bool(result.errors)
+    finally:
+        db.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
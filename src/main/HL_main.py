@@ -5,12 +5,29 @@
 Windows 최적화 - Tkinter 버전
 """
 
+import time
+IMPORT_STARTED = time.perf_counter()    # 시작 시간 측정 기준 (--startup-times)
+
 import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3
+from tkinter import ttk, messagebox, filedialog
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict
+import sys
+import argparse
+from datetime import date, datetime, timedelta
+from collections import deque
+
+try:
+    from .HL_engine import QueryWorker, month_range
+    from .HL_repository import DatabaseManager, TransactionFilter, LEGACY_LEDGER_PATH
+    from .HL_budget import BudgetTracker, BUDGETS_CSV, import_budgets_csv
+    from .HL_favorites import Favorite, FavoriteBook
+    from .HL_profiler import Profiler, SLOW_QUERY_MS
+except ImportError:
+    from HL_engine import QueryWorker, month_range
+    from HL_repository import DatabaseManager, TransactionFilter, LEGACY_LEDGER_PATH
+    from HL_budget import BudgetTracker, BUDGETS_CSV, import_budgets_csv
+    from HL_favorites import Favorite, FavoriteBook
+    from HL_profiler import Profiler, SLOW_QUERY_MS
 
 
 class ColorTheme:
@@ -36,142 +53,741 @@ class ColorTheme:
     BTN_SECONDARY = "#6c757d"
 
 
-class DatabaseManager:
-    """데이터베이스 관리"""
-    
-    def __init__(self):
-        self.db_path = os.path.join(os.path.expanduser("~"), "household_account.db")
-        self.init_database()
-    
-    def init_database(self):
-        """데이터베이스 초기화"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                type TEXT NOT NULL,
-                category TEXT NOT NULL,
-                amount REAL NOT NULL,
-                remark TEXT
-            )
-        ''')
+def format_tree_row(row):
+    """거래 행 -> Treeview values, tags"""
+    trans_id, date_str, trans_type, category, amount, remark = row
+    
+    # 색상 태그
+    tag = 'income' if trans_type == "수입" else 'expense'
+    
+    values = (trans_id, date_str, trans_type, category,
+              f"₩{amount:,.0f}", remark or "")
+    return values, (tag,)
+
+
+def row_key(row):
+    """목록 정렬 키 (date, id) - 목록은 이 키의 내림차순"""
+    return row[1], row[0]
+
+
+class TreeViewModel:
+    """거래 id 를 키로 Treeview 항목 관리
+    
+    전체를 지우고 다시 넣지 않고, 바뀐 항목만 추가/수정/삭제/이동한다.
+    Treeview item id 는 str(거래 id) 이다.
+    """
+    
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}      # 거래 id -> row
+        self.order = []     # 화면 순서의 거래 id (date DESC, id DESC)
+    
+    def __contains__(self, trans_id):
+        return trans_id in self.rows
+    
+    def clear(self):
+        """모든 항목 제거"""
+        self.tree.delete(*self.tree.get_children())
+        self.rows.clear()
+        self.order.clear()
+    
+    def _insert(self, row, index):
+        values, tags = format_tree_row(row)
+        self.tree.insert('', index, iid=str(row[0]), values=values, tags=tags)
+        self.rows[row[0]] = row
+    
+    def _set(self, row):
+        values, tags = format_tree_row(row)
+        self.tree.item(str(row[0]), values=values, tags=tags)
+        self.rows[row[0]] = row
+    
+    def insert_rows(self, rows, at_top=False):
+        """정렬된 행 묶음을 맨 위 또는 맨 아래에 추가"""
+        base = 0 if at_top else len(self.order)
+        for offset, row in enumerate(rows):
+            self._insert(row, base + offset)
+        ids = [row[0] for row in rows]
+        if at_top:
+            self.order[:0] = ids
+        else:
+            self.order.extend(ids)
+    
+    def remove_ids(self, ids):
+        """여러 항목 제거"""
+        ids = [trans_id for trans_id in ids if trans_id in self.rows]
+        if not ids:
+            return
+        self.tree.delete(*(str(trans_id) for trans_id in ids))
+        removed = set(ids)
+        for trans_id in ids:
+            del self.rows[trans_id]
+        self.order = [trans_id for trans_id in self.order if trans_id not in removed]
+    
+    def remove(self, trans_id):
+        """항목 하나 제거"""
+        self.remove_ids([trans_id])
+    
+    def position_of(self, row):
+        """정렬 순서상 row 가 들어갈 위치"""
+        key = row_key(row)
+        for index, trans_id in enumerate(self.order):
+            if row_key(self.rows[trans_id]) < key:
+                return index
+        return len(self.order)
+    
+    def upsert(self, row):
+        """항목 하나 추가 또는 수정 (정렬 위치 유지)"""
+        trans_id = row[0]
+        if trans_id in self.rows:
+            old_index = self.order.index(trans_id)
+            del self.order[old_index]
+            index = self.position_of(row)
+            self._set(row)
+            if index != old_index:
+                self.tree.move(str(trans_id), '', index)
+        else:
+            index = self.position_of(row)
+            self._insert(row, index)
+        self.order.insert(index, trans_id)
+    
+    def reconcile(self, rows):
+        """목록을 rows 와 같게 맞추기 (바뀐 항목만 갱신)"""
+        wanted = {row[0] for row in rows}
+        self.remove_ids([trans_id for trans_id in self.order if trans_id not in wanted])
+        
+        current = list(self.order)
+        for index, row in enumerate(rows):
+            trans_id = row[0]
+            if trans_id not in self.rows:
+                self._insert(row, index)
+                current.insert(index, trans_id)
+                continue
+            
+            if self.rows[trans_id] != row:
+                self._set(row)
+            if current[index] != trans_id:
+                self.tree.move(str(trans_id), '', index)
+                current.remove(trans_id)
+                current.insert(index, trans_id)
+        
+        self.order = current
+
+
+class VirtualTreeLoader:
+    """전체 보기용 가상 목록
+    
+    keyset 페이지 단위로 필요한 부분만 Treeview 에 올린다.
+    아래로 스크롤하면 다음 페이지를 붙이고, 한도를 넘으면 반대쪽 페이지를 내려서
+    Treeview 에는 화면 주변의 max_pages 페이지만 남는다.
+    """
+    
+    def __init__(self, model, db, page_size=200, max_pages=3, threshold=0.15, flt=None):
+        self.model = model
+        self.tree = model.tree
+        self.db = db
+        self.flt = flt              # TransactionFilter (None 이면 전체)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.threshold = threshold
+        
+        self.pages = deque()        # 각 페이지: 거래 id 목록
+        self.head_key = None        # 올라가 있는 첫 행의 (date, id)
+        self.tail_key = None        # 올라가 있는 마지막 행의 (date, id)
+        self.has_above = False
+        self.has_below = True
+        self.loading = False
+    
+    def start(self, first_page=None):
+        """처음부터 다시 로드 (first_page: 미리 조회한 첫 페이지)"""
+        self.model.clear()
+        self.pages.clear()
+        self.head_key = self.tail_key = None
+        self.has_above = False
+        self.has_below = True
+        self.load_below(first_page)
+        self.tree.yview_moveto(0)
+        self.loading = False
+    
+    def _key_of(self, trans_id):
+        return row_key(self.model.rows[trans_id])
+    
+    def _update_keys(self):
+        ids = self.model.order
+        self.head_key = self._key_of(ids[0]) if ids else None
+        self.tail_key = self._key_of(ids[-1]) if ids else None
+    
+    def load_below(self, rows=None):
+        """다음(과거) 페이지 붙이기"""
+        if not self.has_below:
+            return False
+        
+        if rows is None:
+            rows = self.db.get_transactions_page(self.tail_key, self.page_size, self.flt)
+        if len(rows) < self.page_size:
+            self.has_below = False
+        if not rows:
+            return False
+        
+        self.model.insert_rows(rows)
+        self.pages.append([row[0] for row in rows])
+        self._update_keys()
+        
+        if len(self.pages) > self.max_pages:
+            self._drop_top()
+        return True
+    
+    def load_above(self):
+        """이전(최신) 페이지 다시 붙이기"""
+        if not self.has_above:
+            return False
+        
+        rows = self.db.get_transactions_page_after(self.head_key, self.page_size, self.flt)
+        if len(rows) < self.page_size:
+            self.has_above = False
+        if not rows:
+            return False
+        
+        first, last = self.tree.yview()
+        total = len(self.model.order)
+        self.model.insert_rows(rows, at_top=True)
+        self.pages.appendleft([row[0] for row in rows])
+        self._update_keys()
+        
+        # 위에 추가된 만큼 보던 위치 유지
+        new_total = total + len(rows)
+        self.tree.yview_moveto((first * total + len(rows)) / new_total)
+        
+        if len(self.pages) > self.max_pages:
+            self._drop_bottom()
+        return True
+    
+    def _drop_top(self):
+        first, last = self.tree.yview()
+        total = len(self.model.order)
+        
+        ids = self.pages.popleft()
+        self.model.remove_ids(ids)
+        self._update_keys()
+        self.has_above = True
+        
+        # 위에서 지운 만큼 보던 위치 보정
+        new_total = total - len(ids)
+        if new_total:
+            self.tree.yview_moveto(max(0.0, (first * total - len(ids)) / new_total))
+    
+    def _drop_bottom(self):
+        ids = self.pages.pop()
+        self.model.remove_ids(ids)
+        self._update_keys()
+        self.has_below = True
+    
+    def covers(self, row):
+        """row 가 현재 올라가 있는 구간에 속하는지"""
+        key = row_key(row)
+        if self.head_key is None:
+            return True
+        return ((key <= self.head_key or not self.has_above) and
+                (key >= self.tail_key or not self.has_below))
+    
+    def upsert(self, row):
+        """추가/수정된 거래 반영 (구간 밖이면 제거)"""
+        self.remove(row[0])
+        if not self.covers(row):
+            return
         
-        conn.commit()
-        conn.close()
+        self.model.upsert(row)
+        key = row_key(row)
+        for page in self.pages:
+            if key >= self._key_of(page[-1]):
+                page.append(row[0])
+                break
+        else:
+            if self.pages:
+                self.pages[-1].append(row[0])
+            else:
+                self.pages.append([row[0]])
+        self._update_keys()
     
-    def insert_transaction(self, date, trans_type, category, amount, remark):
-        """거래 추가"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            'INSERT INTO transactions (date, type, category, amount, remark) VALUES (?, ?, ?, ?, ?)',
-            (date, trans_type, category, amount, remark)
-        )
-        conn.commit()
-        conn.close()
-    
-    def get_all_transactions(self):
-        """모든 거래 조회"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM transactions ORDER BY date DESC, id DESC')
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-    
-    def get_transactions_by_month(self, year_month):
-        """월별 거래 조회"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            'SELECT * FROM transactions WHERE date LIKE ? ORDER BY date DESC',
-            (f'{year_month}%',)
-        )
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+    def remove(self, trans_id):
+        """삭제된 거래 반영"""
+        if trans_id not in self.model:
+            return
+        self.model.remove(trans_id)
+        for page in self.pages:
+            if trans_id in page:
+                page.remove(trans_id)
+                if not page:
+                    self.pages.remove(page)
+                break
+        self._update_keys()
     
-    def update_transaction(self, trans_id, date, trans_type, category, amount, remark):
-        """거래 수정"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            'UPDATE transactions SET date=?, type=?, category=?, amount=?, remark=? WHERE id=?',
-            (date, trans_type, category, amount, remark, trans_id)
-        )
-        conn.commit()
-        conn.close()
+    def on_scroll(self, first, last):
+        """Treeview yscrollcommand 에서 호출"""
+        if self.loading:
+            return
+        
+        self.loading = True
+        try:
+            if float(last) >= 1 - self.threshold:
+                self.load_below()
+            elif float(first) <= self.threshold:
+                self.load_above()
+        finally:
+            self.loading = False
+
+
+class StartupTimer:
+    """시작 단계별 소요 시간 (--startup-times 로 출력)
     
-    def delete_transaction(self, trans_id):
-        """거래 삭제"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM transactions WHERE id=?', (trans_id,))
-        conn.commit()
-        conn.close()
-    
-    def get_monthly_summary(self, year_month):
-        """월별 합계"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            'SELECT SUM(amount) FROM transactions WHERE date LIKE ? AND type="수입"',
-            (f'{year_month}%',)
-        )
-        income = cursor.fetchone()[0] or 0
+    import:      모듈 import (IMPORT_STARTED 부터)
+    window:      Tk 창과 위젯 생성
+    first_paint: 첫 화면이 그려질 때까지
+    db:          DB 열기/스키마 확인, 카테고리/월 목록/예산/즐겨찾기 읽기
+    data:        첫 월 목록과 요약이 표시될 때까지
+    """
+    
+    def __init__(self, started=IMPORT_STARTED, stream=None):
+        self.started = started
+        self.stream = stream    # 끝나면 보고서를 쓸 곳 (None 이면 기록만)
+        self.phases = []        # [(단계, 초)]
+        self.finished = False
+        self._last = started
+    
+    def mark(self, phase):
+        """직전 단계가 끝난 뒤부터 지금까지를 phase 로 기록"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+    
+    def finish(self, phase):
+        """마지막 단계 기록 후 보고서 출력"""
+        self.mark(phase)
+        self.finished = True
+        if self.stream is not None:
+            print(self.report(), file=self.stream, flush=True)
+    
+    def total(self):
+        return self._last - self.started
+    
+    def report(self):
+        lines = [f"{phase:<12}{seconds * 1000:9.1f} ms" for phase, seconds in self.phases]
+        lines.append(f"{'total':<12}{self.total() * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+
+class StatisticsPanel:
+    """월 지출 통계 창 - 한 번 만들어 두고 월이 바뀌면 내용만 바꾼다
+    
+    카테고리 목록의 행 위젯은 창에 보이는 개수만큼만 만들어 두고,
+    스크롤하면 행 위젯은 그대로 둔 채 보여 줄 카테고리만 바꿔 끼운다.
+    """
+    
+    ROW_HEIGHT = 28
+    
+    def __init__(self, root):
+        try:
+            from .HL_chart import CategoryBarChart
+        except ImportError:
+            from HL_chart import CategoryBarChart
         
-        cursor.execute(
-            'SELECT SUM(amount) FROM transactions WHERE date LIKE ? AND type="지출"',
-            (f'{year_month}%',)
-        )
-        expense = cursor.fetchone()[0] or 0
-        
-        conn.close()
-        return income, expense
-    
-    def get_expense_by_category(self, year_month):
-        """카테고리별 지출 통계"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            '''SELECT category, SUM(amount) as total 
-               FROM transactions 
-               WHERE type="지출" AND date LIKE ? 
-               GROUP BY category 
-               ORDER BY total DESC''',
-            (f'{year_month}%',)
-        )
+        self.window = tk.Toplevel(root)
+        self.window.geometry("560x640")
+        self.window.configure(bg='white')
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        
+        self.items = []         # [(카테고리, 지출)], 지출 큰 순
+        self.total = 0
+        self.offset = 0         # 첫 번째 행에 보이는 항목 위치
+        self.visible = 0        # 창에 들어가는 행 수
+        self.rows = []          # 행 위젯 풀: (frame, 이름, 금액, 막대)
+        
+        # 제목
+        self.title_label = tk.Label(self.window,
+                                    font=('맑은 고딕', 14, 'bold'),
+                                    bg='white',
+                                    fg=ColorTheme.TEXT_PRIMARY)
+        self.title_label.pack(pady=20)
+        
+        # 총합 (아래쪽 고정)
+        total_frame = tk.Frame(self.window, bg=ColorTheme.BG_HOVER)
+        total_frame.pack(side='bottom', fill='x', padx=20, pady=(0, 20))
+        
+        self.total_label = tk.Label(total_frame,
+                                    font=('맑은 고딕', 12, 'bold'),
+                                    bg=ColorTheme.BG_HOVER,
+                                    fg=ColorTheme.TEXT_PRIMARY)
+        self.total_label.pack(pady=(15, 5))
+        
+        self.daily_label = tk.Label(total_frame,
+                                    font=('맑은 고딕', 9),
+                                    bg=ColorTheme.BG_HOVER,
+                                    fg=ColorTheme.TEXT_SECONDARY)
+        self.daily_label.pack(pady=(0, 15))
+        
+        # 카테고리별 막대 (상위 항목 한눈에)
+        self.chart = CategoryBarChart(self.window, color=ColorTheme.EXPENSE, height=200)
+        self.chart.pack(fill='x', padx=20, pady=(0, 10))
+        
+        # 카테고리 목록 (행 위젯 재사용)
+        list_frame = tk.Frame(self.window, bg='white')
+        list_frame.pack(fill='both', expand=True, padx=20, pady=(0, 10))
+        
+        self.scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        
+        self.row_area = tk.Frame(list_frame, bg='white')
+        self.row_area.pack(side='left', fill='both', expand=True)
+        self.row_area.bind('<Configure>', self.on_resize)
+        self.row_area.bind('<MouseWheel>', self.on_mousewheel)
+    
+    def is_visible(self):
+        return self.window.winfo_exists() and self.window.state() != 'withdrawn'
+    
+    def hide(self):
+        self.window.withdraw()
+    
+    def show(self, year_month, overview, percentiles, outliers):
+        """내용 바꾸기 (위젯은 새로 만들지 않는다)"""
+        self.window.title(f"📊 지출 통계 - {year_month}")
+        self.title_label.config(text=f"{year_month} 카테고리별 지출")
+        
+        self.items = list(overview.categories)
+        self.total = overview.expense
+        self.offset = 0
+        
+        self.total_label.config(text=f"총 지출: ₩{self.total:,.0f}")
+        daily_text = (f"하루 지출 중앙값 ₩{percentiles[50]:,.0f} · 상위 10% ₩{percentiles[90]:,.0f}"
+                      if percentiles[50] is not None else "하루 지출 기록 없음")
+        if outliers:
+            daily_text += f" · 이상 지출일 {len(outliers)}일 (최대 {outliers[0][0]} ₩{outliers[0][1]:,})"
+        self.daily_label.config(text=daily_text)
+        
+        self.chart.set_data(self.items, self.total)
+        self.render()
+        
+        if self.window.state() == 'withdrawn':
+            self.window.deiconify()
+        self.window.lift()
+    
+    def _make_row(self):
+        frame = tk.Frame(self.row_area, bg='white', height=self.ROW_HEIGHT)
+        frame.bind('<MouseWheel>', self.on_mousewheel)
         
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        name = tk.Label(frame, font=('맑은 고딕', 10, 'bold'), bg='white',
+                        fg=ColorTheme.TEXT_PRIMARY, anchor='w')
+        name.place(x=0, y=0, relwidth=0.3, height=self.ROW_HEIGHT - 8)
+        
+        amount = tk.Label(frame, font=('맑은 고딕', 10), bg='white',
+                          fg=ColorTheme.EXPENSE, anchor='e')
+        amount.place(relx=0.6, y=0, relwidth=0.4, height=self.ROW_HEIGHT - 8)
+        
+        track = tk.Frame(frame, bg=ColorTheme.BG_HOVER)
+        track.place(relx=0.3, y=8, relwidth=0.28, height=8)
+        bar = tk.Frame(track, bg=ColorTheme.EXPENSE)
+        
+        for widget in (name, amount, track, bar):
+            widget.bind('<MouseWheel>', self.on_mousewheel)
+        
+        return frame, name, amount, bar
+    
+    def on_resize(self, event):
+        """보이는 행 수 다시 계산 - 모자라면 행 위젯을 더 만든다"""
+        self.visible = max(event.height // self.ROW_HEIGHT, 1)
+        while len(self.rows) < self.visible:
+            self.rows.append(self._make_row())
+        self.render()
+    
+    def render(self):
+        """현재 위치의 항목으로 행 위젯 내용 채우기"""
+        self.offset = max(0, min(self.offset, len(self.items) - self.visible))
+        
+        for index, (frame, name, amount, bar) in enumerate(self.rows):
+            position = self.offset + index
+            if index >= self.visible or position >= len(self.items):
+                frame.place_forget()
+                continue
+            
+            category, spent = self.items[position]
+            ratio = spent / self.total if self.total > 0 else 0
+            name.config(text=category)
+            amount.config(text=f"₩{spent:,.0f} ({ratio * 100:.1f}%)")
+            bar.place(x=0, y=0, relheight=1, relwidth=ratio)
+            frame.place(x=0, y=index * self.ROW_HEIGHT, relwidth=1, height=self.ROW_HEIGHT)
+        
+        if self.items:
+            first = self.offset / len(self.items)
+            last = min(self.offset + self.visible, len(self.items)) / len(self.items)
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def on_scroll(self, action, amount, unit=None):
+        """스크롤바 이동"""
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.items))
+        elif unit == 'pages':
+            self.offset += int(amount) * self.visible
+        else:
+            self.offset += int(amount)
+        self.render()
+    
+    def on_mousewheel(self, event):
+        self.offset -= 1 if event.delta > 0 else -1
+        self.render()
+
+
+class DiagnosticsWindow:
+    """진단 정보 창 - Profiler 스냅샷 (쿼리/콜백 지연 시간, 카운터, 느린 쿼리와 실행 계획)"""
+    
+    def __init__(self, root, profiler):
+        self.profiler = profiler
+        self.window = tk.Toplevel(root)
+        self.window.title("🩺 진단 정보")
+        self.window.geometry("980x720")
+        self.window.configure(bg='white')
+        
+        # 버튼
+        control = tk.Frame(self.window, bg='white')
+        control.pack(fill='x', padx=20, pady=(15, 5))
+        for text, command in (("새로 고침", self.refresh),
+                              ("JSON 저장...", self.on_save),
+                              ("초기화", self.on_reset)):
+            tk.Button(control, text=text,
+                     command=command,
+                     bg=ColorTheme.PRIMARY,
+                     fg='white',
+                     font=('맑은 고딕', 9),
+                     relief='flat',
+                     cursor='hand2',
+                     padx=10).pack(side='left', padx=(0, 4))
+        
+        # 카운터 (연결/commit/rollback, 조회 캐시)
+        self.counter_label = tk.Label(self.window, anchor='w', justify='left',
+                                      font=('맑은 고딕', 9),
+                                      fg=ColorTheme.TEXT_SECONDARY,
+                                      bg='white')
+        self.counter_label.pack(fill='x', padx=20, pady=(5, 10))
+        
+        stat_columns = ('횟수', '합계 ms', '평균 ms', 'p50 ≤', 'p95 ≤', '최대 ms')
+        self.query_tree = self._create_tree(('SQL',) + stat_columns + ('행 수',), height=10)
+        self.callback_tree = self._create_tree(('이름',) + stat_columns, height=6)
+        
+        # 느린 쿼리 (실행 계획 포함)
+        self.slow_text = tk.Text(self.window, height=10, wrap='none',
+                                 font=('Consolas', 9), relief='flat',
+                                 bg=ColorTheme.BG_HOVER)
+        self.slow_text.pack(fill='both', expand=True, padx=20, pady=(0, 15))
+        
+        self.refresh()
+    
+    def _create_tree(self, columns, height):
+        frame = tk.Frame(self.window, bg='white')
+        frame.pack(fill='both', expand=True, padx=20, pady=(0, 10))
+        
+        tree = ttk.Treeview(frame, columns=columns, show='headings', height=height)
+        for index, column in enumerate(columns):
+            tree.heading(column, text=column)
+            tree.column(column, width=360 if index == 0 else 70, anchor='w' if index == 0 else 'e')
+        
+        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        return tree
+    
+    @staticmethod
+    def _stat_values(stat):
+        return (f"{stat['count']:,}", f"{stat['total_ms']:,.1f}", f"{stat['avg_ms']:,.2f}",
+                stat['p50_ms'], stat['p95_ms'], f"{stat['max_ms']:,.1f}")
+    
+    def refresh(self):
+        """최신 스냅샷으로 다시 채우기"""
+        snapshot = self.profiler.snapshot()
+        
+        counters = snapshot['counters']
+        text = (f"{snapshot['started']} 부터 · 연결 {counters['connections']}회 · "
+                f"commit {counters['commits']}회 (평균 {snapshot['commits']['avg_ms']:.2f} ms) · "
+                f"rollback {counters['rollbacks']}회 · 느린 쿼리 기준 {snapshot['slow_ms']} ms")
+        cache = snapshot.get('cache')
+        if cache and 'hits' in cache:
+            text += (f"\n조회 캐시: 적중 {cache['hits']:,} / 실패 {cache['misses']:,} "
+                     f"({cache['hit_rate']:.0%}) · {cache['entries']}개 · "
+                     f"{cache['bytes']:,} / {cache['max_bytes']:,} bytes")
+        self.counter_label.config(text=text)
+        
+        self.query_tree.delete(*self.query_tree.get_children())
+        for stat in snapshot['queries']:
+            self.query_tree.insert('', 'end', values=(stat['sql'],) + self._stat_values(stat)
+                                   + (f"{stat['rows']:,}",))
+        
+        self.callback_tree.delete(*self.callback_tree.get_children())
+        for stat in snapshot['callbacks']:
+            self.callback_tree.insert('', 'end', values=(stat['name'],) + self._stat_values(stat))
+        
+        self.slow_text.delete('1.0', 'end')
+        for slow in reversed(snapshot['slow_queries']):
+            self.slow_text.insert('end', f"[{slow['at']}] {slow['ms']:,.1f} ms, {slow['rows']:,}행\n"
+                                         f"  {slow['sql']}\n  params={slow['params']}\n")
+            for step in slow['plan']:
+                self.slow_text.insert('end', f"    └ {step}\n")
+        if not snapshot['slow_queries']:
+            self.slow_text.insert('end', "느린 쿼리 없음")
+    
+    def on_save(self):
+        path = filedialog.asksaveasfilename(parent=self.window,
+                                            title="진단 정보 저장",
+                                            initialfile="household_profile.json",
+                                            defaultextension='.json',
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            self.profiler.dump(path)
+        except OSError as e:
+            messagebox.showerror("오류", f"저장하지 못했습니다:\n{e}", parent=self.window)
+    
+    def on_reset(self):
+        self.profiler.reset()
+        self.refresh()
 
 
 class SmartHouseholdApp:
     """스마트 가계부 메인 애플리케이션"""
     
-    def __init__(self, root):
+    POLL_INTERVAL_MS = 30
+    SEARCH_DELAY_MS = 250   # 입력이 멈춘 뒤 검색까지 대기
+    SEARCH_LIMIT = 200
+    TREND_MONTHS = 12       # 추이 창 기본 조회 기간
+    START_FALLBACK_MS = 500 # Expose 가 오지 않아도(최소화/숨김 상태로 시작) 이 시간 뒤에는 DB 를 연다
+    
+    # DB 가 열리기 전에는 비활성화하는 입력 위젯
+    INPUT_WIDGETS = (tk.Button, tk.Entry, tk.Radiobutton, tk.Checkbutton, tk.Menubutton,
+                     tk.Spinbox, ttk.Button, ttk.Entry, ttk.Radiobutton, ttk.Checkbutton,
+                     ttk.Menubutton, ttk.Spinbox)
+    
+    def __init__(self, root, startup=None, profiler=None, profile_json=None):
         self.root = root
         self.root.title("💰 스마트 가계부")
         self.root.geometry("1200x700")
         self.root.configure(bg=ColorTheme.BG_MAIN)
         
-        self.db = DatabaseManager()
+        # DB 와 데이터는 첫 화면이 그려진 뒤 start_data() 에서 연다
+        self.startup = startup or StartupTimer()
+        self.db = None
+        self.worker = None
+        self.budget = None
+        self.trends = None      # 추이 창을 처음 열 때 생성
+        self.profiler = profiler    # None 이면 HL_PROFILE 환경 변수를 따른다 (DatabaseManager)
+        self.profile_json = profile_json    # 종료할 때 진단 정보를 저장할 경로
+        self.diagnostics_window = None
+        self.favorites = FavoriteBook()
+        self.favorite_menus = []
+        self.trends_window = None
+        self.stats_panel = None
         self.selected_id = None
+        self.virtual_loader = None
+        self.search_query = None    # 검색 중이면 검색어
+        self.active_filter = None   # 조건 조회 중이면 TransactionFilter
+        self._search_after = None
+        self._disabled = []         # DB 가 열릴 때까지 막아 둔 (위젯, 원래 state)
+        
+        # 창 닫을 때 DB 연결 정리
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # 스타일 설정
         self.setup_styles()
         
-        # UI 구성
+        # UI 구성 - DB 가 열릴 때까지 입력/메뉴는 막아 둔다
         self.create_widgets()
+        self.set_inputs_enabled(False)
+        self.startup.mark('window')
+        
+        # 초기 데이터 로드 - 창이 처음 그려진 다음 (Expose 로 생긴 그리기 작업 뒤에 실행)
+        self._first_expose = self.root.bind('<Expose>', self.on_first_expose, '+')
+        self._start_fallback = self.root.after(self.START_FALLBACK_MS, self.start_data)
+    
+    def set_inputs_enabled(self, enabled):
+        """입력 위젯과 메뉴(종료 제외) 켜기/끄기 - 끌 때의 state 를 기억했다가 그대로 되돌린다"""
+        if enabled:
+            for widget, state in self._disabled:
+                if isinstance(widget, ttk.Widget):
+                    widget.state(['!disabled'])
+                else:
+                    widget.configure(state=state)
+            for index in range(self.menubar.index('end') + 1):
+                self.menubar.entryconfigure(index, state='normal')
+            for index in self.file_menu_data_entries:
+                self.file_menu.entryconfigure(index, state='normal')
+            self._disabled = []
+            return
+        
+        pending = list(self.root.winfo_children())
+        while pending:
+            widget = pending.pop()
+            pending.extend(widget.winfo_children())
+            if not isinstance(widget, self.INPUT_WIDGETS):
+                continue
+            if isinstance(widget, ttk.Widget):
+                if not widget.instate(['disabled']):
+                    widget.state(['disabled'])
+                    self._disabled.append((widget, None))
+            elif str(widget.cget('state')) != 'disabled':
+                self._disabled.append((widget, widget.cget('state')))
+                widget.configure(state='disabled')
+        
+        # 파일 메뉴는 종료만 남긴다
+        for index in range(self.menubar.index('end') + 1):
+            if self.menubar.entrycget(index, 'menu') != str(self.file_menu):
+                self.menubar.entryconfigure(index, state='disabled')
+        for index in self.file_menu_data_entries:
+            self.file_menu.entryconfigure(index, state='disabled')
+    
+    def on_first_expose(self, event):
+        """첫 Expose - 남은 그리기가 끝나면 데이터 로드 시작"""
+        self.root.unbind('<Expose>', self._first_expose)
+        self._first_expose = None
+        self.root.after_idle(self.start_data)
+    
+    def start_data(self):
+        """DB 열기와 첫 데이터 로드 (첫 화면이 그려진 뒤, 늦어도 START_FALLBACK_MS 뒤)"""
+        if self.db is not None:
+            return
+        self.root.after_cancel(self._start_fallback)
+        if self._first_expose is not None:
+            self.root.unbind('<Expose>', self._first_expose)
+            self._first_expose = None
+        self.startup.mark('first_paint')
+        
+        self.db = DatabaseManager(legacy_ledger_path=LEGACY_LEDGER_PATH, profiler=self.profiler)
+        self.profiler = self.db.profiler
+        self.budget = BudgetTracker(self.db)
+        try:
+            self.budget.load(BUDGETS_CSV)
+        except (OSError, ValueError) as e:
+            self.budget.load()
+            messagebox.showwarning("예산", f"기본 예산을 가져오지 못했습니다:\n{e}")
+        try:
+            self.favorites.load()
+        except (OSError, ValueError) as e:
+            messagebox.showwarning("즐겨찾기", f"즐겨찾기를 읽지 못했습니다:\n{e}")
+        self.update_favorite_menus()
+        
+        # DB 조회는 작업 스레드에서 실행하고 결과만 UI 스레드에서 반영
+        # (프로파일링 시 채널별 조회/화면 반영 시간은 job.list, callback.summary 처럼 기록된다)
+        self.worker = QueryWorker(self.db.engine, self.profiler)
+        
+        self.update_categories()
+        self.populate_months()
+        
+        # Ctrl+1~9: 즐겨찾기 바로 입력
+        for number in range(1, 10):
+            self.root.bind(f'<Control-Key-{number}>',
+                           lambda event, index=number - 1: self.apply_favorite(index))
+        self.set_inputs_enabled(True)
+        self.startup.mark('db')
         
-        # 초기 데이터 로드
         self.load_current_month()
+        self.poll_worker()
     
     def setup_styles(self):
         """스타일 설정"""
@@ -213,6 +829,9 @@ class SmartHouseholdApp:
     
     def create_widgets(self):
         """위젯 생성"""
+        # 메뉴
+        self.create_menu()
+        
         # 메인 컨테이너
         main_container = tk.Frame(self.root, bg=ColorTheme.BG_MAIN)
         main_container.pack(fill='both', expand=True, padx=20, pady=20)
@@ -232,6 +851,33 @@ class SmartHouseholdApp:
         right_panel = self.create_list_panel(content_frame)
         right_panel.pack(side='left', fill='both', expand=True, padx=(10, 0))
     
+    def create_menu(self):
+        """메뉴 생성"""
+        menubar = self.menubar = tk.Menu(self.root)
+        
+        file_menu = self.file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="조회 월 내보내기...", command=lambda: self.on_export(month_only=True))
+        file_menu.add_command(label="전체 내보내기...", command=self.on_export)
+        self.file_menu_data_entries = (0, 1)   # DB 가 필요한 항목 (시작 중에는 비활성)
+        file_menu.add_separator()
+        file_menu.add_command(label="종료", command=self.on_close)
+        menubar.add_cascade(label="파일", menu=file_menu)
+        
+        budget_menu = tk.Menu(menubar, tearoff=0)
+        budget_menu.add_command(label="조회 월 예산 현황", command=self.show_budget_status)
+        budget_menu.add_command(label="예산 CSV 불러오기...", command=self.on_import_budgets)
+        menubar.add_cascade(label="예산", menu=budget_menu)
+        
+        favorite_menu = tk.Menu(menubar, tearoff=0)
+        self.favorite_menus.append(favorite_menu)
+        menubar.add_cascade(label="즐겨찾기", menu=favorite_menu)
+        
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="진단 정보...", command=self.show_diagnostics)
+        menubar.add_cascade(label="도구", menu=tools_menu)
+        
+        self.root.config(menu=menubar)
+    
     def create_header(self, parent):
         """헤더 생성"""
         header = tk.Frame(parent, bg='white', relief='flat')
@@ -269,6 +915,22 @@ class SmartHouseholdApp:
                                       bg='white',
                                       fg=ColorTheme.PRIMARY)
         self.balance_label.pack(side='left', padx=10)
+        
+        # 예산 초과 표시
+        self.budget_label = tk.Label(summary_frame,
+                                     text="",
+                                     font=('맑은 고딕', 10, 'bold'),
+                                     bg='white',
+                                     fg=ColorTheme.EXPENSE)
+        self.budget_label.pack(side='left', padx=10)
+        
+        # 조회 중 표시
+        self.loading_label = tk.Label(summary_frame,
+                                      text="",
+                                      font=('맑은 고딕', 10),
+                                      bg='white',
+                                      fg=ColorTheme.TEXT_SECONDARY)
+        self.loading_label.pack(side='left', padx=10)
     
     def create_input_panel(self, parent):
         """입력 패널 생성"""
@@ -283,6 +945,17 @@ class SmartHouseholdApp:
                         fg=ColorTheme.TEXT_PRIMARY)
         title.pack(pady=(20, 20), padx=20, anchor='w')
         
+        # 즐겨찾기 (한 번 클릭으로 입력)
+        favorite_btn = tk.Menubutton(panel, text="⭐ 즐겨찾기",
+                                     bg=ColorTheme.BG_HOVER,
+                                     font=('맑은 고딕', 9),
+                                     relief='flat',
+                                     cursor='hand2',
+                                     padx=10, pady=3)
+        favorite_btn.place(relx=1.0, x=-20, y=24, anchor='ne')
+        favorite_btn['menu'] = tk.Menu(favorite_btn, tearoff=0)
+        self.favorite_menus.append(favorite_btn['menu'])
+        
         # 입력 폼
         form_frame = tk.Frame(panel, bg='white')
         form_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
@@ -336,19 +1009,17 @@ class SmartHouseholdApp:
         self.category_var = tk.StringVar()
         self.category_combo = ttk.Combobox(form_frame, 
                                           textvariable=self.category_var,
-                                          state='readonly',
                                           font=('맑은 고딕', 10))
         self.category_combo.grid(row=5, column=0, sticky='ew', pady=(0, 15))
-        self.update_categories()
         
         # 금액
         self.create_form_field(form_frame, "금액", 6)
         self.amount_var = tk.StringVar()
         self.amount_var.trace('w', self.format_amount)
-        amount_entry = ttk.Entry(form_frame, 
-                                textvariable=self.amount_var,
-                                font=('맑은 고딕', 10))
-        amount_entry.grid(row=7, column=0, sticky='ew', pady=(0, 15))
+        self.amount_entry = ttk.Entry(form_frame, 
+                                     textvariable=self.amount_var,
+                                     font=('맑은 고딕', 10))
+        self.amount_entry.grid(row=7, column=0, sticky='ew', pady=(0, 15))
         
         # 비고
         self.create_form_field(form_frame, "비고", 8)
@@ -459,6 +1130,36 @@ class SmartHouseholdApp:
                              padx=15, pady=5)
         stats_btn.pack(side='right')
         
+        # 월별 추이 버튼
+        trends_btn = tk.Button(control_frame, text="📈 추이",
+                              command=self.show_trends,
+                              bg=ColorTheme.PRIMARY_LIGHT,
+                              fg='white',
+                              font=('맑은 고딕', 9),
+                              relief='flat',
+                              cursor='hand2',
+                              padx=15, pady=5)
+        trends_btn.pack(side='right', padx=(0, 5))
+        
+        # 검색 (비고/카테고리)
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(control_frame,
+                               textvariable=self.search_var,
+                               font=('맑은 고딕', 10),
+                               width=20,
+                               relief='solid',
+                               bd=1)
+        search_entry.pack(side='right', padx=(0, 10), ipady=3)
+        search_entry.bind('<KeyRelease>', self.on_search_typed)
+        search_entry.bind('<Return>', self.on_search)
+        search_entry.bind('<Escape>', self.on_search_cancel)
+        tk.Label(control_frame, text="🔍",
+                font=('맑은 고딕', 10),
+                bg='white').pack(side='right', padx=(0, 5))
+        
+        # 조건 조회
+        self.create_filter_panel(panel)
+        
         # 리스트 프레임
         list_frame = tk.Frame(panel, bg='white')
         list_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
@@ -483,41 +1184,206 @@ class SmartHouseholdApp:
         self.tree.column('비고', width=200, anchor='w')
         
         # 스크롤바
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
+        scrollbar = self.scrollbar
         
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        # 태그 색상 설정
+        self.tree.tag_configure('income', foreground=ColorTheme.INCOME)
+        self.tree.tag_configure('expense', foreground=ColorTheme.EXPENSE)
+        
+        # 거래 id 기준 목록 관리
+        self.view_model = TreeViewModel(self.tree)
+        
         # 항목 선택 이벤트
         self.tree.bind('<<TreeviewSelect>>', self.on_item_selected)
         
-        # 월 목록 초기화
-        self.populate_months()
-        
         return panel
     
-    def populate_months(self):
-        """월 목록 채우기"""
-        months = []
-        current = datetime.now()
+    def create_filter_panel(self, parent):
+        """조건 조회 패널 (기간/금액/구분/카테고리)"""
+        filter_frame = tk.Frame(parent, bg='white')
+        filter_frame.pack(fill='x', padx=20, pady=(0, 10))
+        
+        def label(text):
+            tk.Label(filter_frame, text=text,
+                    font=('맑은 고딕', 9),
+                    bg='white').pack(side='left', padx=(0, 4))
+        
+        def entry(var, width):
+            tk.Entry(filter_frame, textvariable=var,
+                    font=('맑은 고딕', 9),
+                    width=width,
+                    relief='solid',
+                    bd=1).pack(side='left', padx=(0, 4), ipady=2)
+        
+        # 기간 (YYYY-MM-DD, 둘 다 포함)
+        self.filter_start_var = tk.StringVar()
+        self.filter_end_var = tk.StringVar()
+        label("기간")
+        entry(self.filter_start_var, 11)
+        label("~")
+        entry(self.filter_end_var, 11)
+        
+        # 금액
+        self.filter_min_var = tk.StringVar()
+        self.filter_max_var = tk.StringVar()
+        label("  금액")
+        entry(self.filter_min_var, 9)
+        label("~")
+        entry(self.filter_max_var, 9)
         
-        for i in range(12):
-            year = current.year if current.month - i > 0 else current.year - 1
-            month = current.month - i if current.month - i > 0 else 12 + (current.month - i)
-            months.append(f"{year}-{month:02d}")
+        # 구분
+        self.filter_type_vars = {}
+        for trans_type in ("수입", "지출"):
+            var = tk.BooleanVar()
+            tk.Checkbutton(filter_frame, text=trans_type, variable=var,
+                          font=('맑은 고딕', 9),
+                          bg='white').pack(side='left')
+            self.filter_type_vars[trans_type] = var
+        
+        # 카테고리 (여러 개 선택)
+        self.filter_category_vars = {}
+        self.filter_category_btn = tk.Menubutton(filter_frame, text="카테고리 ▾",
+                                                font=('맑은 고딕', 9),
+                                                bg='white',
+                                                relief='solid',
+                                                bd=1)
+        self.filter_category_menu = tk.Menu(self.filter_category_btn, tearoff=0,
+                                           postcommand=self.update_filter_categories)
+        self.filter_category_btn['menu'] = self.filter_category_menu
+        self.filter_category_btn.pack(side='left', padx=(4, 8))
+        
+        tk.Button(filter_frame, text="조회",
+                 command=self.on_apply_filter,
+                 bg=ColorTheme.PRIMARY,
+                 fg='white',
+                 font=('맑은 고딕', 9),
+                 relief='flat',
+                 cursor='hand2',
+                 padx=10).pack(side='left', padx=(0, 4))
+        tk.Button(filter_frame, text="초기화",
+                 command=self.on_reset_filter,
+                 bg=ColorTheme.BTN_SECONDARY,
+                 fg='white',
+                 font=('맑은 고딕', 9),
+                 relief='flat',
+                 cursor='hand2',
+                 padx=10).pack(side='left')
+        
+        # 조회 결과 합계
+        self.filter_totals_label = tk.Label(filter_frame, text="",
+                                           font=('맑은 고딕', 9),
+                                           fg=ColorTheme.TEXT_SECONDARY,
+                                           bg='white')
+        self.filter_totals_label.pack(side='right')
+    
+    def update_filter_categories(self):
+        """카테고리 선택 메뉴 채우기 (메뉴를 열 때마다 DB 기준으로)"""
+        menu = self.filter_category_menu
+        menu.delete(0, 'end')
+        for trans_type in ("수입", "지출"):
+            names = self.db.get_categories(trans_type)
+            if not names:
+                continue
+            if menu.index('end') is not None:
+                menu.add_separator()
+            for name in names:
+                var = self.filter_category_vars.setdefault(name, tk.BooleanVar())
+                menu.add_checkbutton(label=name, variable=var,
+                                     command=self.update_filter_category_label)
+    
+    def update_filter_category_label(self):
+        """선택한 카테고리 수 표시"""
+        count = len(self.selected_filter_categories())
+        self.filter_category_btn.config(text=f"카테고리 {count}개 ▾" if count else "카테고리 ▾")
+    
+    def selected_filter_categories(self):
+        return [name for name, var in self.filter_category_vars.items() if var.get()]
+    
+    def read_filter(self):
+        """조건 조회 입력 -> TransactionFilter (입력 오류는 ValueError)"""
+        def parse_date(var, name):
+            text = var.get().strip()
+            if not text:
+                return None
+            try:
+                return datetime.strptime(text, "%Y-%m-%d").date()
+            except ValueError:
+                raise ValueError(f"{name}을 YYYY-MM-DD 형식으로 입력하세요.")
+        
+        def parse_amount(var, name):
+            text = var.get().replace(',', '').strip()
+            if not text:
+                return None
+            if not text.isdigit():
+                raise ValueError(f"{name}은 0 이상 숫자로 입력하세요.")
+            return int(text)
+        
+        start = parse_date(self.filter_start_var, "시작일")
+        end = parse_date(self.filter_end_var, "종료일")
+        min_amount = parse_amount(self.filter_min_var, "최소 금액")
+        max_amount = parse_amount(self.filter_max_var, "최대 금액")
+        if start and end and start > end:
+            raise ValueError("시작일이 종료일보다 늦습니다.")
+        
+        return TransactionFilter(
+            start=start.isoformat() if start else None,
+            # 종료일까지 포함 -> 다음 날 미만
+            end=(end + timedelta(days=1)).isoformat() if end else None,
+            types=[name for name, var in self.filter_type_vars.items() if var.get()],
+            categories=self.selected_filter_categories(),
+            min_amount=min_amount,
+            max_amount=max_amount,
+        )
+    
+    def on_apply_filter(self):
+        """조건 조회"""
+        try:
+            flt = self.read_filter()
+        except ValueError as e:
+            messagebox.showwarning("입력 오류", str(e))
+            return
         
+        if not flt:
+            self.on_reset_filter()
+            return
+        self.load_all_transactions(flt)
+    
+    def on_reset_filter(self):
+        """조건 초기화 후 월 보기로"""
+        for var in (self.filter_start_var, self.filter_end_var,
+                    self.filter_min_var, self.filter_max_var):
+            var.set('')
+        for var in (*self.filter_type_vars.values(), *self.filter_category_vars.values()):
+            var.set(False)
+        self.update_filter_category_label()
+        self.refresh_list()
+    
+    def show_filter_totals(self, totals):
+        """조건 조회 합계 표시"""
+        self.filter_totals_label.config(
+            text=f"{totals.count:,}건 · 수입 ₩{totals.income:,} · 지출 ₩{totals.expense:,}"
+        )
+    
+    def populate_months(self):
+        """월 목록 채우기 - 거래가 있는 모든 달 + 이번 달 (선택은 유지)"""
+        current = datetime.now().strftime('%Y-%m')
+        months = sorted(set(self.db.get_months()) | {current}, reverse=True)
+        
+        selected = self.month_var_filter.get()
         self.month_combo['values'] = months
-        self.month_combo.current(0)
+        if selected in months:
+            self.month_combo.current(months.index(selected))
+        else:
+            self.month_combo.current(months.index(current))
     
     def update_categories(self):
         """카테고리 업데이트"""
-        trans_type = self.type_var.get()
-        
-        if trans_type == "수입":
-            categories = ["급여", "보너스", "용돈", "기타수입"]
-        else:
-            categories = ["식비", "교통비", "통신비", "쇼핑", "의료", "문화", "주거", "기타"]
+        categories = self.db.get_categories(self.type_var.get())
         
         self.category_combo['values'] = categories
         if categories:
@@ -536,30 +1402,52 @@ class SmartHouseholdApp:
         """구분 변경 이벤트"""
         self.update_categories()
     
+    def read_form_date(self):
+        """입력 폼의 날짜 'YYYY-MM-DD' - 달력에 없는 날짜(2월 31일 등)면 경고 후 None"""
+        try:
+            return date(int(self.year_var.get()), int(self.month_var.get()),
+                        int(self.day_var.get())).isoformat()
+        except ValueError:
+            messagebox.showwarning("입력 오류", "올바른 날짜를 입력하세요.")
+            return None
+    
     def on_add(self):
         """거래 추가"""
         try:
-            date_str = f"{self.year_var.get()}-{int(self.month_var.get()):02d}-{int(self.day_var.get()):02d}"
+            date_str = self.read_form_date()
+            if date_str is None:
+                return
             trans_type = self.type_var.get()
-            category = self.category_var.get()
+            category = self.category_var.get().strip()
             amount_str = self.amount_var.get().replace(',', '')
             remark = self.remark_var.get()
             
             if not category:
-                messagebox.showwarning("입력 오류", "카테고리를 선택하세요.")
+                messagebox.showwarning("입력 오류", "카테고리를 선택하거나 입력하세요.")
                 return
             
             if not amount_str or not amount_str.isdigit():
                 messagebox.showwarning("입력 오류", "올바른 금액을 입력하세요.")
                 return
             
-            amount = float(amount_str)
+            amount = int(amount_str)
             
-            self.db.insert_transaction(date_str, trans_type, category, amount, remark)
-            messagebox.showinfo("완료", "거래가 추가되었습니다.")
+            trans_id = self.db.insert_transaction(date_str, trans_type, category, amount, remark)
+            status = self.budget.record(date_str, trans_type, category, amount)
+            if status is not None and status.over:
+                messagebox.showwarning("예산 초과",
+                                       f"거래가 추가되었습니다.\n\n{date_str[:7]} {category} 예산 "
+                                       f"₩{status.budget:,} 중 ₩{status.spent:,} 사용 "
+                                       f"(₩{-status.remaining:,} 초과)")
+            elif status is not None and status.ratio >= self.budget.WARN_RATIO:
+                messagebox.showinfo("완료",
+                                    f"거래가 추가되었습니다.\n\n{date_str[:7]} {category} 예산의 "
+                                    f"{status.ratio:.0%} 사용 (₩{status.remaining:,} 남음)")
+            else:
+                messagebox.showinfo("완료", "거래가 추가되었습니다.")
             
             self.on_clear()
-            self.refresh_list()
+            self.apply_row_change((trans_id, date_str, trans_type, category, amount, remark))
             self.update_summary()
             
         except Exception as e:
@@ -572,9 +1460,11 @@ class SmartHouseholdApp:
             return
         
         try:
-            date_str = f"{self.year_var.get()}-{int(self.month_var.get()):02d}-{int(self.day_var.get()):02d}"
+            date_str = self.read_form_date()
+            if date_str is None:
+                return
             trans_type = self.type_var.get()
-            category = self.category_var.get()
+            category = self.category_var.get().strip()
             amount_str = self.amount_var.get().replace(',', '')
             remark = self.remark_var.get()
             
@@ -582,13 +1472,15 @@ class SmartHouseholdApp:
                 messagebox.showwarning("입력 오류", "올바른 정보를 입력하세요.")
                 return
             
-            amount = float(amount_str)
+            amount = int(amount_str)
             
-            self.db.update_transaction(self.selected_id, date_str, trans_type, category, amount, remark)
+            trans_id = self.selected_id
+            self.db.update_transaction(trans_id, date_str, trans_type, category, amount, remark)
+            self.budget.forget()
             messagebox.showinfo("완료", "거래가 수정되었습니다.")
             
             self.on_clear()
-            self.refresh_list()
+            self.apply_row_change((trans_id, date_str, trans_type, category, amount, remark))
             self.update_summary()
             
         except Exception as e:
@@ -601,11 +1493,13 @@ class SmartHouseholdApp:
             return
         
         if messagebox.askyesno("삭제 확인", "선택한 거래를 삭제하시겠습니까?"):
-            self.db.delete_transaction(self.selected_id)
+            trans_id = self.selected_id
+            self.db.delete_transaction(trans_id)
+            self.budget.forget()
             messagebox.showinfo("완료", "거래가 삭제되었습니다.")
             
             self.on_clear()
-            self.refresh_list()
+            self.apply_row_removal(trans_id)
             self.update_summary()
     
     def on_clear(self):
@@ -620,6 +1514,136 @@ class SmartHouseholdApp:
         self.remark_var.set("")
         self.selected_id = None
     
+    def update_favorite_menus(self):
+        """즐겨찾기 메뉴 다시 만들기 (메뉴바 + 입력 패널)"""
+        for menu in self.favorite_menus:
+            menu.delete(0, 'end')
+            for index, favorite in enumerate(self.favorites):
+                menu.add_command(label=favorite.label,
+                                 accelerator=f"Ctrl+{index + 1}" if index < 9 else "",
+                                 command=lambda index=index: self.apply_favorite(index))
+            if len(self.favorites):
+                menu.add_separator()
+            menu.add_command(label="현재 입력을 즐겨찾기에 추가", command=self.on_add_favorite)
+            menu.add_command(label="조회 월에 고정 항목 모두 추가...",
+                             command=self.on_apply_monthly_favorites)
+    
+    def apply_favorite(self, index):
+        """즐겨찾기로 폼 채우기 - 금액이 정해진 항목은 바로 추가"""
+        if index >= len(self.favorites):
+            return
+        favorite = self.favorites[index]
+        
+        self.selected_id = None
+        self.type_var.set(favorite.type)
+        self.update_categories()
+        self.category_var.set(favorite.category)
+        self.amount_var.set(str(favorite.amount) if favorite.fixed else "")
+        self.remark_var.set(favorite.remark)
+        
+        if favorite.fixed:
+            self.on_add()
+        else:
+            self.amount_entry.focus_set()
+    
+    def on_add_favorite(self):
+        """현재 입력(날짜 제외)을 즐겨찾기로 저장"""
+        category = self.category_var.get().strip()
+        amount_str = self.amount_var.get().replace(',', '')
+        if not category or (amount_str and not amount_str.isdigit()):
+            messagebox.showwarning("입력 오류", "카테고리와 금액을 확인하세요.")
+            return
+        
+        favorite = Favorite(self.type_var.get(), category, int(amount_str or 0),
+                            self.remark_var.get().strip())
+        try:
+            self.favorites.add(favorite)
+        except OSError as e:
+            messagebox.showerror("오류", f"즐겨찾기를 저장하지 못했습니다:\n{e}")
+            return
+        self.update_favorite_menus()
+    
+    def on_apply_monthly_favorites(self):
+        """금액이 정해진 즐겨찾기를 조회 월 1일자로 한 번에 추가"""
+        year_month = self.month_var_filter.get() or datetime.now().strftime('%Y-%m')
+        rows = self.favorites.monthly_rows(year_month)
+        if not rows:
+            messagebox.showinfo("즐겨찾기", "금액이 정해진 즐겨찾기가 없습니다.")
+            return
+        
+        total = sum(row[3] for row in rows)
+        if not messagebox.askyesno("즐겨찾기 일괄 추가",
+                                   f"{year_month}에 고정 항목 {len(rows)}건 (₩{total:,}) 을 추가하시겠습니까?"):
+            return
+        
+        try:
+            added = self.favorites.apply_month(self.db, year_month)
+        except Exception as e:
+            messagebox.showerror("오류", f"일괄 추가 중 오류가 발생했습니다:\n{str(e)}")
+            return
+        
+        self.budget.forget(year_month)
+        self.populate_months()
+        self.reload_list()
+        self.update_summary()
+        skipped = len(rows) - len(added)
+        message = f"{len(added)}건을 추가했습니다."
+        if skipped:
+            message += f"\n이미 있는 {skipped}건은 건너뛰었습니다."
+        messagebox.showinfo("완료", message)
+    
+    def on_export(self, month_only=False):
+        """거래 내역 내보내기 (작업 스레드에서 실행)"""
+        month = self.month_var_filter.get() if month_only else None
+        path = filedialog.asksaveasfilename(
+            title="내보내기",
+            initialfile=f"household_{month or 'all'}.csv",
+            defaultextension='.csv',
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"),
+                       ("Columnar", "*.hlc")]
+        )
+        if not path:
+            return
+        
+        try:
+            from .HL_export import export_transactions
+        except ImportError:
+            from HL_export import export_transactions
+        
+        self.worker.submit('export', export_transactions, self.db, path, None, month,
+                           callback=lambda count: messagebox.showinfo(
+                               "완료", f"{count:,}건을 내보냈습니다.\n{path}"),
+                           errback=lambda e: messagebox.showerror(
+                               "오류", f"내보내기 중 오류가 발생했습니다:\n{str(e)}"))
+    
+    def show_diagnostics(self):
+        """진단 정보 창 (이미 열려 있으면 새로 고침 후 앞으로)"""
+        if self.profiler is None:
+            messagebox.showinfo("진단 정보",
+                                "프로파일링이 꺼져 있습니다.\n"
+                                "--profile 옵션이나 HL_PROFILE=1 환경 변수로 실행하세요.")
+            return
+        
+        diagnostics = self.diagnostics_window
+        if diagnostics is not None and diagnostics.window.winfo_exists():
+            diagnostics.refresh()
+            diagnostics.window.lift()
+            return
+        self.diagnostics_window = DiagnosticsWindow(self.root, self.profiler)
+    
+    def on_close(self):
+        """프로그램 종료"""
+        if self.worker is not None:
+            self.worker.stop()
+        if self.profiler is not None and self.profile_json:
+            try:
+                self.profiler.dump(self.profile_json)
+            except OSError as e:
+                print(f"진단 정보를 저장하지 못했습니다: {e}", file=sys.stderr)
+        if self.db is not None:
+            self.db.close()
+        self.root.destroy()
+    
     def on_item_selected(self, event):
         """리스트 항목 선택"""
         selection = self.tree.selection()
@@ -662,56 +1686,164 @@ class SmartHouseholdApp:
         self.load_all_transactions()
         self.update_summary()
     
+    def on_search_typed(self, event=None):
+        """검색어 입력 - 입력이 멈추면 검색"""
+        if self.db is None:
+            return
+        if self._search_after:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(self.SEARCH_DELAY_MS, self.on_search)
+    
+    def on_search(self, event=None):
+        """검색 실행 (검색어를 지우면 월 보기로)"""
+        if self.db is None:
+            return
+        if self._search_after:
+            self.root.after_cancel(self._search_after)
+            self._search_after = None
+        
+        text = self.search_var.get().strip()
+        if text == (self.search_query or ''):
+            return
+        if not text:
+            self.refresh_list()
+            return
+        
+        self.search_query = text
+        self.run_search()
+    
+    def on_search_cancel(self, event=None):
+        """검색 취소 (Esc)"""
+        self.search_var.set('')
+        self.on_search()
+    
+    def clear_search(self):
+        """검색 상태 해제"""
+        if self._search_after:
+            self.root.after_cancel(self._search_after)
+            self._search_after = None
+        self.search_query = None
+        self.search_var.set('')
+    
+    def set_active_filter(self, flt):
+        """조건 조회 상태 변경 (조건이 있으면 합계도 다시 계산)"""
+        self.active_filter = flt or None
+        if self.active_filter is None:
+            self.worker.cancel('filter_totals')
+            self.filter_totals_label.config(text="")
+            return
+        self.worker.submit('filter_totals', self.db.filter_totals, self.active_filter,
+                           callback=self.show_filter_totals, errback=self.on_query_error)
+    
+    def run_search(self):
+        """현재 검색어로 검색 (관련도 순)"""
+        self.set_active_filter(None)
+        self.virtual_loader = None
+        self.worker.submit('list', self.db.search_transactions, self.search_query, self.SEARCH_LIMIT,
+                           callback=self.view_model.reconcile, errback=self.on_query_error)
+    
     def load_current_month(self):
         """현재 월 데이터 로드"""
         self.refresh_list()
         self.update_summary()
     
-    def load_all_transactions(self):
-        """전체 거래 로드"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        rows = self.db.get_all_transactions()
-        
-        for row in rows:
-            trans_id, date_str, trans_type, category, amount, remark = row
-            
-            # 색상 태그
-            tag = 'income' if trans_type == "수입" else 'expense'
-            
-            self.tree.insert('', 'end', 
-                           values=(trans_id, date_str, trans_type, category, 
-                                  f"₩{amount:,.0f}", remark or ""),
-                           tags=(tag,))
-        
-        # 태그 색상 설정
-        self.tree.tag_configure('income', foreground=ColorTheme.INCOME)
-        self.tree.tag_configure('expense', foreground=ColorTheme.EXPENSE)
+    def poll_worker(self):
+        """작업 스레드 결과 반영 및 로딩 표시"""
+        self.root.after(self.POLL_INTERVAL_MS, self.poll_worker)
+        self.worker.poll()
+        pending = self.worker.is_pending()
+        self.loading_label.config(text="⏳ 불러오는 중..." if pending else "")
+        if not pending and not self.startup.finished:
+            self.startup.finish('data')
+    
+    def on_query_error(self, error):
+        """작업 스레드 조회 오류"""
+        messagebox.showerror("오류", f"데이터 조회 중 오류가 발생했습니다:\n{str(error)}")
+    
+    def load_all_transactions(self, flt=None):
+        """전체 (또는 조건에 맞는) 거래 로드 (스크롤에 따라 페이지 단위로 로드)"""
+        self.clear_search()
+        self.set_active_filter(flt)
+        loader = VirtualTreeLoader(self.view_model, self.db, flt=flt)
+        loader.loading = True   # 첫 페이지가 오기 전에는 스크롤 로드 안 함
+        self.virtual_loader = loader
+        
+        # 첫 페이지만 작업 스레드에서 조회 (이후 페이지는 작아서 스크롤 시 바로 조회)
+        self.worker.submit('list', self.db.get_transactions_page, None, loader.page_size, flt,
+                           callback=loader.start, errback=self.on_query_error)
+    
+    def reload_list(self):
+        """현재 보기(월/전체/검색)를 다시 조회"""
+        if self.search_query:
+            self.run_search()
+        elif self.virtual_loader:
+            self.load_all_transactions(self.active_filter)
+        else:
+            self.refresh_list()
+    
+    def on_tree_scroll(self, first, last):
+        """리스트 스크롤 - 전체 보기 중이면 다음 페이지 로드"""
+        self.scrollbar.set(first, last)
+        if self.virtual_loader:
+            self.virtual_loader.on_scroll(first, last)
     
     def refresh_list(self):
-        """리스트 새로고침"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """리스트 새로고침 (기존 항목과 비교해 바뀐 것만 갱신)"""
+        self.clear_search()
+        self.set_active_filter(None)
+        self.virtual_loader = None
         
         selected_month = self.month_var_filter.get()
         if not selected_month:
+            self.worker.cancel('list')
+            self.view_model.clear()
             return
         
-        rows = self.db.get_transactions_by_month(selected_month)
+        self.worker.submit('list', self.db.get_transactions_by_month, selected_month,
+                           callback=self.view_model.reconcile, errback=self.on_query_error)
+    
+    def apply_row_change(self, row):
+        """추가/수정된 거래 한 건만 목록에 반영"""
+        if row[1][:7] not in self.month_combo['values']:
+            self.populate_months()
+        
+        if self.worker.is_pending('list'):
+            # 아직 도착하지 않은 조회 결과는 변경 전 데이터일 수 있으므로 다시 조회
+            self.reload_list()
+            return
         
-        for row in rows:
-            trans_id, date_str, trans_type, category, amount, remark = row
-            
-            tag = 'income' if trans_type == "수입" else 'expense'
-            
-            self.tree.insert('', 'end',
-                           values=(trans_id, date_str, trans_type, category,
-                                  f"₩{amount:,.0f}", remark or ""),
-                           tags=(tag,))
+        if self.search_query:
+            # 바뀐 비고/카테고리가 검색어와 맞는지는 FTS 로 다시 판단
+            self.run_search()
+            return
         
-        self.tree.tag_configure('income', foreground=ColorTheme.INCOME)
-        self.tree.tag_configure('expense', foreground=ColorTheme.EXPENSE)
+        if self.active_filter:
+            # 조건에 맞는지, 합계가 어떻게 바뀌는지 다시 조회
+            self.reload_list()
+            return
+        
+        if self.virtual_loader:
+            self.virtual_loader.upsert(row)
+            return
+        
+        start, end = month_range(self.month_var_filter.get() or row[1][:7])
+        if start <= row[1] < end:
+            self.view_model.upsert(row)
+        else:
+            self.view_model.remove(row[0])
+    
+    def apply_row_removal(self, trans_id):
+        """삭제된 거래 한 건만 목록에서 제거"""
+        if self.worker.is_pending('list'):
+            self.reload_list()
+            return
+        
+        if self.virtual_loader:
+            self.virtual_loader.remove(trans_id)
+        else:
+            self.view_model.remove(trans_id)
+        if self.active_filter:
+            self.set_active_filter(self.active_filter)
     
     def update_summary(self):
         """요약 정보 업데이트"""
@@ -720,8 +1852,24 @@ class SmartHouseholdApp:
             current = datetime.now()
             selected_month = f"{current.year}-{current.month:02d}"
         
-        income, expense = self.db.get_monthly_summary(selected_month)
-        balance = income - expense
+        self.worker.submit('summary', self.db.get_month_overview, selected_month,
+                           callback=lambda overview: self.show_summary(overview, selected_month),
+                           errback=self.on_query_error)
+        
+        # 열려 있는 통계 창도 같은 월로 갱신
+        if self.stats_panel and self.stats_panel.is_visible():
+            self.show_statistics()
+    
+    def show_summary(self, overview, year_month=None):
+        """요약 정보 표시"""
+        income, expense, balance, _ = overview
+        
+        if year_month:
+            self.budget.observe(year_month, overview)
+            over = self.budget.overspent(year_month)
+            self.budget_label.config(
+                text=f"⚠ 예산 초과: {', '.join(status.category for status in over)}" if over else ""
+            )
         
         self.income_label.config(text=f"수입: ₩{income:,.0f}")
         self.expense_label.config(text=f"지출: ₩{expense:,.0f}")
@@ -733,6 +1881,39 @@ class SmartHouseholdApp:
         else:
             self.balance_label.config(fg=ColorTheme.EXPENSE)
     
+    def show_budget_status(self):
+        """조회 월 예산 현황"""
+        year_month = self.month_var_filter.get() or datetime.now().strftime('%Y-%m')
+        if not self.budget.budgets:
+            messagebox.showinfo("예산", "등록된 예산이 없습니다.")
+            return
+        
+        lines = []
+        for status in self.budget.status(year_month):
+            mark = "⚠ " if status.over else ""
+            lines.append(f"{mark}{status.category}: ₩{status.spent:,} / ₩{status.budget:,} "
+                         f"({status.ratio:.0%})")
+        messagebox.showinfo(f"예산 현황 - {year_month}", "\n".join(lines))
+    
+    def on_import_budgets(self):
+        """예산 CSV 불러오기 (같은 카테고리는 덮어씀)"""
+        path = filedialog.askopenfilename(title="예산 CSV 불러오기",
+                                          initialdir=os.path.dirname(BUDGETS_CSV),
+                                          filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+        
+        try:
+            count = import_budgets_csv(self.db, path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("오류", f"예산을 불러오지 못했습니다:\n{e}")
+            return
+        
+        self.budget.load()
+        self.update_categories()
+        self.update_summary()
+        messagebox.showinfo("완료", f"예산 {count}개를 불러왔습니다.")
+    
     def show_statistics(self):
         """통계 창 표시"""
         selected_month = self.month_var_filter.get()
@@ -740,81 +1921,253 @@ class SmartHouseholdApp:
             current = datetime.now()
             selected_month = f"{current.year}-{current.month:02d}"
         
-        stats = self.db.get_expense_by_category(selected_month)
-        
-        if not stats:
+        self.worker.submit('stats', self.load_statistics, selected_month,
+                           callback=lambda result: self.open_statistics(selected_month, *result),
+                           errback=self.on_query_error)
+    
+    def load_statistics(self, selected_month):
+        """통계 창 데이터 (작업 스레드) - 월 집계 + 하루 지출 분위수/이상 지출일"""
+        try:
+            from .HL_analytics import load_columns
+        except ImportError:
+            from HL_analytics import load_columns
+        
+        start, end = month_range(selected_month)
+        columns = load_columns(self.db, start, end)
+        return (self.db.get_month_overview(selected_month),
+                columns.daily_percentiles((50, 90)),
+                columns.outlier_days())
+    
+    def open_statistics(self, selected_month, overview, percentiles, outliers):
+        """통계 창 표시 (처음 한 번만 만들고 이후에는 내용만 바꿈)"""
+        panel = self.stats_panel
+        if not overview.categories and not (panel and panel.is_visible()):
             messagebox.showinfo("통계", f"{selected_month}에 지출 내역이 없습니다.")
             return
         
-        # 통계 창 생성
-        stats_window = tk.Toplevel(self.root)
-        stats_window.title(f"📊 지출 통계 - {selected_month}")
-        stats_window.geometry("500x400")
-        stats_window.configure(bg='white')
+        if panel is None or not panel.window.winfo_exists():
+            panel = self.stats_panel = StatisticsPanel(self.root)
+        panel.show(selected_month, overview, percentiles, outliers)
+    
+    def show_trends(self):
+        """월별 추이 창 표시 (이미 열려 있으면 앞으로)"""
+        window = self.trends_window
+        if window is not None and window.winfo_exists():
+            window.lift()
+            return
         
-        # 제목
-        title = tk.Label(stats_window,
-                        text=f"{selected_month} 카테고리별 지출",
-                        font=('맑은 고딕', 14, 'bold'),
-                        bg='white',
-                        fg=ColorTheme.TEXT_PRIMARY)
-        title.pack(pady=20)
+        try:
+            from .HL_trends import TrendAnalyzer, shift_month
+            from .HL_chart import SeriesChart
+        except ImportError:
+            from HL_trends import TrendAnalyzer, shift_month
+            from HL_chart import SeriesChart
+        if self.trends is None:
+            self.trends = TrendAnalyzer(self.db)
+        
+        end = self.month_var_filter.get() or datetime.now().strftime('%Y-%m')
+        start = shift_month(end, -(self.TREND_MONTHS - 1))
+        months = sorted(set(self.month_combo['values']) | {start, end})
+        
+        window = self.trends_window = tk.Toplevel(self.root)
+        window.title("📈 월별 추이")
+        window.geometry("900x760")
+        window.configure(bg='white')
+        
+        # 조회 범위
+        control = tk.Frame(window, bg='white')
+        control.pack(fill='x', padx=20, pady=15)
+        
+        self.trend_start_var = tk.StringVar(value=start)
+        self.trend_end_var = tk.StringVar(value=end)
+        self.trend_window_var = tk.IntVar(value=self.trends.window)
+        
+        for text, var in (("시작 월:", self.trend_start_var), ("종료 월:", self.trend_end_var)):
+            tk.Label(control, text=text,
+                    font=('맑은 고딕', 10, 'bold'),
+                    bg='white').pack(side='left', padx=(0, 5))
+            ttk.Combobox(control, textvariable=var, values=months,
+                        width=10, font=('맑은 고딕', 10)).pack(side='left', padx=(0, 10))
+        
+        tk.Label(control, text="이동평균(개월):",
+                font=('맑은 고딕', 10, 'bold'),
+                bg='white').pack(side='left', padx=(0, 5))
+        tk.Spinbox(control, from_=1, to=24, width=4,
+                  textvariable=self.trend_window_var,
+                  font=('맑은 고딕', 10)).pack(side='left', padx=(0, 10))
+        
+        tk.Button(control, text="조회",
+                 command=self.run_trends,
+                 bg=ColorTheme.PRIMARY,
+                 fg='white',
+                 font=('맑은 고딕', 9),
+                 relief='flat',
+                 cursor='hand2',
+                 padx=15, pady=3).pack(side='left')
+        
+        # 월별 수입/지출/지출 이동평균 꺾은선
+        self.trend_chart = SeriesChart(window, height=180,
+                                       colors=(ColorTheme.INCOME, ColorTheme.EXPENSE,
+                                               ColorTheme.PRIMARY))
+        self.trend_chart.pack(fill='x', padx=20, pady=(0, 10))
+        
+        # 월별 추이 표
+        month_columns = ('월', '수입', '지출', '잔액', '누적 잔액',
+                         '지출 전월 대비', '지출 전년 대비', '지출 이동평균')
+        self.trend_month_tree = self.create_trend_tree(window, month_columns, height=12)
+        
+        # 카테고리별 이동평균 표 (종료 월 기준)
+        category_columns = ('구분', '카테고리', '기간 합계', '종료 월', '이동평균')
+        self.trend_category_tree = self.create_trend_tree(window, category_columns, height=8)
+        
+        self.run_trends()
+    
+    def create_trend_tree(self, parent, columns, height):
+        """추이 창의 표 하나"""
+        frame = tk.Frame(parent, bg='white')
+        frame.pack(fill='both', expand=True, padx=20, pady=(0, 15))
+        
+        tree = ttk.Treeview(frame, columns=columns, show='headings', height=height)
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=100, anchor='center' if column in ('월', '구분') else 'e')
+        
+        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        return tree
+    
+    def run_trends(self):
+        """추이 조회 (작업 스레드)"""
+        try:
+            window = int(self.trend_window_var.get())
+        except (tk.TclError, ValueError):
+            messagebox.showwarning("입력 오류", "이동평균 기간은 숫자로 입력하세요.")
+            return
+        
+        self.worker.submit('trends', self.trends.report,
+                           self.trend_start_var.get().strip(),
+                           self.trend_end_var.get().strip(),
+                           window,
+                           callback=self.show_trend_report,
+                           errback=self.on_trend_error)
+    
+    def on_trend_error(self, error):
+        """잘못된 조회 범위는 경고, 나머지는 조회 오류로 처리"""
+        if isinstance(error, ValueError):
+            messagebox.showwarning("입력 오류", str(error))
+        else:
+            self.on_query_error(error)
+    
+    def show_trend_report(self, report):
+        """추이 결과 표시"""
+        window = self.trends_window
+        if window is None or not window.winfo_exists():
+            return
         
-        # 통계 리스트
-        frame = tk.Frame(stats_window, bg='white')
-        frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        def won(value):
+            return "-" if value is None else f"₩{value:,.0f}"
         
-        total_expense = sum(amount for _, amount in stats)
+        def delta(value):
+            return "-" if value is None else f"{value:+,}"
         
-        for category, amount in stats:
-            percentage = (amount / total_expense * 100) if total_expense > 0 else 0
-            
-            item_frame = tk.Frame(frame, bg='white')
-            item_frame.pack(fill='x', pady=5)
-            
-            # 카테고리명
-            cat_label = tk.Label(item_frame,
-                                text=category,
-                                font=('맑은 고딕', 11, 'bold'),
-                                bg='white',
-                                fg=ColorTheme.TEXT_PRIMARY)
-            cat_label.pack(side='left')
-            
-            # 금액
-            amount_label = tk.Label(item_frame,
-                                   text=f"₩{amount:,.0f} ({percentage:.1f}%)",
-                                   font=('맑은 고딕', 11),
-                                   bg='white',
-                                   fg=ColorTheme.EXPENSE)
-            amount_label.pack(side='right')
-            
-            # 프로그레스 바
-            progress_frame = tk.Frame(frame, bg=ColorTheme.BG_HOVER, height=10)
-            progress_frame.pack(fill='x', pady=(0, 10))
-            
-            progress_bar = tk.Frame(progress_frame, 
-                                   bg=ColorTheme.EXPENSE,
-                                   height=10)
-            progress_bar.place(x=0, y=0, relwidth=percentage/100, height=10)
-        
-        # 총합
-        total_frame = tk.Frame(stats_window, bg=ColorTheme.BG_HOVER)
-        total_frame.pack(fill='x', padx=20, pady=(0, 20))
-        
-        total_label = tk.Label(total_frame,
-                              text=f"총 지출: ₩{total_expense:,.0f}",
-                              font=('맑은 고딕', 12, 'bold'),
-                              bg=ColorTheme.BG_HOVER,
-                              fg=ColorTheme.TEXT_PRIMARY)
-        total_label.pack(pady=15)
+        self.trend_chart.set_data(
+            [month.year_month for month in report.months],
+            [("수입", [month.income for month in report.months]),
+             ("지출", [month.expense for month in report.months]),
+             (f"지출 {report.window}개월 평균", [month.expense_average for month in report.months])]
+        )
+        
+        tree = self.trend_month_tree
+        tree.delete(*tree.get_children())
+        for month in reversed(report.months):
+            tree.insert('', 'end', values=(
+                month.year_month, won(month.income), won(month.expense),
+                won(month.balance), won(month.cumulative),
+                delta(month.expense_mom), delta(month.expense_yoy),
+                won(month.expense_average),
+            ))
+        
+        tree = self.trend_category_tree
+        tree.delete(*tree.get_children())
+        for trend in report.categories:
+            tree.insert('', 'end', values=(
+                trend.type, trend.category, won(sum(trend.totals)),
+                won(trend.totals[-1]), won(trend.averages[-1]),
+            ))
+        
+        self.trends_window.title(
+            f"📈 월별 추이 - {report.start} ~ {report.end} ({report.window}개월 이동평균)"
+        )
 
 
-def main():
+def main(argv=None):
     """메인 실행"""
+    parser = argparse.ArgumentParser(description="스마트 가계부")
+    parser.add_argument('--rebuild-rollup', action='store_true',
+                        help="월별 집계 테이블 재생성 후 종료")
+    parser.add_argument('--verify-rollup', action='store_true',
+                        help="월별 집계 테이블 검증 후 종료")
+    parser.add_argument('--verify-amounts', action='store_true',
+                        help="정수 금액으로 옮기지 못한 거래 출력 후 종료")
+    parser.add_argument('--migrate-ledger', nargs='?', const=LEGACY_LEDGER_PATH, metavar='PATH',
+                        help="예전 ledger DB 를 거래 테이블로 옮긴 후 종료")
+    parser.add_argument('--startup-times', action='store_true',
+                        help="시작 단계별 소요 시간(import/창 생성/첫 화면/DB/첫 데이터) 출력")
+    parser.add_argument('--profile', action='store_true',
+                        help="쿼리/콜백 프로파일링 켜기 (도구 > 진단 정보)")
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help="프로파일링을 켜고 종료할 때 진단 정보를 JSON 으로 저장")
+    parser.add_argument('--slow-query-ms', type=float, default=SLOW_QUERY_MS,
+                        help=f"느린 쿼리 기록 기준 (기본 {SLOW_QUERY_MS} ms)")
+    args = parser.parse_args(argv)
+    startup = StartupTimer(stream=sys.stderr if args.startup_times else None)
+    startup.mark('import')
+    
+    if args.migrate_ledger:
+        db = DatabaseManager()
+        try:
+            result = db.migrate_ledger(args.migrate_ledger)
+        finally:
+            db.close()
+        if result is None:
+            print(f"이미 옮긴 DB 입니다: {args.migrate_ledger}")
+        else:
+            print(f"ledger 이전 완료: {result[0]}건 이전, 변환 실패 {result[1]}건")
+        return 0
+    
+    if args.rebuild_rollup or args.verify_rollup or args.verify_amounts:
+        db = DatabaseManager()
+        try:
+            if args.verify_amounts:
+                rejected = db.verify_amounts()
+                for trans_id, date_str, trans_type, category, amount, remark, reason in rejected:
+                    print(f"변환 실패: id={trans_id} {date_str} {trans_type} {category} ({reason})")
+                print(f"금액 검증 완료: 변환 실패 {len(rejected)}건")
+                if rejected:
+                    return 1
+            if args.rebuild_rollup:
+                db.rebuild_rollup()
+                print("월별 집계를 다시 생성했습니다.")
+            if args.verify_rollup:
+                mismatches = db.verify_rollup()
+                for year_month, trans_type, category in mismatches:
+                    print(f"불일치: {year_month} {trans_type} {category}")
+                print(f"검증 완료: 불일치 {len(mismatches)}건")
+                return 1 if mismatches else 0
+        finally:
+            db.close()
+        return 0
+    
+    profiler = None
+    if args.profile or args.profile_json:
+        profiler = Profiler(args.slow_query_ms)
+    
     root = tk.Tk()
-    app = SmartHouseholdApp(root)
+    app = SmartHouseholdApp(root, startup, profiler, args.profile_json)
     root.mainloop()
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
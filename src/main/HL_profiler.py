@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+
+"""
+쿼리/콜백 프로파일러 (켜야만 동작)
+DatabaseManager(profiler=Profiler()) 로 넘기거나 환경 변수 HL_PROFILE=1 로 실행하면
+연결을 ProfiledConnection 으로 열어 쿼리마다 시간과 행 수를 기록한다.
+끄면 연결은 그냥 sqlite3.Connection 이므로 비용이 없다.
+
+기록 항목
+- queries:   SQL 별 실행 횟수, 지연 시간 히스토그램, 읽은/바꾼 행 수
+- counters:  연결 열기, commit, rollback 횟수
+- callbacks: UI 콜백/작업 스레드 작업별 소요 시간 히스토그램
+- slow:      slow_ms 이상 걸린 쿼리 (EXPLAIN QUERY PLAN 포함)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial, wraps
+
+
+# 히스토그램 구간 상한 (ms) - 마지막 구간은 그 이상 전부
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+SLOW_QUERY_MS = 50
+SLOW_LOG_SIZE = 100
+
+# EXPLAIN QUERY PLAN 을 붙일 수 있는 문장
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class Histogram:
+    """지연 시간 히스토그램 (ms)"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q):
+        """q (0~1) 분위수가 들어 있는 구간의 상한 (마지막 구간이면 최댓값)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(BUCKETS_MS[index], self.max) if index < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self):
+        labels = [f"<={bound}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'max_ms': round(self.max, 3),
+            'buckets': {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+def normalize_sql(sql):
+    """공백을 하나로 줄인 SQL (통계 키)"""
+    return ' '.join(sql.split())
+
+
+class Profiler:
+    """쿼리/콜백 통계 - 여러 스레드에서 기록해도 된다"""
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, slow_log_size=SLOW_LOG_SIZE):
+        self.slow_ms = slow_ms
+        self.started = datetime.now()
+        self._lock = threading.Lock()
+        self._keys = {}         # 원래 SQL -> 정규화한 SQL
+        self._plans = {}        # 정규화한 SQL -> EXPLAIN QUERY PLAN (처음 느렸을 때 한 번만)
+        self._sources = {}      # 이름 -> 스냅샷에 함께 넣을 값을 돌려주는 함수
+        self.slow_log_size = slow_log_size
+        self.reset()
+
+    def reset(self):
+        """기록 지우기"""
+        with self._lock:
+            self.queries = {}       # SQL -> [Histogram, 행 수]
+            self.callbacks = {}     # 이름 -> Histogram
+            self.commits = Histogram()
+            self.counters = {'connections': 0, 'commits': 0, 'rollbacks': 0}
+            self.slow = deque(maxlen=self.slow_log_size)
+            self.started = datetime.now()
+
+    def add_source(self, name, func):
+        """스냅샷에 func() 결과를 name 으로 함께 넣기 (예: 조회 캐시 통계)"""
+        self._sources[name] = func
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_commit(self, ms):
+        with self._lock:
+            self.counters['commits'] += 1
+            self.commits.add(ms)
+
+    def record_query(self, sql, params, ms, rows, conn=None):
+        """쿼리 한 번 - 느리면 conn 으로 실행 계획을 구해 slow 에 남긴다"""
+        key = self._keys.get(sql)
+        if key is None:
+            key = self._keys[sql] = normalize_sql(sql)
+
+        with self._lock:
+            entry = self.queries.get(key)
+            if entry is None:
+                entry = self.queries[key] = [Histogram(), 0]
+            entry[0].add(ms)
+            entry[1] += max(rows, 0)
+            if ms < self.slow_ms:
+                return
+            plan = self._plans.get(key)
+
+        if plan is None and conn is not None:
+            plan = self._plans[key] = explain_plan(conn, sql, params)
+        with self._lock:
+            self.slow.append({
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'ms': round(ms, 3),
+                'rows': rows,
+                'sql': key,
+                'params': repr(params)[:200],
+                'plan': plan or [],
+            })
+
+    def record_callback(self, name, ms):
+        with self._lock:
+            histogram = self.callbacks.get(name)
+            if histogram is None:
+                histogram = self.callbacks[name] = Histogram()
+            histogram.add(ms)
+
+    @contextmanager
+    def timed(self, name):
+        """with 블록 소요 시간을 callbacks 에 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_callback(name, (time.perf_counter() - started) * 1000)
+
+    def wrap(self, name, func):
+        """func 호출 시간을 callbacks 에 기록하는 함수"""
+        @wraps(func)
+        def timed_call(*args, **kwargs):
+            with self.timed(name):
+                return func(*args, **kwargs)
+        return timed_call
+
+    def snapshot(self):
+        """지금까지 기록 (JSON 으로 바로 저장할 수 있는 dict) - 쿼리는 총 소요 시간 큰 순"""
+        with self._lock:
+            queries = [dict(sql=sql, rows=rows, **histogram.to_dict())
+                       for sql, (histogram, rows) in self.queries.items()]
+            callbacks = [dict(name=name, **histogram.to_dict())
+                         for name, histogram in self.callbacks.items()]
+            snapshot = {
+                'started': self.started.isoformat(timespec='seconds'),
+                'taken': datetime.now().isoformat(timespec='seconds'),
+                'slow_ms': self.slow_ms,
+                'counters': dict(self.counters),
+                'commits': self.commits.to_dict(),
+                'queries': sorted(queries, key=lambda item: item['total_ms'], reverse=True),
+                'callbacks': sorted(callbacks, key=lambda item: item['total_ms'], reverse=True),
+                'slow_queries': list(self.slow),
+            }
+        for name, func in self._sources.items():
+            try:
+                snapshot[name] = func()
+            except Exception as e:
+                snapshot[name] = {'error': str(e)}
+        return snapshot
+
+    def dump(self, path):
+        """스냅샷을 JSON 파일로 저장"""
+        tmp_path = path + '.part'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+
+def explain_plan(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN 의 detail 목록 (설명할 수 없는 문장이면 빈 목록)"""
+    if not sql.lstrip()[:7].upper().startswith(EXPLAINABLE):
+        return []
+    try:
+        # 프로파일링 대상이 아닌 기본 커서로 실행
+        cursor = sqlite3.Cursor(conn)
+        try:
+            return [row[-1] for row in cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+        finally:
+            cursor.close()
+    except sqlite3.Error as e:
+        return [f"(실행 계획 없음: {e})"]
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """execute 부터 결과를 다 읽을 때까지를 쿼리 한 번으로 기록하는 커서"""
+
+    _sample = None      # [sql, params, 경과 ms, 읽은 행 수]
+
+    def _begin(self, sql, params, ms):
+        if self.description is None:
+            # 결과 행이 없는 문장 (INSERT/UPDATE/DELETE/DDL 등) - 바꾼 행 수로 바로 기록
+            self.connection.profiler.record_query(sql, params, ms, self.rowcount, self.connection)
+        else:
+            self._sample = [sql, params, ms, 0]
+
+    def _finish(self, explain=True):
+        sample = self._sample
+        if sample is not None:
+            self._sample = None
+            self.connection.profiler.record_query(*sample, self.connection if explain else None)
+
+    def _fetched(self, started, rows):
+        sample = self._sample
+        if sample is not None:
+            sample[2] += (time.perf_counter() - started) * 1000
+            sample[3] += rows
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._begin(sql, parameters, (time.perf_counter() - started) * 1000)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        # 매개변수 묶음 전체를 한 번으로 기록 (실행 계획은 생략)
+        self.connection.profiler.record_query(sql, (), (time.perf_counter() - started) * 1000,
+                                              self.rowcount)
+        return self
+
+    def executescript(self, script):
+        self._finish()
+        started = time.perf_counter()
+        super().executescript(script)
+        self.connection.profiler.record_query(script, (), (time.perf_counter() - started) * 1000,
+                                              0)
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(started, len(rows))
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0)
+            self._finish()
+            raise
+        self._fetched(started, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # 끝까지 읽지 않고 버린 커서 - 다른 스레드에서 불릴 수 있으므로 실행 계획은 구하지 않는다
+        try:
+            self._finish(explain=False)
+        except Exception:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """연결 열기, commit/rollback, 쿼리를 profiler 에 기록하는 연결"""
+
+    def __init__(self, *args, profiler, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = profiler
+        profiler.count('connections')
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute 는 cursor() 를 거치지 않으므로 직접 연결한다
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def commit(self):
+        started = time.perf_counter()
+        super().commit()
+        self.profiler.record_commit((time.perf_counter() - started) * 1000)
+
+    def rollback(self):
+        super().rollback()
+        self.profiler.count('rollbacks')
+
+
+def connection_factory(profiler):
+    """sqlite3.connect(factory=...) 에 넘길 연결 생성 함수"""
+    return partial(ProfiledConnection, profiler=profiler)
+
+
+def profiler_from_env(environ=os.environ):
+    """HL_PROFILE 환경 변수가 켜져 있으면 Profiler (HL_SLOW_QUERY_MS 로 기준 변경), 아니면 None"""
+    if environ.get('HL_PROFILE', '').lower() in ('', '0', 'false', 'no', 'off'):
+        return None
+    return Profiler(float(environ.get('HL_SLOW_QUERY_MS', SLOW_QUERY_MS)))
@@ -0,0 +1,1305 @@
+# -*- coding: utf-8 -*-
+
+"""
+가계부 저장소
+거래(transactions) 하나의 스키마로 모든 데이터를 저장하고 조회한다.
+HL_main(화면), HL_CRUD(호환 함수), 가져오기/내보내기가 모두 이 모듈을 사용한다.
+"""
+
+import os
+from datetime import date as Date, datetime
+from functools import lru_cache
+from collections import namedtuple
+
+try:
+    from .HL_engine import (ConnectionManager, QueryCache, month_range, migrate,
+                            get_schema_version, explain, find_full_scans)
+except ImportError:
+    from HL_engine import (ConnectionManager, QueryCache, month_range, migrate,
+                           get_schema_version, explain, find_full_scans)
+
+try:
+    from .HL_profiler import connection_factory, profiler_from_env
+except ImportError:
+    from HL_profiler import connection_factory, profiler_from_env
+
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), "household_account.db")
+
+# 조회 결과 캐시 기본 상한 (결과 크기 추정치 합계)
+QUERY_CACHE_BYTES = 4 * 1024 * 1024
+
+# 예전 HL_CRUD 가 쓰던 ledger DB (한 번만 transactions 로 옮긴다)
+LEGACY_LEDGER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "household_Ledger.db")
+
+
+# 금액을 원 단위 정수로만 저장 (스키마 버전 6)
+INTEGER_AMOUNT_SCHEMA = (
+    '''
+    CREATE TABLE transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount INTEGER NOT NULL CHECK (typeof(amount) = 'integer' AND amount >= 0),
+        remark TEXT
+    )
+    ''',
+    'CREATE INDEX idx_transactions_date_type_category ON transactions(date, type, category)',
+    'CREATE INDEX idx_transactions_date ON transactions(date)',
+    '''
+    CREATE TABLE monthly_rollup (
+        year_month TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (year_month, type, category)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TRIGGER trg_rollup_insert
+    AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO monthly_rollup (year_month, type, category, total, count)
+        VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount, 1)
+        ON CONFLICT (year_month, type, category)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER trg_rollup_delete
+    AFTER DELETE ON transactions
+    BEGIN
+        UPDATE monthly_rollup SET total = total - OLD.amount, count = count - 1
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type = OLD.type AND category = OLD.category;
+        DELETE FROM monthly_rollup
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type = OLD.type AND category = OLD.category AND count <= 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER trg_rollup_update
+    AFTER UPDATE OF date, type, category, amount ON transactions
+    BEGIN
+        UPDATE monthly_rollup SET total = total - OLD.amount, count = count - 1
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type = OLD.type AND category = OLD.category;
+        DELETE FROM monthly_rollup
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type = OLD.type AND category = OLD.category AND count <= 0;
+        INSERT INTO monthly_rollup (year_month, type, category, total, count)
+        VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount, 1)
+        ON CONFLICT (year_month, type, category)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;
+    END
+    ''',
+)
+
+# 정수 원 단위로 바꿀 수 있는 금액 (정수이거나 소수점 아래가 0 인 숫자, 숫자로만 된 문자열)
+CONVERTIBLE_AMOUNT = '''
+    (typeof(amount) IN ('integer', 'real') AND amount >= 0 AND amount = CAST(amount AS INTEGER))
+    OR (typeof(amount) = 'text' AND amount <> '' AND amount NOT GLOB '*[^0-9]*')
+'''
+
+
+def _migrate_integer_amounts(conn):
+    """REAL 금액을 정수 원 단위로 옮기고, 옮기지 못한 행은 transactions_rejected 에 보관"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transactions_rejected (
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            type TEXT,
+            category TEXT,
+            amount,
+            remark TEXT,
+            reason TEXT NOT NULL
+        )
+    ''')
+    conn.execute(f'''
+        INSERT OR REPLACE INTO transactions_rejected
+        SELECT id, date, type, category, amount, remark, 'amount: ' || quote(amount)
+        FROM transactions
+        WHERE NOT ({CONVERTIBLE_AMOUNT})
+    ''')
+    
+    for trigger in ('trg_rollup_insert', 'trg_rollup_delete', 'trg_rollup_update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    for index in ('idx_transactions_date_type_category', 'idx_transactions_date',
+                  'idx_transactions_type_date'):
+        conn.execute(f'DROP INDEX IF EXISTS {index}')
+    conn.execute('ALTER TABLE transactions RENAME TO transactions_real')
+    conn.execute('DROP TABLE monthly_rollup')
+    for sql in INTEGER_AMOUNT_SCHEMA:
+        conn.execute(sql)
+    
+    # 트리거가 monthly_rollup 도 함께 채운다
+    conn.execute(f'''
+        INSERT INTO transactions (id, date, type, category, amount, remark)
+        SELECT id, date, type, category, CAST(amount AS INTEGER), remark
+        FROM transactions_real
+        WHERE {CONVERTIBLE_AMOUNT}
+        ORDER BY date, id
+    ''')
+    # AUTOINCREMENT 번호는 예전 테이블에서 이어받는다 (삭제/거부된 id 재사용 방지)
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'transactions'")
+    conn.execute("UPDATE sqlite_sequence SET name = 'transactions' WHERE name = 'transactions_real'")
+    conn.execute('DROP TABLE transactions_real')
+
+
+# 구분 (types.id 는 고정)
+INCOME_TYPE_ID = 1
+EXPENSE_TYPE_ID = 2
+TRANSACTION_TYPES = {"수입": INCOME_TYPE_ID, "지출": EXPENSE_TYPE_ID}
+
+# 처음 만들 때 넣는 기본 카테고리 (이후 추가는 categories 테이블에)
+DEFAULT_CATEGORIES = {
+    "수입": ("급여", "보너스", "용돈", "기타수입"),
+    "지출": ("식비", "교통비", "통신비", "쇼핑", "의료", "문화", "주거", "기타"),
+}
+
+# 구분/카테고리를 정수 id 로 정규화 (스키마 버전 8)
+CATEGORY_ID_SCHEMA = (
+    '''
+    CREATE TABLE types (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''',
+    '''
+    CREATE TABLE categories (
+        id INTEGER PRIMARY KEY,
+        type_id INTEGER NOT NULL REFERENCES types(id),
+        name TEXT NOT NULL,
+        UNIQUE (type_id, name),
+        UNIQUE (id, type_id)
+    )
+    ''',
+    '''
+    CREATE TABLE transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        type_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        amount INTEGER NOT NULL CHECK (typeof(amount) = 'integer' AND amount >= 0),
+        remark TEXT,
+        FOREIGN KEY (category_id, type_id) REFERENCES categories(id, type_id)
+    )
+    ''',
+    'CREATE INDEX idx_transactions_date_type_category ON transactions(date, type_id, category_id)',
+    'CREATE INDEX idx_transactions_date ON transactions(date)',
+    '''
+    CREATE TABLE monthly_rollup (
+        year_month TEXT NOT NULL,
+        type_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (year_month, type_id, category_id)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TRIGGER trg_rollup_insert
+    AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO monthly_rollup (year_month, type_id, category_id, total, count)
+        VALUES (substr(NEW.date, 1, 7), NEW.type_id, NEW.category_id, NEW.amount, 1)
+        ON CONFLICT (year_month, type_id, category_id)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER trg_rollup_delete
+    AFTER DELETE ON transactions
+    BEGIN
+        UPDATE monthly_rollup SET total = total - OLD.amount, count = count - 1
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type_id = OLD.type_id AND category_id = OLD.category_id;
+        DELETE FROM monthly_rollup
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type_id = OLD.type_id AND category_id = OLD.category_id AND count <= 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER trg_rollup_update
+    AFTER UPDATE OF date, type_id, category_id, amount ON transactions
+    BEGIN
+        UPDATE monthly_rollup SET total = total - OLD.amount, count = count - 1
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type_id = OLD.type_id AND category_id = OLD.category_id;
+        DELETE FROM monthly_rollup
+        WHERE year_month = substr(OLD.date, 1, 7)
+          AND type_id = OLD.type_id AND category_id = OLD.category_id AND count <= 0;
+        INSERT INTO monthly_rollup (year_month, type_id, category_id, total, count)
+        VALUES (substr(NEW.date, 1, 7), NEW.type_id, NEW.category_id, NEW.amount, 1)
+        ON CONFLICT (year_month, type_id, category_id)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;
+    END
+    ''',
+    # 조회용 - 예전과 같은 (id, date, type, category, amount, remark) 행
+    '''
+    CREATE VIEW transaction_rows AS
+    SELECT t.id, t.date, ty.name AS type, c.name AS category, t.amount, t.remark
+    FROM transactions t
+    JOIN types ty ON ty.id = t.type_id
+    JOIN categories c ON c.id = t.category_id
+    ''',
+)
+
+
+def _migrate_category_ids(conn):
+    """type/category 문자열을 types/categories 의 정수 id 로 바꾸기"""
+    for trigger in ('trg_rollup_insert', 'trg_rollup_delete', 'trg_rollup_update'):
+        conn.execute(f'DROP TRIGGER {trigger}')
+    for index in ('idx_transactions_date_type_category', 'idx_transactions_date'):
+        conn.execute(f'DROP INDEX {index}')
+    conn.execute('ALTER TABLE transactions RENAME TO transactions_text')
+    conn.execute('DROP TABLE monthly_rollup')
+    for sql in CATEGORY_ID_SCHEMA:
+        conn.execute(sql)
+    
+    conn.executemany('INSERT INTO types (id, name) VALUES (?, ?)',
+                     [(type_id, name) for name, type_id in TRANSACTION_TYPES.items()])
+    conn.execute('INSERT OR IGNORE INTO types (name) SELECT DISTINCT type FROM transactions_text')
+    conn.executemany(
+        'INSERT INTO categories (type_id, name) VALUES (?, ?)',
+        [(TRANSACTION_TYPES[trans_type], name)
+         for trans_type, names in DEFAULT_CATEGORIES.items() for name in names]
+    )
+    conn.execute('''
+        INSERT OR IGNORE INTO categories (type_id, name)
+        SELECT DISTINCT ty.id, t.category
+        FROM transactions_text t
+        JOIN types ty ON ty.name = t.type
+        ORDER BY t.id
+    ''')
+    
+    # 트리거가 monthly_rollup 도 함께 채운다
+    conn.execute('''
+        INSERT INTO transactions (id, date, type_id, category_id, amount, remark)
+        SELECT t.id, t.date, ty.id, c.id, t.amount, t.remark
+        FROM transactions_text t
+        JOIN types ty ON ty.name = t.type
+        JOIN categories c ON c.type_id = ty.id AND c.name = t.category
+        ORDER BY t.date, t.id
+    ''')
+    # AUTOINCREMENT 번호는 예전 테이블에서 이어받는다 (삭제된 id 재사용 방지)
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'transactions'")
+    conn.execute("UPDATE sqlite_sequence SET name = 'transactions' WHERE name = 'transactions_text'")
+    conn.execute('DROP TABLE transactions_text')
+
+
+# 예전 ledger 행 -> transactions 행
+#   구분(section) 이 수입/지출이면 그대로, 아니면 금액이 있는 열로 판단
+#   카테고리는 title 에서 '수입.' / '지출_' 같은 구분 접두어를 뗀다
+#   금액은 revenue + expense (예전 데이터는 수입도 expense 열에 기록된 경우가 있다)
+LEDGER_TO_TRANSACTION = '''
+    SELECT serialNo,
+           date,
+           CASE WHEN section IN ('수입', '지출') THEN section
+                WHEN CAST(IFNULL(NULLIF(revenue, ''), 0) AS INTEGER) > 0
+                     AND CAST(IFNULL(NULLIF(expense, ''), 0) AS INTEGER) = 0 THEN '수입'
+                ELSE '지출' END AS type,
+           CASE WHEN IFNULL(title, '') = '' THEN '기타'
+                WHEN substr(title, 1, length(section) + 1) IN (section || '.', section || '_')
+                     THEN substr(title, length(section) + 2)
+                ELSE title END AS category,
+           CAST(IFNULL(NULLIF(revenue, ''), 0) AS INTEGER)
+               + CAST(IFNULL(NULLIF(expense, ''), 0) AS INTEGER) AS amount,
+           remark
+    FROM legacy.ledger
+'''
+
+
+def _ledger_amount_ok(column):
+    """ledger 금액 열이 0 이상 원 단위 정수로 바뀔 수 있는지 (비어 있으면 0)"""
+    return f'''({column} IS NULL OR {column} = ''
+        OR (typeof({column}) IN ('integer', 'real') AND {column} >= 0
+            AND {column} = CAST({column} AS INTEGER))
+        OR (typeof({column}) = 'text' AND {column} NOT GLOB '*[^0-9]*'))'''
+
+
+# transactions 로 옮길 수 있는 ledger 행 (날짜가 있고 금액이 0 이상 정수)
+LEDGER_CONVERTIBLE = f'''
+    date IS NOT NULL AND date <> ''
+    AND {_ledger_amount_ok('revenue')}
+    AND {_ledger_amount_ok('expense')}
+'''
+
+
+def ledger_to_transaction(date, section, title, revenue, expense, remark):
+    """예전 ledger 행 (금액은 원 단위 정수) -> (date, type, category, amount, remark)
+    
+    LEDGER_TO_TRANSACTION 과 같은 규칙
+    """
+    if section in ("수입", "지출"):
+        trans_type = section
+    else:
+        trans_type = "수입" if revenue > 0 and expense == 0 else "지출"
+    
+    category = title or "기타"
+    if section:
+        for sep in ('.', '_'):
+            if category.startswith(section + sep):
+                category = category[len(section) + 1:]
+                break
+    return date, trans_type, category, revenue + expense, remark
+
+
+@lru_cache(maxsize=4096)
+def check_date(value):
+    """거래 날짜 확인 - 'YYYY-MM-DD' 이고 달력에 있는 날짜면 그대로, 아니면 ValueError"""
+    try:
+        if Date.fromisoformat(value).isoformat() == value:
+            return value
+    except (TypeError, ValueError):
+        pass
+    raise ValueError(f"날짜 오류: {value!r}")
+
+
+def fts_prefix_query(text):
+    """검색어 -> FTS5 MATCH 식 (단어마다 따옴표로 감싼 접두어 검색)"""
+    terms = ['"{}"*'.format(term.replace('"', '""')) for term in text.split()]
+    return ' '.join(terms)
+
+
+class TransactionFilter:
+    """거래 조회 조건 (None/빈 값인 조건은 적용하지 않음)
+    
+    start, end:              'YYYY-MM-DD' (start <= date < end)
+    types:                   구분 이름들 ('수입', '지출')
+    categories:              카테고리 이름들
+    min_amount, max_amount:  원 단위 (둘 다 포함)
+    """
+    
+    def __init__(self, start=None, end=None, types=(), categories=(),
+                 min_amount=None, max_amount=None):
+        self.start = start
+        self.end = end
+        self.types = tuple(types)
+        self.categories = tuple(categories)
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+    
+    def __bool__(self):
+        return any((self.start, self.end, self.types, self.categories,
+                    self.min_amount is not None, self.max_amount is not None))
+    
+    def __eq__(self, other):
+        return isinstance(other, TransactionFilter) and vars(self) == vars(other)
+    
+    def __repr__(self):
+        conditions = ', '.join(f"{name}={value!r}" for name, value in vars(self).items()
+                               if value not in (None, ()))
+        return f"TransactionFilter({conditions})"
+
+
+# 조건 조회용 거래 행 (transaction_rows 와 같은 열, 조건은 transactions 의 정수 열에 건다)
+FILTERED_ROWS = '''
+    SELECT t.id, t.date, ty.name, c.name, t.amount, t.remark
+    FROM transactions t {indexed_by}
+    JOIN types ty ON ty.id = t.type_id
+    JOIN categories c ON c.id = t.category_id
+'''
+
+# 조건 조회 합계 (건수, 수입 합계, 지출 합계)
+FilterTotals = namedtuple('FilterTotals', 'count income expense')
+
+# 월별 집계 결과 (categories: ((카테고리, 지출합계), ...), 지출 큰 순)
+MonthlyOverview = namedtuple('MonthlyOverview', 'income expense balance categories')
+
+
+class DatabaseManager:
+    """데이터베이스 관리"""
+    
+    # 스키마 마이그레이션 (n 번째 항목 적용 후 user_version = n)
+    MIGRATIONS = [
+        # 1: 거래 테이블
+        ('''
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                type TEXT NOT NULL,
+                category TEXT NOT NULL,
+                amount REAL NOT NULL,
+                remark TEXT
+            )
+        ''',),
+        # 2: 월 범위 조회용 인덱스
+        (
+            'CREATE INDEX IF NOT EXISTS idx_transactions_date_type_category '
+            'ON transactions(date, type, category)',
+            'CREATE INDEX IF NOT EXISTS idx_transactions_type_date '
+            'ON transactions(type, date)',
+        ),
+        # 3: 월별 집계 테이블 (트리거로 쓰기 시점에 갱신)
+        (
+            '''
+            CREATE TABLE IF NOT EXISTS monthly_rollup (
+                year_month TEXT NOT NULL,
+                type TEXT NOT NULL,
+                category TEXT NOT NULL,
+                total REAL NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (year_month, type, category)
+            ) WITHOUT ROWID
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_insert
+            AFTER INSERT ON transactions
+            BEGIN
+                INSERT INTO monthly_rollup (year_month, type, category, total, count)
+                VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount, 1)
+                ON CONFLICT (year_month, type, category)
+                DO UPDATE SET total = total + excluded.total, count = count + 1;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_delete
+            AFTER DELETE ON transactions
+            BEGIN
+                UPDATE monthly_rollup SET total = total - OLD.amount, count = count - 1
+                WHERE year_month = substr(OLD.date, 1, 7)
+                  AND type = OLD.type AND category = OLD.category;
+                DELETE FROM monthly_rollup
+                WHERE year_month = substr(OLD.date, 1, 7)
+                  AND type = OLD.type AND category = OLD.category AND count <= 0;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_rollup_update
+            AFTER UPDATE OF date, type, category, amount ON transactions
+            BEGIN
+                UPDATE monthly_rollup SET total = total - OLD.amount, count = count - 1
+                WHERE year_month = substr(OLD.date, 1, 7)
+                  AND type = OLD.type AND category = OLD.category;
+                DELETE FROM monthly_rollup
+                WHERE year_month = substr(OLD.date, 1, 7)
+                  AND type = OLD.type AND category = OLD.category AND count <= 0;
+                INSERT INTO monthly_rollup (year_month, type, category, total, count)
+                VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount, 1)
+                ON CONFLICT (year_month, type, category)
+                DO UPDATE SET total = total + excluded.total, count = count + 1;
+            END
+            ''',
+            '''
+            INSERT OR REPLACE INTO monthly_rollup (year_month, type, category, total, count)
+            SELECT substr(date, 1, 7), type, category, SUM(amount), COUNT(*)
+            FROM transactions
+            GROUP BY 1, 2, 3
+            ''',
+        ),
+        # 4: 전체 보기 keyset 페이지네이션용 (date, id) 순서 인덱스
+        (
+            'CREATE INDEX IF NOT EXISTS idx_transactions_date '
+            'ON transactions(date)',
+        ),
+        # 5: 대량 가져오기 이어하기 지점
+        (
+            '''
+            CREATE TABLE IF NOT EXISTS import_checkpoints (
+                source TEXT PRIMARY KEY,
+                line_no INTEGER NOT NULL,
+                imported INTEGER NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+            ''',
+            # 월 합계는 monthly_rollup 에서 읽으므로 (type, date) 인덱스는 쓰기 비용만 늘린다
+            'DROP INDEX IF EXISTS idx_transactions_type_date',
+        ),
+        # 6: 금액을 원 단위 정수로 (REAL -> INTEGER + CHECK)
+        _migrate_integer_amounts,
+        # 7: 예전 ledger DB 이전 기록 (serialNo -> 거래 id)
+        (
+            '''
+            CREATE TABLE IF NOT EXISTS legacy_migrations (
+                source TEXT PRIMARY KEY,
+                migrated INTEGER NOT NULL,
+                rejected INTEGER NOT NULL,
+                migrated_at TEXT NOT NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS ledger_id_map (
+                source TEXT NOT NULL,
+                serial_no INTEGER NOT NULL,
+                transaction_id INTEGER NOT NULL,
+                PRIMARY KEY (source, serial_no)
+            ) WITHOUT ROWID
+            ''',
+        ),
+        # 8: 구분/카테고리를 정수 id 로 (types, categories 차원 테이블)
+        _migrate_category_ids,
+        # 9: 비고/카테고리 전문 검색 (FTS5, rowid = 거래 id)
+        (
+            '''
+            CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+                remark, category,
+                content = '',
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '1 2 3 4'
+            )
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_fts_insert
+            AFTER INSERT ON transactions
+            BEGIN
+                INSERT INTO transactions_fts (rowid, remark, category)
+                VALUES (NEW.id, NEW.remark,
+                        (SELECT name FROM categories WHERE id = NEW.category_id));
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_fts_delete
+            AFTER DELETE ON transactions
+            BEGIN
+                INSERT INTO transactions_fts (transactions_fts, rowid, remark, category)
+                VALUES ('delete', OLD.id, OLD.remark,
+                        (SELECT name FROM categories WHERE id = OLD.category_id));
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS trg_fts_update
+            AFTER UPDATE OF remark, category_id ON transactions
+            BEGIN
+                INSERT INTO transactions_fts (transactions_fts, rowid, remark, category)
+                VALUES ('delete', OLD.id, OLD.remark,
+                        (SELECT name FROM categories WHERE id = OLD.category_id));
+                INSERT INTO transactions_fts (rowid, remark, category)
+                VALUES (NEW.id, NEW.remark,
+                        (SELECT name FROM categories WHERE id = NEW.category_id));
+            END
+            ''',
+            '''
+            INSERT INTO transactions_fts (rowid, remark, category)
+            SELECT id, remark, category FROM transaction_rows
+            ''',
+        ),
+        # 10: 조건 조회용 인덱스 (드문 카테고리/금액 조건을 날짜 순으로 훑지 않도록)
+        (
+            'CREATE INDEX IF NOT EXISTS idx_transactions_category_date '
+            'ON transactions(category_id, date)',
+            'CREATE INDEX IF NOT EXISTS idx_transactions_amount '
+            'ON transactions(amount)',
+        ),
+        # 11: 지출 카테고리별 월 예산
+        (
+            '''
+            CREATE TABLE IF NOT EXISTS budgets (
+                category_id INTEGER PRIMARY KEY REFERENCES categories(id),
+                amount INTEGER NOT NULL CHECK (typeof(amount) = 'integer' AND amount >= 0)
+            )
+            ''',
+        ),
+        # 12: 거래 id -> 예전 serialNo 역방향 조회 (HL_CRUD 호환 계층)
+        (
+            'CREATE INDEX IF NOT EXISTS idx_ledger_id_map_transaction '
+            'ON ledger_id_map(transaction_id)',
+        ),
+    ]
+    
+    # 원본 거래에서 다시 계산한 월별 집계 (rollup 재구축/검증용)
+    ROLLUP_SOURCE = '''
+        SELECT substr(date, 1, 7) AS year_month, type_id, category_id, SUM(amount), COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3
+    '''
+    
+    # 대량 추가 중 잠시 끄는 행 단위 트리거 -> 끝난 뒤 한 번에 반영하는 SQL (? = 추가 전 마지막 id)
+    BULK_TRIGGERS = {
+        'trg_rollup_insert': '''
+            INSERT INTO monthly_rollup (year_month, type_id, category_id, total, count)
+            SELECT substr(date, 1, 7), type_id, category_id, SUM(amount), COUNT(*)
+            FROM transactions
+            WHERE id > ?
+            GROUP BY 1, 2, 3
+            ON CONFLICT (year_month, type_id, category_id)
+            DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+        ''',
+        'trg_fts_insert': '''
+            INSERT INTO transactions_fts (rowid, remark, category)
+            SELECT t.id, t.remark, c.name
+            FROM transactions t
+            JOIN categories c ON c.id = t.category_id
+            WHERE t.id > ?
+        ''',
+    }
+    
+    # 조건 조회 시 카테고리/금액 인덱스로 찾을지 판단하는 기준 건수
+    FILTER_PROBE_ROWS = 5000
+    
+    # 일치 건수가 이보다 많으면 관련도(bm25) 대신 최신순
+    # (bm25 는 일치하는 모든 문서로 통계를 내므로 흔한 단어일수록 느리고 변별력도 없다)
+    SEARCH_WINDOW = 2000
+    
+    # EXPLAIN QUERY PLAN 점검 대상 (월 전환 시 실행되는 쿼리)
+    HOT_QUERIES = {
+        'transactions_by_month':
+            'SELECT * FROM transaction_rows WHERE date >= ? AND date < ? ORDER BY date DESC, id DESC',
+        'transactions_page':
+            '''SELECT * FROM transaction_rows
+               WHERE (date, id) < (?, ?)
+               ORDER BY date DESC, id DESC
+               LIMIT ?''',
+        'transactions_page_after':
+            '''SELECT * FROM transaction_rows
+               WHERE (date, id) > (?, ?)
+               ORDER BY date ASC, id ASC
+               LIMIT ?''',
+        'search_window':
+            '''SELECT 1 FROM transactions_fts
+               WHERE transactions_fts MATCH ?
+               LIMIT 1 OFFSET ?''',
+        'search':
+            '''SELECT r.*
+               FROM (SELECT rowid AS id, rank FROM transactions_fts
+                     WHERE transactions_fts MATCH ?
+                     ORDER BY rank
+                     LIMIT ?) m
+               JOIN transaction_rows r ON r.id = m.id
+               ORDER BY m.rank''',
+        'search_recent':
+            '''SELECT r.*
+               FROM (SELECT rowid AS id FROM transactions_fts
+                     WHERE transactions_fts MATCH ?
+                     ORDER BY rowid DESC
+                     LIMIT ?) m
+               JOIN transaction_rows r ON r.id = m.id
+               ORDER BY m.id DESC''',
+        'month_overview':
+            f'''SELECT c.name,
+                       SUM(CASE WHEN r.type_id = {INCOME_TYPE_ID} THEN r.total ELSE 0 END),
+                       SUM(CASE WHEN r.type_id = {EXPENSE_TYPE_ID} THEN r.total ELSE 0 END)
+                FROM monthly_rollup r
+                JOIN categories c ON c.id = r.category_id
+                WHERE r.year_month = ?
+                GROUP BY r.category_id''',
+    }
+    
+    def __init__(self, db_path=None, legacy_ledger_path=None, cache_bytes=QUERY_CACHE_BYTES,
+                 profiler=None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        
+        # 프로파일링은 켰을 때만 (profiler 인자 또는 HL_PROFILE 환경 변수)
+        self.profiler = profiler if profiler is not None else profiler_from_env()
+        if self.profiler is not None:
+            self.engine = ConnectionManager(self.db_path,
+                                            factory=connection_factory(self.profiler))
+        else:
+            self.engine = ConnectionManager(self.db_path)
+        self.init_database()
+        
+        # 거래를 바꾼 트랜잭션이 끝날 때마다 1씩 증가 (조회 결과 캐시 무효화용)
+        self.data_version = 0
+        
+        # 쓰기 리스너 - listener(months): 바뀐 월 집합, None 이면 전체
+        self._write_listeners = []
+        
+        # 월 단위 조회 결과 캐시 (쓰기가 있으면 그 월 항목만 버린다)
+        self.cache = QueryCache(cache_bytes)
+        self.add_write_listener(self.cache.invalidate)
+        if self.profiler is not None:
+            self.profiler.add_source('cache', self.cache_stats)
+        
+        # (구분, 카테고리 이름) -> (type_id, category_id), 커밋된 것만 보관
+        self._category_ids = {}
+        self._load_categories()
+        
+        # 예전 ledger DB 가 있으면 처음 한 번만 옮긴다
+        if legacy_ledger_path and os.path.exists(legacy_ledger_path):
+            self.migrate_ledger(legacy_ledger_path)
+    
+    def add_write_listener(self, listener):
+        """거래가 바뀌면 listener(months) 호출 - 트랜잭션이 끝난 뒤, 바뀐 월 집합 (None 이면 전체)"""
+        self._write_listeners.append(listener)
+    
+    def remove_write_listener(self, listener):
+        self._write_listeners.remove(listener)
+    
+    def _written(self, months=None):
+        """쓰기 알림 - 가장 바깥 트랜잭션이 끝날 때까지 미룬다"""
+        months = None if months is None else frozenset(months)
+        self.engine.call_after_transaction(lambda: self._notify_write(months))
+    
+    def _notify_write(self, months):
+        self.data_version += 1
+        for listener in list(self._write_listeners):
+            listener(months)
+    
+    def cache_stats(self):
+        """조회 결과 캐시 적중/실패 횟수와 사용량"""
+        return self.cache.stats()
+    
+    def init_database(self):
+        """데이터베이스 초기화 (스키마 마이그레이션)
+        
+        user_version 이 이미 최신이면 PRAGMA 한 번 읽고 끝낸다 (쓰기 트랜잭션 없음).
+        """
+        with self.engine.connection() as conn:
+            if get_schema_version(conn) >= len(self.MIGRATIONS):
+                return
+        with self.engine.transaction() as conn:
+            migrate(conn, self.MIGRATIONS)
+    
+    def _load_categories(self):
+        rows = self.engine.execute('''
+            SELECT ty.name, c.name, c.type_id, c.id
+            FROM categories c
+            JOIN types ty ON ty.id = c.type_id
+            ORDER BY c.id
+        ''')
+        self._category_ids = {(trans_type, name): (type_id, category_id)
+                              for trans_type, name, type_id, category_id in rows}
+    
+    def get_categories(self, trans_type):
+        """구분의 카테고리 이름 목록 (만든 순서)"""
+        rows = self.engine.execute('''
+            SELECT c.name
+            FROM categories c
+            JOIN types ty ON ty.id = c.type_id
+            WHERE ty.name = ?
+            ORDER BY c.id
+        ''', (trans_type,))
+        return [row[0] for row in rows]
+    
+    def add_category(self, trans_type, name):
+        """카테고리 추가 (이미 있으면 그대로) - (type_id, category_id) 반환"""
+        type_id = TRANSACTION_TYPES.get(trans_type)
+        if type_id is None:
+            raise ValueError(f"구분 오류: {trans_type!r}")
+        
+        outermost = not self.engine.transaction_depth()
+        with self.engine.transaction() as conn:
+            conn.execute('INSERT OR IGNORE INTO categories (type_id, name) VALUES (?, ?)',
+                         (type_id, name))
+            category_id = conn.execute(
+                'SELECT id FROM categories WHERE type_id = ? AND name = ?', (type_id, name)
+            ).fetchone()[0]
+        
+        # 바깥 트랜잭션이 rollback 될 수 있으면 캐시하지 않는다
+        if outermost:
+            self._category_ids[(trans_type, name)] = (type_id, category_id)
+        return type_id, category_id
+    
+    def category_ids(self, trans_type, category):
+        """(구분, 카테고리 이름) -> (type_id, category_id), 없는 카테고리는 새로 만든다"""
+        ids = self._category_ids.get((trans_type, category))
+        if ids is None:
+            ids = self.add_category(trans_type, category)
+        return ids
+    
+    def migrate_ledger(self, ledger_path):
+        """예전 HL_CRUD ledger DB 를 transactions 로 한 번에 옮기기
+        
+        이미 옮긴 DB 면 아무것도 하지 않고 None, 옮겼으면 (옮긴 건수, 옮기지 못한 건수).
+        옮기지 못한 행은 transactions_rejected 에 남는다.
+        """
+        source = os.path.abspath(ledger_path)
+        if self.engine.execute('SELECT 1 FROM legacy_migrations WHERE source = ?', (source,)):
+            return None
+        
+        with self.engine.connection() as conn:
+            conn.execute('ATTACH DATABASE ? AS legacy', (source,))
+            try:
+                has_ledger = conn.execute(
+                    "SELECT 1 FROM legacy.sqlite_master WHERE type = 'table' AND name = 'ledger'"
+                ).fetchone()
+                
+                with self.engine.transaction():
+                    migrated = rejected = 0
+                    if has_ledger:
+                        # AUTOINCREMENT 이므로 새 id 는 sqlite_sequence 다음 번호부터
+                        first_id = conn.execute('''
+                            SELECT MAX(IFNULL((SELECT seq FROM sqlite_sequence
+                                               WHERE name = 'transactions'), 0),
+                                       IFNULL((SELECT MAX(id) FROM transactions), 0))
+                        ''').fetchone()[0]
+                        
+                        conn.execute(f'''
+                            INSERT OR IGNORE INTO categories (type_id, name)
+                            SELECT DISTINCT ty.id, m.category
+                            FROM ({LEDGER_TO_TRANSACTION} WHERE {LEDGER_CONVERTIBLE}) m
+                            JOIN types ty ON ty.name = m.type
+                        ''')
+                        
+                        # 트리거가 monthly_rollup 도 함께 채운다
+                        migrated = conn.execute(f'''
+                            INSERT INTO transactions (date, type_id, category_id, amount, remark)
+                            SELECT m.date, ty.id, c.id, m.amount, m.remark
+                            FROM ({LEDGER_TO_TRANSACTION} WHERE {LEDGER_CONVERTIBLE}) m
+                            JOIN types ty ON ty.name = m.type
+                            JOIN categories c ON c.type_id = ty.id AND c.name = m.category
+                            ORDER BY m.serialNo
+                        ''').rowcount
+                        
+                        # 같은 순서로 넣었으므로 serialNo 순서 = 새 id 순서
+                        conn.execute(f'''
+                            INSERT INTO ledger_id_map (source, serial_no, transaction_id)
+                            SELECT ?, serialNo, ? + ROW_NUMBER() OVER (ORDER BY serialNo)
+                            FROM legacy.ledger
+                            WHERE {LEDGER_CONVERTIBLE}
+                        ''', (source, first_id))
+                        
+                        rejected = conn.execute(f'''
+                            INSERT INTO transactions_rejected (date, type, category, amount, remark, reason)
+                            SELECT date, section, title, quote(revenue) || '/' || quote(expense), remark,
+                                   'ledger serialNo=' || serialNo
+                            FROM legacy.ledger
+                            WHERE NOT ({LEDGER_CONVERTIBLE})
+                        ''').rowcount
+                    
+                    conn.execute(
+                        'INSERT INTO legacy_migrations (source, migrated, rejected, migrated_at) '
+                        'VALUES (?, ?, ?, ?)',
+                        (source, migrated, rejected, datetime.now().isoformat(timespec='seconds'))
+                    )
+            finally:
+                conn.execute('DETACH DATABASE legacy')
+        
+        self._written()
+        return migrated, rejected
+    
+    def check_query_plans(self):
+        """주요 쿼리의 실행 계획 점검 - {쿼리명: [전체 스캔 단계]} (비어 있으면 정상)"""
+        year_month = datetime.now().strftime('%Y-%m')
+        params = {
+            'transactions_by_month': month_range(year_month),
+            'transactions_page': ('9999-12-31', 0, 200),
+            'transactions_page_after': ('0000-01-01', 0, 200),
+            'search_window': ('"a"*', 1999),
+            'search': ('"a"*', 100),
+            'search_recent': ('"a"*', 100),
+            'month_overview': (year_month,),
+        }
+        with self.engine.connection() as conn:
+            return {name: find_full_scans(conn, sql, params[name])
+                    for name, sql in self.HOT_QUERIES.items()}
+    
+    def rebuild_rollup(self):
+        """월별 집계 테이블을 원본 거래로부터 다시 생성"""
+        with self.engine.transaction() as conn:
+            conn.execute('DELETE FROM monthly_rollup')
+            conn.execute(
+                'INSERT INTO monthly_rollup (year_month, type_id, category_id, total, count) '
+                + self.ROLLUP_SOURCE
+            )
+        self._written()
+    
+    def verify_amounts(self):
+        """금액 검증 - 정수로 옮기지 못한 행 [(id, date, type, category, amount, remark, reason)]"""
+        return self.engine.execute(
+            'SELECT * FROM transactions_rejected ORDER BY id'
+        ) + self.engine.execute(
+            "SELECT *, 'amount: ' || quote(amount) FROM transaction_rows "
+            "WHERE typeof(amount) <> 'integer' OR amount < 0"
+        )
+    
+    def verify_rollup(self):
+        """월별 집계 검증 - 원본과 다른 (year_month, type, category) 목록 (비어 있으면 정상)"""
+        rows = self.engine.execute(f'''
+            SELECT m.year_month, ty.name, c.name FROM (
+                SELECT year_month, type_id, category_id FROM (
+                    SELECT * FROM ({self.ROLLUP_SOURCE})
+                    EXCEPT
+                    SELECT year_month, type_id, category_id, total, count FROM monthly_rollup
+                )
+                UNION
+                SELECT year_month, type_id, category_id FROM (
+                    SELECT year_month, type_id, category_id, total, count FROM monthly_rollup
+                    EXCEPT
+                    SELECT * FROM ({self.ROLLUP_SOURCE})
+                )
+            ) m
+            LEFT JOIN types ty ON ty.id = m.type_id
+            LEFT JOIN categories c ON c.id = m.category_id
+        ''')
+        return sorted(rows)
+    
+    def close(self):
+        """연결 정리"""
+        self.engine.close()
+    
+    def insert_transaction(self, date, trans_type, category, amount, remark):
+        """거래 추가 - 새 거래 id 반환 (잘못된 날짜는 ValueError)"""
+        check_date(date)
+        type_id, category_id = self.category_ids(trans_type, category)
+        with self.engine.transaction() as conn:
+            cursor = conn.execute(
+                'INSERT INTO transactions (date, type_id, category_id, amount, remark) VALUES (?, ?, ?, ?, ?)',
+                (date, type_id, category_id, amount, remark)
+            )
+        self._written({date[:7]})
+        return cursor.lastrowid
+    
+    def insert_transactions(self, rows):
+        """여러 거래를 한 트랜잭션으로 추가 - rows: (date, type, category, amount, remark)"""
+        rows = list(rows)
+        for row in rows:
+            check_date(row[0])
+        with self.engine.transaction() as conn:
+            ids = {key: self.category_ids(*key) for key in {(row[1], row[2]) for row in rows}}
+            cursor = conn.executemany(
+                'INSERT INTO transactions (date, type_id, category_id, amount, remark) VALUES (?, ?, ?, ?, ?)',
+                ((date, *ids[trans_type, category], amount, remark)
+                 for date, trans_type, category, amount, remark in rows)
+            )
+        self._written({row[0][:7] for row in rows})
+        return cursor.rowcount
+    
+    def bulk_insert_transactions(self, rows):
+        """대량 추가 - insert_transactions 와 같지만 행마다 도는 월별 집계/FTS 트리거 대신
+        추가한 id 범위를 한 번에 집계해 반영한다 (가져오기용)
+        
+        트리거는 같은 트랜잭션 안에서 지웠다가 원래 정의대로 다시 만들므로
+        다른 연결에는 트리거가 없는 순간이 보이지 않고, 실패하면 함께 rollback 된다.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        for row in rows:
+            check_date(row[0])
+        
+        with self.engine.transaction() as conn:
+            if not conn.in_transaction:
+                # DROP TRIGGER 는 sqlite3 가 트랜잭션을 자동으로 시작하지 않는다
+                conn.execute('BEGIN IMMEDIATE')
+            ids = {key: self.category_ids(*key) for key in {(row[1], row[2]) for row in rows}}
+            last_id = conn.execute('''
+                SELECT MAX(IFNULL((SELECT seq FROM sqlite_sequence WHERE name = 'transactions'), 0),
+                           IFNULL((SELECT MAX(id) FROM transactions), 0))
+            ''').fetchone()[0]
+            triggers = conn.execute(
+                f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+                f"AND name IN ({', '.join('?' * len(self.BULK_TRIGGERS))})",
+                tuple(self.BULK_TRIGGERS)
+            ).fetchall()
+            
+            for name, _ in triggers:
+                conn.execute(f'DROP TRIGGER {name}')
+            cursor = conn.executemany(
+                'INSERT INTO transactions (date, type_id, category_id, amount, remark) VALUES (?, ?, ?, ?, ?)',
+                ((date, *ids[trans_type, category], amount, remark)
+                 for date, trans_type, category, amount, remark in rows)
+            )
+            for name, sql in triggers:
+                conn.execute(self.BULK_TRIGGERS[name], (last_id,))
+                conn.execute(sql)
+        self._written({row[0][:7] for row in rows})
+        return cursor.rowcount
+    
+    def get_all_transactions(self):
+        """모든 거래 조회"""
+        return self.engine.execute('SELECT * FROM transaction_rows ORDER BY date DESC, id DESC')
+    
+    def iter_transactions(self, start=None, end=None, batch_size=5000):
+        """거래를 날짜순으로 batch_size 건씩 읽어 하나씩 생성 (start <= date < end)"""
+        return self.iter_filtered(TransactionFilter(start, end), batch_size)
+    
+    def _filter_category_ids(self, flt):
+        """구분/카테고리 조건 -> category_id 목록 (조건이 없으면 None)
+        
+        카테고리는 구분에 속하므로 구분 조건도 category_id 로 바꿔 idx_transactions_category_date 를 쓴다.
+        """
+        if not flt.types and not flt.categories:
+            return None
+        
+        conditions, params = [], []
+        if flt.types:
+            conditions.append(f"ty.name IN ({', '.join('?' * len(flt.types))})")
+            params.extend(flt.types)
+        if flt.categories:
+            conditions.append(f"c.name IN ({', '.join('?' * len(flt.categories))})")
+            params.extend(flt.categories)
+        rows = self.engine.execute(
+            f"SELECT c.id FROM categories c JOIN types ty ON ty.id = c.type_id "
+            f"WHERE {' AND '.join(conditions)}",
+            params
+        )
+        return [row[0] for row in rows]
+    
+    def _filter_where(self, flt, conditions=(), params=()):
+        """TransactionFilter -> (WHERE 절, 파라미터, 기준 인덱스)
+        
+        date 는 반열린 범위, 구분/카테고리는 category_id IN 으로 바꿔 인덱스를 탈 수 있게 한다.
+        기준 인덱스는 _choose_index 가 고른 INDEXED BY 대상 (None 이면 SQLite 에 맡김)
+        """
+        conditions, params = list(conditions), list(params)
+        index = None
+        if flt:
+            category_ids = self._filter_category_ids(flt)
+            index = self._choose_index(flt, category_ids)
+            
+            if flt.start:
+                conditions.append('t.date >= ?')
+                params.append(flt.start)
+            if flt.end:
+                conditions.append('t.date < ?')
+                params.append(flt.end)
+            if category_ids is not None:
+                conditions.append(f"t.category_id IN ({', '.join('?' * len(category_ids))})"
+                                  if category_ids else '0')
+                params.extend(category_ids)
+            if flt.min_amount is not None:
+                conditions.append('t.amount >= ?')
+                params.append(flt.min_amount)
+            if flt.max_amount is not None:
+                conditions.append('t.amount <= ?')
+                params.append(flt.max_amount)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params, index
+    
+    def _choose_index(self, flt, category_ids):
+        """조회를 이끌 인덱스 고르기
+        
+        목록은 date DESC 순이므로 기본은 날짜 인덱스를 훑으며 조건을 거른다.
+        일치하는 행이 드문 조건은 그 방식으로는 많은 행을 읽어야 하므로,
+        카테고리/금액 인덱스에서 FILTER_PROBE_ROWS 건까지만 세어 보고
+        그보다 적으면 가장 적은 쪽 인덱스로 찾아 정렬한다.
+        """
+        probes = []
+        if category_ids:
+            conditions = [f"category_id IN ({', '.join('?' * len(category_ids))})"]
+            params = list(category_ids)
+            if flt.start:
+                conditions.append('date >= ?')
+                params.append(flt.start)
+            if flt.end:
+                conditions.append('date < ?')
+                params.append(flt.end)
+            probes.append(('idx_transactions_category_date', conditions, params))
+        if flt.min_amount is not None or flt.max_amount is not None:
+            conditions, params = [], []
+            if flt.min_amount is not None:
+                conditions.append('amount >= ?')
+                params.append(flt.min_amount)
+            if flt.max_amount is not None:
+                conditions.append('amount <= ?')
+                params.append(flt.max_amount)
+            probes.append(('idx_transactions_amount', conditions, params))
+        
+        if not probes:
+            return None
+        
+        # 일치하는 행이 많으면 날짜 인덱스 (category_id IN 만 보고 SQLite 가 카테고리 인덱스를 고르면
+        # 일치하는 행 전부를 정렬하게 된다)
+        best, best_count = 'idx_transactions_date', self.FILTER_PROBE_ROWS
+        for index, conditions, params in probes:
+            count = self.engine.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM transactions INDEXED BY {index} "
+                f"WHERE {' AND '.join(conditions)} LIMIT ?)",
+                params + [self.FILTER_PROBE_ROWS]
+            )[0][0]
+            if count < best_count:
+                best, best_count = index, count
+        return best
+    
+    def _filter_query(self, flt, conditions=(), params=()):
+        """조건 조회 SELECT 문 (ORDER BY 전까지)과 파라미터"""
+        where, params, index = self._filter_where(flt, conditions, params)
+        indexed_by = f'INDEXED BY {index}' if index else ''
+        return f'{FILTERED_ROWS.format(indexed_by=indexed_by)} {where}', params
+    
+    def iter_filtered(self, flt=None, batch_size=5000):
+        """조건에 맞는 거래를 날짜순으로 batch_size 건씩 읽어 하나씩 생성
+        
+        전체를 메모리에 올리지 않으므로 테이블 크기와 상관없이 메모리 사용량이 일정하다.
+        """
+        sql, params = self._filter_query(flt)
+        with self.engine.connection() as conn:
+            cursor = conn.execute(f'{sql} ORDER BY t.date, t.id', params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+    
+    def filter_totals(self, flt=None):
+        """조건에 맞는 거래의 건수와 수입/지출 합계"""
+        where, params, _ = self._filter_where(flt)
+        count, income, expense = self.engine.execute(f'''
+            SELECT COUNT(*),
+                   IFNULL(SUM(CASE WHEN t.type_id = {INCOME_TYPE_ID} THEN t.amount END), 0),
+                   IFNULL(SUM(CASE WHEN t.type_id = {EXPENSE_TYPE_ID} THEN t.amount END), 0)
+            FROM transactions t {where}
+        ''', params)[0]
+        return FilterTotals(count, income, expense)
+    
+    def explain_filter(self, flt=None):
+        """조건 조회 첫 페이지의 실행 계획 (EXPLAIN QUERY PLAN detail 목록)"""
+        sql, params = self._filter_query(flt)
+        with self.engine.connection() as conn:
+            return explain(conn, f'{sql} ORDER BY t.date DESC, t.id DESC LIMIT ?', params + [200])
+    
+    def get_transactions_page(self, before=None, limit=200, flt=None):
+        """전체 거래 한 페이지 (date DESC, id DESC 순, keyset 페이지네이션)
+        
+        before: 직전 페이지 마지막 행의 (date, id) - None 이면 첫 페이지
+        flt: TransactionFilter - 주면 조건에 맞는 거래만
+        """
+        if flt:
+            conditions, params = [], []
+            if before is not None:
+                conditions.append('(t.date, t.id) < (?, ?)')
+                params.extend(before)
+            sql, params = self._filter_query(flt, conditions, params)
+            return self.engine.execute(
+                f'{sql} ORDER BY t.date DESC, t.id DESC LIMIT ?',
+                params + [limit]
+            )
+        if before is None:
+            return self.engine.execute(
+                'SELECT * FROM transaction_rows ORDER BY date DESC, id DESC LIMIT ?',
+                (limit,)
+            )
+        return self.engine.execute(
+            self.HOT_QUERIES['transactions_page'],
+            (before[0], before[1], limit)
+        )
+    
+    def get_transactions_page_after(self, after, limit=200, flt=None):
+        """after (date, id) 보다 최신인 거래 한 페이지 (위로 스크롤용, date DESC 순 반환)"""
+        if flt:
+            sql, params = self._filter_query(flt, ['(t.date, t.id) > (?, ?)'], after)
+            rows = self.engine.execute(
+                f'{sql} ORDER BY t.date ASC, t.id ASC LIMIT ?',
+                params + [limit]
+            )
+        else:
+            rows = self.engine.execute(
+                self.HOT_QUERIES['transactions_page_after'],
+                (after[0], after[1], limit)
+            )
+        rows.reverse()
+        return rows
+    
+    def count_transactions(self):
+        """전체 거래 건수 (월별 집계 테이블 사용)"""
+        return self.engine.execute('SELECT IFNULL(SUM(count), 0) FROM monthly_rollup')[0][0]
+    
+    def get_transactions_by_month(self, year_month):
+        """월별 거래 조회"""
+        return self.engine.execute(
+            self.HOT_QUERIES['transactions_by_month'],
+            month_range(year_month)
+        )
+    
+    def update_transaction(self, trans_id, date, trans_type, category, amount, remark):
+        """거래 수정 (잘못된 날짜는 ValueError)"""
+        check_date(date)
+        type_id, category_id = self.category_ids(trans_type, category)
+        with self.engine.transaction() as conn:
+            old_months = self._months_of(conn, trans_id)
+            conn.execute(
+                'UPDATE transactions SET date=?, type_id=?, category_id=?, amount=?, remark=? WHERE id=?',
+                (date, type_id, category_id, amount, remark, trans_id)
+            )
+        self._written(old_months | {date[:7]})
+    
+    def delete_transaction(self, trans_id):
+        """거래 삭제"""
+        with self.engine.transaction() as conn:
+            old_months = self._months_of(conn, trans_id)
+            conn.execute('DELETE FROM transactions WHERE id=?', (trans_id,))
+        self._written(old_months)
+    
+    @staticmethod
+    def _months_of(conn, trans_id):
+        """거래가 속한 월 (없는 id 면 빈 집합)"""
+        row = conn.execute('SELECT date FROM transactions WHERE id=?', (trans_id,)).fetchone()
+        return {row[0][:7]} if row else set()
+    
+    def search_transactions(self, text, limit=100):
+        """비고/카테고리 검색 - 관련도 순 최대 limit 건
+        
+        공백으로 나눈 단어마다 접두어 일치 (모든 단어가 있어야 함). 예: '쿠팡 와' -> 쿠팡* AND 와*
+        일치 건수가 SEARCH_WINDOW 를 넘으면 관련도 대신 최근에 입력한 순서로 돌려준다.
+        """
+        query = fts_prefix_query(text)
+        if not query:
+            return []
+        
+        with self.engine.connection() as conn:
+            too_many = conn.execute(self.HOT_QUERIES['search_window'],
+                                    (query, self.SEARCH_WINDOW)).fetchone()
+            sql = self.HOT_QUERIES['search_recent' if too_many else 'search']
+            return conn.execute(sql, (query, limit)).fetchall()
+    
+    def get_budgets(self):
+        """월 예산 [(지출 카테고리, 금액)] (카테고리 만든 순서)"""
+        return self.engine.execute('''
+            SELECT c.name, b.amount
+            FROM budgets b
+            JOIN categories c ON c.id = b.category_id
+            ORDER BY c.id
+        ''')
+    
+    def set_budgets(self, budgets):
+        """월 예산 저장 (있으면 덮어씀, 한 트랜잭션) - budgets: [(지출 카테고리, 금액)]
+        
+        카테고리는 만들지 않는다 - 없는 지출 카테고리가 있으면 아무것도 저장하지 않고 ValueError
+        """
+        rows = []
+        unknown = []
+        for category, amount in budgets:
+            ids = self._category_ids.get(('지출', category))
+            if ids is None:
+                unknown.append(category)
+            else:
+                rows.append((ids[1], amount))
+        if unknown:
+            raise ValueError(f"없는 지출 카테고리: {', '.join(unknown)}")
+        
+        with self.engine.transaction() as conn:
+            conn.executemany(
+                'INSERT INTO budgets (category_id, amount) VALUES (?, ?) '
+                'ON CONFLICT (category_id) DO UPDATE SET amount = excluded.amount',
+                rows
+            )
+    
+    def delete_budget(self, category):
+        """월 예산 삭제"""
+        ids = self._category_ids.get(('지출', category))
+        if ids is None:
+            return
+        with self.engine.transaction() as conn:
+            conn.execute('DELETE FROM budgets WHERE category_id = ?', (ids[1],))
+    
+    def get_months(self):
+        """거래가 있는 월 목록 (최근 월부터)"""
+        def load():
+            rows = self.engine.execute('SELECT DISTINCT year_month FROM monthly_rollup ORDER BY 1 DESC')
+            return tuple(row[0] for row in rows)
+        
+        return list(self.cache.get_or_compute(('months',), load))
+    
+    def get_month_overview(self, year_month):
+        """월별 수입/지출/잔액과 카테고리별 지출 (한 번의 집계 쿼리, 캐시 사용)"""
+        def load():
+            rows = self.engine.execute(
+                self.HOT_QUERIES['month_overview'],
+                (year_month,)
+            )
+            
+            income = sum(row[1] for row in rows)
+            expense = sum(row[2] for row in rows)
+            categories = tuple(sorted(((category, spent) for category, _, spent in rows if spent),
+                                      key=lambda item: item[1], reverse=True))
+            
+            return MonthlyOverview(income, expense, income - expense, categories)
+        
+        return self.cache.get_or_compute(('month_overview', year_month), load, {year_month})
+    
+    def get_monthly_summary(self, year_month):
+        """월별 합계"""
+        overview = self.get_month_overview(year_month)
+        return overview.income, overview.expense
+    
+    def get_expense_by_category(self, year_month):
+        """카테고리별 지출 통계"""
+        return self.get_month_overview(year_month).categories
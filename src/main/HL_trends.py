@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+월별 추이 분석
+monthly_rollup 을 윈도 함수로 한 번 훑어 월별 수입/지출/잔액 추이,
+전월/전년 동월 대비 증감, 카테고리별 이동평균을 계산한다.
+결과는 조회 범위별로 캐시하고 거래가 바뀌면(data_version) 버린다.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+try:
+    from .HL_engine import month_range
+    from .HL_repository import INCOME_TYPE_ID, EXPENSE_TYPE_ID
+except ImportError:
+    from HL_engine import month_range
+    from HL_repository import INCOME_TYPE_ID, EXPENSE_TYPE_ID
+
+
+# 한 달 추이 (*_mom: 전월 대비, *_yoy: 전년 동월 대비 증감 - 비교할 달이 기록 이전이면 None)
+MonthlyTrend = namedtuple('MonthlyTrend', [
+    'year_month', 'income', 'expense', 'balance', 'cumulative',
+    'income_mom', 'expense_mom', 'balance_mom',
+    'income_yoy', 'expense_yoy', 'balance_yoy',
+    'expense_average',
+])
+
+# 카테고리 하나의 월별 합계와 이동평균 (report.months 와 같은 순서)
+CategoryTrend = namedtuple('CategoryTrend', 'type category totals averages')
+
+TrendReport = namedtuple('TrendReport', 'start end window months categories')
+
+
+# 기록 첫 달(또는 전년 비교에 필요한 달) 부터 end 까지 빈 달 없는 월 달력
+_CALENDAR = '''
+    WITH RECURSIVE months(year_month) AS (
+        SELECT MIN(IFNULL((SELECT MIN(year_month) FROM monthly_rollup), :lead), :lead)
+        UNION ALL
+        SELECT strftime('%Y-%m', year_month || '-01', '+1 month')
+        FROM months
+        WHERE year_month < :end
+    )
+'''
+
+MONTHLY_TRENDS = _CALENDAR + f'''
+    , totals AS (
+        SELECT m.year_month,
+               IFNULL(SUM(CASE WHEN r.type_id = {INCOME_TYPE_ID} THEN r.total END), 0) AS income,
+               IFNULL(SUM(CASE WHEN r.type_id = {EXPENSE_TYPE_ID} THEN r.total END), 0) AS expense
+        FROM months m
+        LEFT JOIN monthly_rollup r ON r.year_month = m.year_month
+        GROUP BY m.year_month
+    ), series AS (
+        SELECT year_month, income, expense,
+               SUM(income - expense) OVER w AS cumulative,
+               LAG(year_month, 1) OVER w AS prev_month,
+               LAG(income, 1) OVER w AS prev_income,
+               LAG(expense, 1) OVER w AS prev_expense,
+               LAG(year_month, 12) OVER w AS last_year_month,
+               LAG(income, 12) OVER w AS last_year_income,
+               LAG(expense, 12) OVER w AS last_year_expense,
+               AVG(expense) OVER (ORDER BY year_month
+                                  ROWS BETWEEN {{preceding}} PRECEDING AND CURRENT ROW) AS expense_average
+        FROM totals
+        WINDOW w AS (ORDER BY year_month)
+    )
+    SELECT year_month, income, expense, cumulative,
+           CASE WHEN prev_month >= :first THEN prev_income END,
+           CASE WHEN prev_month >= :first THEN prev_expense END,
+           CASE WHEN last_year_month >= :first THEN last_year_income END,
+           CASE WHEN last_year_month >= :first THEN last_year_expense END,
+           expense_average
+    FROM series
+    WHERE year_month >= :start
+    ORDER BY year_month
+'''
+
+# 범위 안에 기록이 있는 카테고리 x 월 격자 위에서 이동평균 (기록 없는 달은 0)
+CATEGORY_TRENDS = '''
+    WITH RECURSIVE months(year_month) AS (
+        SELECT :lead
+        UNION ALL
+        SELECT strftime('%Y-%m', year_month || '-01', '+1 month')
+        FROM months
+        WHERE year_month < :end
+    ), active AS (
+        SELECT DISTINCT type_id, category_id
+        FROM monthly_rollup
+        WHERE year_month BETWEEN :start AND :end
+    ), grid AS (
+        SELECT m.year_month, a.type_id, a.category_id, IFNULL(r.total, 0) AS total
+        FROM active a
+        CROSS JOIN months m
+        LEFT JOIN monthly_rollup r
+               ON r.year_month = m.year_month
+              AND r.type_id = a.type_id
+              AND r.category_id = a.category_id
+    ), moving AS (
+        SELECT year_month, type_id, category_id, total,
+               AVG(total) OVER (PARTITION BY category_id ORDER BY year_month
+                                ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW) AS average
+        FROM grid
+    )
+    SELECT ty.name, c.name, mv.year_month, mv.total, mv.average
+    FROM moving mv
+    JOIN categories c ON c.id = mv.category_id
+    JOIN types ty ON ty.id = mv.type_id
+    WHERE mv.year_month >= :start
+    ORDER BY mv.type_id, mv.category_id, mv.year_month
+'''
+
+
+def shift_month(year_month, months):
+    """'YYYY-MM' 에서 months 개월 이동"""
+    year, month = (int(part) for part in year_month.split('-')[:2])
+    index = year * 12 + month - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _check_window(window):
+    if not isinstance(window, int) or window < 1:
+        raise ValueError(f"이동평균 기간은 1개월 이상이어야 합니다: {window!r}")
+
+
+def _delta(current, previous):
+    return None if previous is None else current - previous
+
+
+class TrendAnalyzer:
+    """월별 추이 계산기
+
+    report(start, end) 는 start~end ('YYYY-MM', 양끝 포함) 의 추이를 돌려준다.
+    누적 잔액은 기록 전체를 기준으로, 이동평균은 최근 window 개월로 계산한다.
+    """
+
+    def __init__(self, db, window=3, cache_size=32):
+        _check_window(window)
+        self.db = db
+        self.window = window
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()     # (start, end, window) -> TrendReport
+        self._version = None            # 캐시를 채울 때의 db.data_version
+        self._lock = threading.Lock()
+
+    def report(self, start, end, window=None):
+        """start~end 월별 추이 (같은 범위는 데이터가 바뀌기 전까지 캐시 사용)"""
+        window = window or self.window
+        _check_window(window)
+        # 잘못된 월 형식은 여기서 ValueError
+        month_range(start)
+        month_range(end)
+        start, end = shift_month(start, 0), shift_month(end, 0)
+        if start > end:
+            raise ValueError(f"시작 월이 종료 월보다 늦습니다: {start} > {end}")
+
+        key = (start, end, window)
+        version = self.db.data_version
+        with self._lock:
+            if self._version != version:
+                self._cache.clear()
+                self._version = version
+            report = self._cache.get(key)
+            if report is not None:
+                self._cache.move_to_end(key)
+                return report
+
+        report = self._compute(start, end, window)
+
+        with self._lock:
+            if self._version == version:
+                self._cache[key] = report
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return report
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._version = None
+
+    def _compute(self, start, end, window):
+        preceding = window - 1
+        params = {'start': start, 'end': end, 'lead': shift_month(start, -12)}
+
+        with self.db.engine.connection() as conn:
+            first = conn.execute('SELECT MIN(year_month) FROM monthly_rollup').fetchone()[0]
+            params['first'] = first or start
+            monthly = conn.execute(MONTHLY_TRENDS.format(preceding=preceding), params).fetchall()
+
+            params['lead'] = shift_month(start, -preceding)
+            category_rows = conn.execute(CATEGORY_TRENDS.format(preceding=preceding),
+                                         params).fetchall()
+
+        months = []
+        for (year_month, income, expense, cumulative,
+             prev_income, prev_expense, last_income, last_expense, average) in monthly:
+            balance = income - expense
+            prev_balance = None if prev_income is None else prev_income - prev_expense
+            last_balance = None if last_income is None else last_income - last_expense
+            months.append(MonthlyTrend(
+                year_month, income, expense, balance, cumulative,
+                _delta(income, prev_income), _delta(expense, prev_expense),
+                _delta(balance, prev_balance),
+                _delta(income, last_income), _delta(expense, last_expense),
+                _delta(balance, last_balance),
+                average,
+            ))
+
+        categories = []
+        current = None
+        for trans_type, category, _, total, average in category_rows:
+            if current is None or current[:2] != (trans_type, category):
+                current = (trans_type, category, [], [])
+                categories.append(current)
+            current[2].append(total)
+            current[3].append(average)
+
+        return TrendReport(start, end, window, months,
+                           [CategoryTrend(t, c, tuple(totals), tuple(averages))
+                            for t, c, totals, averages in categories])
@@ -3,74 +3,107 @@ Created on 2021. 8. 2.
 
 @author: pc356
 '''
-from random import randint
+from zlib import crc32
 
 import wx
 import wx.xrc
 
 
+# 막대 배치 (좌측상단x = BAR_LEFT + 순번 * BAR_STEP, 바닥 y = BAR_BOTTOM)
+BAR_LEFT = 80
+BAR_STEP = 85
+BAR_WIDTH = 30
+BAR_BOTTOM = 260
+LABEL_LEFT = 70
+
+
+def category_colour(key):
+    """계정과목마다 항상 같은 색 (실행할 때마다 달라지는 hash() 대신 crc32 사용)"""
+    code = crc32(key.encode('utf-8'))
+    # 너무 밝거나 어두운 색은 피해서 40~215 범위로
+    r, g, b = (40 + ((code >> shift) & 0xff) * 176 // 256 for shift in (0, 8, 16))
+    return wx.Colour(r, g, b)
+
+
 class Barchart(wx.Panel):
 
     def __init__( self, parent ):
         wx.Panel.__init__(self,parent)
-        
+
+        self.data = {}
+        self.total = 0
+        self.bars = []          # 미리 계산한 막대/레이블 배치
+        self._colours = {}      # 계정과목 -> wx.Colour
+        self._buffer = None     # 화면 밖에 그려 둔 비트맵 (데이터/크기가 바뀔 때만 다시 그림)
+
+        # 배경은 버퍼가 모두 덮으므로 지우지 않는다 (깜빡임 방지)
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+        self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_SIZE, self.OnSize)
+
     def SetData(self, data):
-        self.data = data
-        self.Bind(wx.EVT_PAINT,self.OnPaint)
-        # 중요 - 새로이 그린 내용으로 갱신 
-        self.Refresh() #중요 
-                
+        self.data = dict(data)
+
+        # '지출' 총액과 막대 배치는 데이터가 바뀔 때 한 번만 계산
+        self.total = sum(self.data.values())
+        self.bars = []
+        for x, (key, value) in enumerate(self.data.items()):
+            colour = self._colours.get(key)
+            if colour is None:
+                colour = self._colours[key] = category_colour(key)
+            percent = int(value / self.total * 100) if self.total else 0
+            self.bars.append((
+                wx.Brush(colour),
+                # (좌측상단x, 좌측상단y, 사각형의가로, 사각형의세로)
+                (BAR_LEFT + x * BAR_STEP, BAR_BOTTOM - value, BAR_WIDTH, value),
+                # (텍스트, 좌측상단x, 좌측상단y)
+                ((key, LABEL_LEFT + x * BAR_STEP, 270),
+                 (str(value) + "천원", LABEL_LEFT + x * BAR_STEP, 300),
+                 ("약 " + str(percent) + "%", LABEL_LEFT + x * BAR_STEP, 330)),
+            ))
+
+        # 중요 - 새로이 그린 내용으로 갱신
+        self._buffer = None
+        self.Refresh(False) #중요
+
+    def OnSize(self, e):
+        # 크기가 실제로 바뀌었을 때만 다시 그린다
+        size = self.GetClientSize()
+        if self._buffer is not None and self._buffer.GetSize() != size:
+            self._buffer = None
+            self.Refresh(False)
+        e.Skip()
+
     def OnPaint(self,e):
-        dc = wx.PaintDC(self)
-        brush = wx.Brush("white")
-        dc.SetBackground(brush)
+        # 그려 둔 비트맵을 그대로 화면에 복사 (expose 때는 다시 그리지 않음)
+        wx.BufferedPaintDC(self, self._get_buffer())
+
+    def _get_buffer(self):
+        if self._buffer is None:
+            width, height = self.GetClientSize()
+            self._buffer = wx.Bitmap(max(width, 1), max(height, 1))
+            dc = wx.MemoryDC(self._buffer)
+            self._draw(dc)
+            dc.SelectObject(wx.NullBitmap)
+        return self._buffer
+
+    def _draw(self, dc):
+        dc.SetBackground(wx.Brush("white"))
         dc.Clear()
-        
-        # '지출' 총액 구하기
-        total = 0
-        for key in self.data:
-            total += self.data[key]
-            
-        x = 0
-        percent = 0
-        #############################
-        for key in self.data:
-            # 그래프 색상 랜덤 변경을 위한 randint()사용
-            r = randint(1, 255)
-            g = randint(1, 255)
-            g = randint(1, 255)
-            # 반복 시 마다 r, g, b값이 명확히 달라지게 소수를 곱함
-            dc.SetBrush(wx.Brush(wx.Colour(r*3,g*5,g*7)))
-            
-            # '지출' 총액 표시
-            dc.DrawText("지출 총 금액: "+str(total)+"천원", 660, 20)
-            
-            # 그래프의 구분 표시
-            dc.DrawText("계정과목:", 10, 270)                            
-            dc.DrawText("지출금액:", 10, 300)
-            dc.DrawText("비  율:", 10, 330)              
-            
-            # (좌측상단x, 좌측상단y, 사각형의가로, 사각형의세로)
-            dc.DrawRectangle((80+(x*85)),260-self.data[key], 30, self.data[key])
-            
-            # 키(지출계정과목) 텍스트로 나타 냄 - (텍스트, 좌측상단x, 좌측상단y)    
-            dc.DrawText(key, (70+(x*85)), 270)             
-            
-            # 데이터의 값을 텍스트로 나타 냄 - (텍스트, 좌측상단x, 좌측상단y)
-            dc.DrawText(str(self.data[key])+"천원", (70+(x*85)), 300)        
-            
-            # '지출' 총액 대비 비율 표시
-            percent = int((self.data[key]/total)*100)
-            dc.DrawText("약 "+str(percent)+"%", (70+(x*85)), 330)               
-            
-            # 반복 시 마다 그래프 간격설정을 위한 변수
-            x += 1
-            
-            
-        #############################
-        # dc.DrawText(str(total),0, 0)
-                  
-        pass
-    
+
+        # '지출' 총액 표시
+        dc.DrawText("지출 총 금액: "+str(self.total)+"천원", 660, 20)
+
+        # 그래프의 구분 표시 (한 번만)
+        dc.DrawText("계정과목:", 10, 270)
+        dc.DrawText("지출금액:", 10, 300)
+        dc.DrawText("비  율:", 10, 330)
+
+        for brush, rect, labels in self.bars:
+            dc.SetBrush(brush)
+            dc.DrawRectangle(*rect)
+            for text, x, y in labels:
+                dc.DrawText(text, x, y)
+
     def __del__( self ):
-        pass  
\ No newline at end of file
+        pass
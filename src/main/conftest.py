@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""pytest 공통 fixture"""
+
+import pytest
+
+from main.HL_repository import DatabaseManager
+
+
+SAMPLE_ROWS = [
+    ('2024-01-05', '지출', '식비', 12000, '점심'),
+    ('2024-01-20', '지출', '교통비', 3000, '버스'),
+    ('2024-01-25', '수입', '급여', 2500000, '1월 급여'),
+    ('2024-02-03', '지출', '식비', 8000, '저녁, "배달"'),
+    ('2024-02-14', '지출', '쇼핑', 45000, ''),
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    """빈 임시 DB"""
+    manager = DatabaseManager(str(tmp_path / 'ledger.db'))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def sample_db(db):
+    """SAMPLE_ROWS 가 들어 있는 임시 DB"""
+    for row in SAMPLE_ROWS:
+        db.insert_transaction(*row)
+    return db
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""열 단위 분석 - 카테고리 비중, 일별 분위수, 이상 지출일, 백엔드 간 결과 일치"""
+
+import pytest
+
+from main import HL_analytics
+from main.HL_analytics import load_columns
+
+
+DAILY = [100, 110, 90, 105, 95, 100, 120, 80, 5000, 100]     # 3월 1일부터 하루 합계
+
+
+@pytest.fixture
+def analytics_db(db):
+    rows = []
+    for day, total in enumerate(DAILY, start=1):
+        rows.append((f'2024-03-{day:02d}', '지출', '식비', total - 30, ''))
+        rows.append((f'2024-03-{day:02d}', '지출', '교통비', 30, ''))
+    rows.append(('2024-03-05', '수입', '급여', 9999, ''))
+    rows.append(('2024-04-01', '지출', '쇼핑', 70, ''))
+    # 날짜순이 아니게 넣어도 읽을 때 정렬된다
+    for row in reversed(rows):
+        db.insert_transaction(*row)
+    return db
+
+
+def test_category_shares(analytics_db):
+    columns = load_columns(analytics_db, backend='python')
+    assert len(columns) == 22
+    food, transport = sum(DAILY) - 300, 300
+    grand = food + transport + 70
+    assert columns.category_shares() == [
+        ('식비', food, pytest.approx(food / grand * 100)),
+        ('교통비', transport, pytest.approx(transport / grand * 100)),
+        ('쇼핑', 70, pytest.approx(70 / grand * 100)),
+    ]
+    assert columns.category_shares(trans_type='수입') == [('급여', 9999, 100.0)]
+    assert columns.category_shares('2024-04-01') == [('쇼핑', 70, 100.0)]
+    assert columns.category_shares('2025-01-01') == []
+
+
+def test_daily_percentiles_and_range(analytics_db):
+    columns = load_columns(analytics_db, backend='python')
+    march = columns.daily_percentiles((0, 50, 100), '2024-03-01', '2024-04-01')
+    assert march == {0: 80, 50: 100, 100: 5000}
+    assert columns.daily_totals('2024-03-09', '2024-03-11') == [('2024-03-09', 5000),
+                                                                ('2024-03-10', 100)]
+    assert columns.daily_percentiles((50,), '2025-01-01') == {50: None}
+
+    loaded = load_columns(analytics_db, '2024-03-02', '2024-03-04', backend='python')
+    assert loaded.daily_totals() == [('2024-03-02', 110), ('2024-03-03', 90)]
+
+
+def test_outlier_days(analytics_db):
+    columns = load_columns(analytics_db, backend='python')
+    assert columns.outlier_days() == [('2024-03-09', 5000)]
+    assert columns.outlier_days('2024-03-01', '2024-03-03') == []      # 3일 미만
+    assert columns.outlier_days(trans_type='수입') == []
+
+
+def test_backend_errors(db, monkeypatch):
+    with pytest.raises(ValueError):
+        load_columns(db, backend='fortran')
+    monkeypatch.setattr(HL_analytics, 'np', None)
+    assert HL_analytics.default_backend() == 'python'
+    with pytest.raises(ValueError):
+        load_columns(db, backend='numpy')
+
+
+@pytest.mark.parametrize('start, end', [(None, None), ('2024-03-03', '2024-03-10'),
+                                        ('2024-03-09', None), ('2025-01-01', None)])
+def test_numpy_matches_python(analytics_db, start, end):
+    pytest.importorskip('numpy')
+    python = load_columns(analytics_db, backend='python')
+    numpy = load_columns(analytics_db, backend='numpy')
+    for trans_type in ('지출', '수입'):
+        for method in ('category_shares', 'daily_totals', 'daily_percentiles', 'outlier_days'):
+            expected = getattr(python, method)(start=start, end=end, trans_type=trans_type)
+            assert getattr(numpy, method)(start=start, end=end, trans_type=trans_type) == expected
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""월 예산 - budgets.csv 는 한 번만, 없는 카테고리는 거부, 예산 대비 지출"""
+
+import pytest
+
+from main.HL_budget import BudgetTracker, import_budgets_csv, read_budgets_csv
+
+
+def test_read_budgets_csv(tmp_path):
+    path = tmp_path / 'budgets.csv'
+    path.write_text('지출.식비,10000.0\n\n지출.교통비,"5,000"\n', encoding='utf-8')
+    assert read_budgets_csv(str(path)) == [('식비', 10000), ('교통비', 5000)]
+
+    path.write_text('지출.식비,100\n수입.급여,100\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='2번째 줄'):
+        read_budgets_csv(str(path))
+
+
+def test_load_imports_csv_into_empty_db(tmp_path, db):
+    path = tmp_path / 'budgets.csv'
+    path.write_text('지출.식비,10000\n지출.교통비,5000\n', encoding='utf-8')
+    tracker = BudgetTracker(db)
+    assert tracker.load(str(path)) == {'식비': 10000, '교통비': 5000}
+    assert db.get_budgets() == [('식비', 10000), ('교통비', 5000)]
+
+    tracker.set_budget('식비', 20000)
+    tracker.remove_budget('교통비')
+    assert BudgetTracker(db).load() == {'식비': 20000}
+
+
+@pytest.fixture
+def budgets_csv(tmp_path):
+    path = tmp_path / 'budgets.csv'
+    path.write_text('지출.식대,10000.0\n지출.통신,30000\n지출.교통비,5000\n', encoding='utf-8')
+    return str(path)
+
+
+def test_seed_maps_aliases_without_creating_categories(db, budgets_csv):
+    categories = db.get_categories('지출')
+    tracker = BudgetTracker(db)
+    assert tracker.load(budgets_csv) == {'식비': 10000, '통신비': 30000, '교통비': 5000}
+    assert db.get_categories('지출') == categories
+
+
+def test_alias_only_for_renamed_categories(tmp_path, db):
+    # 가전은 쇼핑의 옛 이름이 아니다 - 별칭 없이 없는 카테고리로 거부
+    path = tmp_path / 'budgets.csv'
+    path.write_text('지출.가전,20000\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='가전'):
+        import_budgets_csv(db, str(path))
+    assert db.get_budgets() == []
+
+
+def test_seed_only_once(db, budgets_csv):
+    tracker = BudgetTracker(db)
+    tracker.load(budgets_csv)
+    tracker.remove_budget('식비')
+    tracker.set_budget('교통비', 7000)
+
+    assert BudgetTracker(db).load(budgets_csv) == {'통신비': 30000, '교통비': 7000}
+
+
+def test_seed_skipped_when_budgets_exist(db, budgets_csv):
+    db.set_budgets([('주거', 500000)])
+    assert BudgetTracker(db).load(budgets_csv) == {'주거': 500000}
+
+
+def test_unknown_category_rejected(tmp_path, db):
+    path = tmp_path / 'budgets.csv'
+    path.write_text('지출.식비,100\n지출.가구,200\n', encoding='utf-8')
+    categories = db.get_categories('지출')
+
+    with pytest.raises(ValueError, match='가구'):
+        import_budgets_csv(db, str(path))
+    with pytest.raises(ValueError, match='가구'):
+        db.set_budgets([('식비', 100), ('가구', 200)])
+    assert db.get_budgets() == []
+    assert db.get_categories('지출') == categories
+
+    # 실패한 기본 CSV 는 기록하지 않으므로 고친 뒤 다시 가져온다
+    tracker = BudgetTracker(db)
+    with pytest.raises(ValueError):
+        tracker.load(str(path))
+    path.write_text('지출.식비,100\n', encoding='utf-8')
+    assert tracker.load(str(path)) == {'식비': 100}
+
+
+def test_status_and_record(sample_db):
+    tracker = BudgetTracker(sample_db)
+    tracker.set_budget('식비', 15000)
+    tracker.set_budget('쇼핑', 100000)
+    assert [(status.category, status.spent) for status in tracker.status('2024-01')] == [
+        ('식비', 12000), ('쇼핑', 0),
+    ]
+    assert tracker.overspent('2024-01') == []
+
+    status = tracker.record('2024-01-30', '지출', '식비', 5000)
+    assert status.spent == 12000 + 5000
+    assert status.over and status.remaining == -2000
+    assert tracker.overspent('2024-01') == [status]
+    assert tracker.record('2024-01-30', '수입', '급여', 100) is None
+    assert tracker.record('2024-01-30', '지출', '교통비', 100) is None
+
+    tracker.forget('2024-01')
+    assert tracker.status('2024-01')[0].spent == 12000
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""조회 결과 캐시 - 쓰기 후 무효화"""
+
+from main.HL_engine import QueryCache
+
+
+def warm(db, *months):
+    for year_month in months:
+        db.get_month_overview(year_month)
+    db.get_months()
+
+
+def misses_after(db, *months):
+    """months 를 다시 조회했을 때 새로 계산한 횟수"""
+    before = db.cache.misses
+    for year_month in months:
+        db.get_month_overview(year_month)
+    return db.cache.misses - before
+
+
+def test_repeated_reads_hit_cache(sample_db):
+    warm(sample_db, '2024-01', '2024-02')
+    hits = sample_db.cache.hits
+    assert misses_after(sample_db, '2024-01', '2024-02') == 0
+    assert sample_db.cache.hits == hits + 2
+
+
+def test_insert_invalidates_only_its_month(sample_db):
+    db = sample_db
+    warm(db, '2024-01', '2024-02')
+    db.insert_transaction('2024-02-20', '지출', '식비', 1000, '')
+
+    assert misses_after(db, '2024-01') == 0
+    assert misses_after(db, '2024-02') == 1
+    assert db.get_monthly_summary('2024-02') == (0, 54000)
+
+
+def test_update_invalidates_old_and_new_month(sample_db):
+    db = sample_db
+    trans_id = db.insert_transaction('2024-01-10', '지출', '문화', 9000, '')
+    warm(db, '2024-01', '2024-02')
+    db.update_transaction(trans_id, '2024-03-10', '지출', '문화', 9000, '')
+
+    assert misses_after(db, '2024-02') == 0
+    assert misses_after(db, '2024-01', '2024-03') == 2
+    assert db.get_monthly_summary('2024-01') == (2500000, 15000)
+    assert db.get_months() == ['2024-03', '2024-02', '2024-01']
+
+
+def test_delete_invalidates_month_list(sample_db):
+    db = sample_db
+    trans_id = db.insert_transaction('2024-05-01', '지출', '의료', 20000, '')
+    warm(db, '2024-05')
+    assert db.get_months()[0] == '2024-05'
+
+    db.delete_transaction(trans_id)
+    assert db.get_months() == ['2024-02', '2024-01']
+    assert db.get_month_overview('2024-05').expense == 0
+
+
+def test_invalidation_waits_for_outer_transaction(sample_db):
+    db = sample_db
+    seen = []
+    db.add_write_listener(seen.append)
+    with db.engine.transaction():
+        db.insert_transaction('2024-01-11', '지출', '식비', 100, '')
+        db.insert_transaction('2024-02-11', '지출', '식비', 100, '')
+        assert seen == []
+    assert sorted(month for months in seen for month in months) == ['2024-01', '2024-02']
+
+
+def test_rebuild_rollup_invalidates_everything(sample_db):
+    db = sample_db
+    warm(db, '2024-01', '2024-02')
+    db.rebuild_rollup()
+    assert misses_after(db, '2024-01', '2024-02') == 2
+
+
+def test_query_cache_tags_and_size_limit():
+    cache = QueryCache(max_bytes=10 ** 6)
+    cache.get_or_compute('a', lambda: 1, {'2024-01'})
+    cache.get_or_compute('b', lambda: 2, {'2024-02'})
+    cache.get_or_compute('all', lambda: 3)
+    cache.invalidate({'2024-01'})
+    assert cache.get_or_compute('b', lambda: 'stale') == 2
+    assert cache.get_or_compute('a', lambda: 'new') == 'new'
+    assert cache.get_or_compute('all', lambda: 'new') == 'new'
+
+    disabled = QueryCache(max_bytes=0)
+    disabled.get_or_compute('a', lambda: 1)
+    assert disabled.get_or_compute('a', lambda: 2) == 2
+    assert disabled.stats()['hits'] == 0
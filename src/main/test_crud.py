@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""HL_CRUD 호환 계층 - 예전 serialNo 유지"""
+
+import sqlite3
+
+import pytest
+
+from main import HL_CRUD
+
+
+LEGACY_ROWS = [
+    (5, '2024-01-02', '지출', '지출.식비', 0, 1000, 'a'),
+    (9, '2024-01-03', '수입', '수입.급여', 5000, 0, 'b'),
+    (20, '2024-01-04', '지출', '지출.교통비', 0, 300, 'c'),
+]
+
+
+@pytest.fixture
+def crud(tmp_path, monkeypatch):
+    """임시 DB 를 쓰는 HL_CRUD (legacy 가 있으면 예전 ledger DB 도 만든다)"""
+    def setup(legacy_rows=None):
+        legacy_path = tmp_path / 'household_Ledger.db'
+        if legacy_rows is not None:
+            conn = sqlite3.connect(legacy_path)
+            conn.execute('CREATE TABLE ledger (serialNo INTEGER PRIMARY KEY AUTOINCREMENT, '
+                         'date TEXT, section TEXT, title TEXT, revenue, expense, remark TEXT)')
+            conn.executemany('INSERT INTO ledger VALUES (?, ?, ?, ?, ?, ?, ?)', legacy_rows)
+            conn.commit()
+            conn.close()
+        monkeypatch.setattr(HL_CRUD, 'DB_PATH', str(tmp_path / 'ledger.db'))
+        monkeypatch.setattr(HL_CRUD, 'LEGACY_DB_PATH', str(legacy_path))
+        monkeypatch.setattr(HL_CRUD, '_db', None)
+        return HL_CRUD
+
+    yield setup
+    HL_CRUD.close()
+
+
+def test_serial_no_is_id_without_legacy_db(crud):
+    H = crud()
+    H.insertManyData([('2024-01-02', '지출', '지출.식비', '', '1,000', 'a'),
+                      ('2024-01-03', '수입', '수입.급여', 5000, 0, 'b')])
+    rows = H.selectAll()
+    assert [row[0] for row in rows] == [1, 2]
+
+    H.update(('2024-01-02', '지출', '지출.식비', 0, 2000, 'a2', 1))
+    H.delete(2)
+    assert H.selectAll() == [(1, '2024-01-02', '지출', '지출.식비', 0, 2000, 'a2')]
+
+
+def test_legacy_serial_no_round_trip(crud):
+    H = crud(LEGACY_ROWS)
+    assert H.selectAll() == LEGACY_ROWS
+
+    H.insertData('2024-02-01', '지출', '지출.식비', 0, 700, 'new')
+    new_serial = H.selectAll()[-1][0]
+    assert new_serial > max(row[0] for row in LEGACY_ROWS)
+
+    H.update(('2024-01-02', '지출', '지출.식비', 0, 1111, 'a2', 5))
+    H.delete(9)
+    H.delete(7)     # 없는 serialNo 는 무시
+    H.update(('2024-01-02', '지출', '지출.식비', 0, 1, 'x', 6))
+
+    assert H.selectAll() == [
+        (5, '2024-01-02', '지출', '지출.식비', 0, 1111, 'a2'),
+        (20, '2024-01-04', '지출', '지출.교통비', 0, 300, 'c'),
+        (new_serial, '2024-02-01', '지출', '지출.식비', 0, 700, 'new'),
+    ]
+    H.delete(new_serial)
+    assert [row[0] for row in H.selectAll()] == [5, 20]
+    assert H.verifyRollup() == []
+
+
+def test_mapped_rows_only_reachable_by_legacy_serial_no(crud):
+    H = crud(LEGACY_ROWS)
+    offset = max(row[0] for row in LEGACY_ROWS)
+
+    # 옮긴 거래(id 1..3)는 id + offset 으로 가리킬 수 없다
+    H.update(('2024-01-02', '지출', '지출.식비', 0, 1, 'x', offset + 1))
+    H.delete(offset + 2)
+    assert H.selectAll() == LEGACY_ROWS
+
+
+def test_session_rolls_back_together(crud):
+    H = crud()
+    with pytest.raises(ValueError):
+        with H.session() as s:
+            s.insertData('2024-01-02', '지출', '지출.식비', 0, 1000, 'a')
+            s.insertData('2024-01-03', '지출', '지출.식비', 0, -5, 'b')
+    assert H.selectAll() == []
+    assert H.selectMonthList() == []
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""즐겨찾기 - favorites.csv, 월 일괄 추가"""
+
+import pytest
+
+from main.HL_favorites import Favorite, FavoriteBook, read_favorites_csv
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / 'favorites.csv'
+    path.write_text('수입,수입.급여,0,\n지출,지출.주거,500000,월세\n지출,지출.통신비,"55,000",\n',
+                    encoding='utf-8')
+    book = FavoriteBook(str(path))
+    book.load()
+    return book
+
+
+def test_load_and_save(book):
+    assert list(book) == [Favorite('수입', '급여', 0, ''),
+                          Favorite('지출', '주거', 500000, '월세'),
+                          Favorite('지출', '통신비', 55000, '')]
+    assert [favorite.fixed for favorite in book] == [False, True, True]
+    assert book[1].label == '지출.주거 ₩500,000 (월세)'
+
+    book.add(Favorite('지출', '문화', 10000, 'OTT'))
+    book.add(Favorite('지출', '문화', 10000, 'OTT'))
+    book.remove(0)
+    assert read_favorites_csv(book.path) == book.favorites
+    assert len(book) == 3
+
+
+def test_missing_file_is_empty(tmp_path):
+    assert FavoriteBook(str(tmp_path / 'none.csv')).load() == []
+
+
+def test_apply_month(book, db):
+    assert book.monthly_rows('2024-03', 25) == [('2024-03-25', '지출', '주거', 500000, '월세'),
+                                                ('2024-03-25', '지출', '통신비', 55000, '')]
+
+    rows = book.apply_month(db, '2024-03')
+    assert [row[0] for row in rows] == ['2024-03-01', '2024-03-01']
+    assert db.get_monthly_summary('2024-03') == (0, 555000)
+    assert db.verify_rollup() == []
+
+
+def test_monthly_rows_clamp_day(book):
+    assert {row[0] for row in book.monthly_rows('2024-02', 31)} == {'2024-02-29'}
+    assert {row[0] for row in book.monthly_rows('2023-02', 31)} == {'2023-02-28'}
+    assert {row[0] for row in book.monthly_rows('2024-04', 31)} == {'2024-04-30'}
+
+
+def test_apply_month_twice_adds_once(book, db):
+    assert len(book.apply_month(db, '2024-02', 31)) == 2
+    assert book.apply_month(db, '2024-02', 31) == []
+    assert db.get_monthly_summary('2024-02') == (0, 555000)
+
+    # 같은 달이라도 다른 날짜면 따로 추가된다
+    assert len(book.apply_month(db, '2024-02', 1)) == 2
+    assert db.count_transactions() == 4
+    assert db.verify_rollup() == []
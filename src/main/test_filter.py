@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""조건 조회 - 조건 조합, keyset 페이지, 인덱스 선택, 조건 입력란"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from main.HL_main import SmartHouseholdApp
+from main.HL_repository import TransactionFilter
+
+
+ROWS = [
+    ('2024-03-01', '지출', '식비', 8000, '점심'),
+    ('2024-03-01', '지출', '식비', 12000, '저녁'),
+    ('2024-03-01', '지출', '교통비', 1500, '버스'),
+    ('2024-03-01', '수입', '급여', 3000000, '3월'),
+    ('2024-03-02', '지출', '의료', 30000, '병원'),
+    ('2024-03-02', '지출', '식비', 9000, ''),
+    ('2024-03-02', '지출', '식비', 9000, ''),
+    ('2024-03-15', '수입', '용돈', 50000, ''),
+    ('2024-04-01', '지출', '식비', 7000, ''),
+    ('2024-04-01', '지출', '쇼핑', 120000, '가전'),
+]
+
+
+@pytest.fixture
+def filter_db(db):
+    for row in ROWS:
+        db.insert_transaction(*row)
+    return db
+
+
+def newest_first(rows):
+    return sorted(rows, key=lambda row: (row[1], row[0]), reverse=True)
+
+
+def matching(db, predicate):
+    rows = db.engine.execute('SELECT * FROM transaction_rows')
+    return newest_first([tuple(row) for row in rows if predicate(row)])
+
+
+def all_pages(db, flt, limit):
+    rows, before = [], None
+    while True:
+        page = db.get_transactions_page(before, limit, flt)
+        rows.extend(tuple(row) for row in page)
+        if len(page) < limit:
+            return rows
+        before = (page[-1][1], page[-1][0])
+
+
+@pytest.mark.parametrize('flt, predicate', [
+    (TransactionFilter(types=['지출'], categories=['식비'], min_amount=8000, max_amount=9000),
+     lambda r: r[2] == '지출' and r[3] == '식비' and 8000 <= r[4] <= 9000),
+    (TransactionFilter(start='2024-03-01', end='2024-03-02', types=['수입']),
+     lambda r: r[1] == '2024-03-01' and r[2] == '수입'),
+    (TransactionFilter(start='2024-03-02', categories=['식비', '쇼핑']),
+     lambda r: r[1] >= '2024-03-02' and r[3] in ('식비', '쇼핑')),
+    (TransactionFilter(max_amount=1500), lambda r: r[4] <= 1500),
+    (TransactionFilter(categories=['없는 카테고리']), lambda r: False),
+])
+def test_combined_filters(filter_db, flt, predicate):
+    expected = matching(filter_db, predicate)
+    assert all_pages(filter_db, flt, 200) == expected
+    assert [tuple(row) for row in filter_db.iter_filtered(flt)] == expected[::-1]
+
+    totals = filter_db.filter_totals(flt)
+    assert totals.count == len(expected)
+    assert totals.income == sum(r[4] for r in expected if r[2] == '수입')
+    assert totals.expense == sum(r[4] for r in expected if r[2] == '지출')
+
+
+@pytest.mark.parametrize('flt', [None, TransactionFilter(types=['지출'])])
+def test_pages_across_date_ties(filter_db, flt):
+    expected = all_pages(filter_db, flt, 200)
+    assert len({row[1] for row in expected}) < len(expected)
+    for limit in (1, 2, 3):
+        assert all_pages(filter_db, flt, limit) == expected
+
+    # 위로 스크롤 - 마지막 행부터 거꾸로 되짚기
+    rows, after = [], (expected[-1][1], expected[-1][0])
+    while True:
+        page = filter_db.get_transactions_page_after(after, 2, flt)
+        if not page:
+            break
+        rows = [tuple(row) for row in page] + rows
+        after = (page[0][1], page[0][0])
+    assert rows == expected[:-1]
+
+
+def test_choose_index(filter_db):
+    db = filter_db
+    db.FILTER_PROBE_ROWS = 3
+
+    def chosen(**conditions):
+        flt = TransactionFilter(**conditions)
+        return db._choose_index(flt, db._filter_category_ids(flt))
+
+    assert chosen(start='2024-03-02') is None
+    # 드문 카테고리 -> 카테고리 인덱스, 흔한 카테고리 -> 날짜 인덱스
+    assert chosen(categories=['의료']) == 'idx_transactions_category_date'
+    assert chosen(categories=['식비']) == 'idx_transactions_date'
+    assert chosen(types=['수입'], start='2024-03-02') == 'idx_transactions_category_date'
+    # 좁은 금액 범위 -> 금액 인덱스, 둘 다 드물면 더 적은 쪽
+    assert chosen(min_amount=100000) == 'idx_transactions_amount'
+    assert chosen(categories=['식비', '의료'], min_amount=100000) == 'idx_transactions_amount'
+    assert chosen(categories=['의료'], max_amount=10000) == 'idx_transactions_category_date'
+
+    plan = db.explain_filter(TransactionFilter(categories=['의료']))
+    assert any('USING INDEX idx_transactions_category_date ' in step for step in plan)
+
+
+def fake_panel(start='', end='', low='', high='', types=(), categories=()):
+    var = lambda value: SimpleNamespace(get=lambda: value)
+    return SimpleNamespace(
+        filter_start_var=var(start), filter_end_var=var(end),
+        filter_min_var=var(low), filter_max_var=var(high),
+        filter_type_vars={name: var(name in types) for name in ('수입', '지출')},
+        selected_filter_categories=lambda: list(categories),
+    )
+
+
+def test_filter_panel_input():
+    flt = SmartHouseholdApp.read_filter(fake_panel('2024-03-01', '2024-03-31', '1,000', '',
+                                                   ['지출'], ['식비']))
+    assert flt == TransactionFilter(start='2024-03-01', end='2024-04-01', types=['지출'],
+                                    categories=['식비'], min_amount=1000)
+    assert not SmartHouseholdApp.read_filter(fake_panel())
+
+    for bad in (fake_panel(start='2024-3-x'), fake_panel(low='-5'),
+                fake_panel(start='2024-03-02', end='2024-03-01')):
+        with pytest.raises(ValueError):
+            SmartHouseholdApp.read_filter(bad)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""CSV 가져오기 - 일괄 반영, 이어하기"""
+
+import sqlite3
+
+import pytest
+
+from main.HL_import import get_checkpoint, import_csv, parse_amount, parse_date
+from main.HL_repository import DatabaseManager
+
+
+def rollup(db):
+    return db.engine.execute(
+        'SELECT year_month, type_id, category_id, total, count FROM monthly_rollup ORDER BY 1, 2, 3'
+    )
+
+
+def trigger_names(db):
+    return {row[0] for row in db.engine.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+
+def write_csv(path, lines):
+    path.write_text('date,type,category,amount,remark\n' + ''.join(line + '\n' for line in lines),
+                    encoding='utf-8')
+    return str(path)
+
+
+def test_parse_helpers():
+    assert parse_date('2024.5.3') == '2024-05-03'
+    assert parse_amount('₩12,000') == 12000
+    for bad in ('2024-02-30', '2024/13/01'):
+        with pytest.raises(ValueError):
+            parse_date(bad)
+    for bad in ('-1', '10.5', ''):
+        with pytest.raises(ValueError):
+            parse_amount(bad)
+
+
+def test_bulk_insert_matches_row_triggers(tmp_path, db):
+    rows = [(f'2024-{month:02d}-{day:02d}', '지출', category, month * 100 + day, f'메모 {day}')
+            for month in (1, 2, 3) for day in (1, 15, 28) for category in ('식비', '주거')]
+    db.insert_transaction('2023-12-31', '지출', '식비', 500, '이전')
+    assert db.bulk_insert_transactions(rows) == len(rows)
+
+    other = DatabaseManager(str(tmp_path / 'per_row.db'))
+    try:
+        other.insert_transaction('2023-12-31', '지출', '식비', 500, '이전')
+        other.insert_transactions(rows)
+        assert rollup(db) == rollup(other)
+    finally:
+        other.close()
+
+    assert db.verify_rollup() == []
+    assert len(db.search_transactions('메모')) == len(rows)
+    assert {'trg_rollup_insert', 'trg_fts_insert'} <= trigger_names(db)
+
+
+def test_bulk_insert_rolls_back_on_error(sample_db):
+    db = sample_db
+    before = rollup(db)
+    rows = [('2024-04-01', '지출', '식비', 100, ''), ('2024-04-02', '지출', '식비', -1, '')]
+    with pytest.raises(sqlite3.IntegrityError):
+        db.bulk_insert_transactions(rows)
+
+    assert rollup(db) == before
+    assert len(db.get_all_transactions()) == 5
+    assert {'trg_rollup_insert', 'trg_fts_insert'} <= trigger_names(db)
+
+
+@pytest.mark.parametrize('bulk', [True, False])
+def test_import_csv(tmp_path, db, bulk):
+    path = write_csv(tmp_path / 'in.csv', [
+        '2024-03-01,지출,지출.식비,"12,000",점심',
+        '2024-03-02,지출,교통비,1500,',
+        '2024-02-30,지출,식비,100,잘못된 날짜',
+        '2024-03-05,수입,급여,3000000,3월',
+    ])
+    result = import_csv(db, path, batch_size=2, bulk=bulk)
+
+    assert result.imported == 3
+    assert [line_no for line_no, _ in result.errors] == [4]
+    assert db.get_monthly_summary('2024-03') == (3000000, 13500)
+    assert db.verify_rollup() == []
+    assert get_checkpoint(db, result.source) == (5, True)
+
+    # 끝난 파일은 다시 가져오지 않는다
+    assert import_csv(db, path, bulk=bulk).imported == 0
+    assert db.count_transactions() == 3
+
+
+def test_import_resumes_after_checkpoint(tmp_path, db):
+    lines = [f'2024-04-{day:02d},지출,식비,{day * 100},' for day in range(1, 11)]
+    path = write_csv(tmp_path / 'in.csv', lines)
+    calls = []
+
+    def stop_after_first_batch(result):
+        calls.append(result.last_line)
+        if len(calls) == 1:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        import_csv(db, path, batch_size=4, progress=stop_after_first_batch)
+    assert get_checkpoint(db, str(tmp_path / 'in.csv')) == (4, False)
+    assert db.count_transactions() == 3
+
+    result = import_csv(db, path, batch_size=4)
+    assert result.skipped == 4
+    assert result.imported == 7
+    assert db.count_transactions() == 10
+    assert db.verify_rollup() == []
+
+
+def test_restart_resets_imported_count(tmp_path, db):
+    lines = [f'2024-04-{day:02d},지출,식비,{day * 100},' for day in range(1, 6)]
+    path = write_csv(tmp_path / 'in.csv', lines)
+    source = str(tmp_path / 'in.csv')
+
+    def imported():
+        return db.engine.execute('SELECT imported FROM import_checkpoints WHERE source = ?',
+                                 (source,))[0][0]
+
+    import_csv(db, path, batch_size=2)
+    assert imported() == 5
+
+    result = import_csv(db, path, batch_size=2, restart=True)
+    assert result.skipped == 0
+    assert result.imported == 5
+    assert imported() == 5
+    assert get_checkpoint(db, source) == (result.last_line, True)
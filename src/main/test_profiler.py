@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""쿼리 프로파일러 - 히스토그램, 커서 계측, 스냅샷"""
+
+import gc
+import json
+import time
+import sqlite3
+
+import pytest
+
+from main.HL_profiler import (BUCKETS_MS, Histogram, Profiler, connection_factory,
+                              normalize_sql, profiler_from_env)
+from main.HL_engine import QueryWorker
+from main.HL_repository import DatabaseManager
+
+
+def query_stats(profiler, sql):
+    """sql 의 (호출 수, 행 수)"""
+    stats = {q['sql']: (q['count'], q['rows']) for q in profiler.snapshot()['queries']}
+    return stats[sql]
+
+
+@pytest.fixture
+def profiled(tmp_path):
+    profiler = Profiler(slow_ms=1e9)
+    conn = sqlite3.connect(str(tmp_path / 'p.db'), factory=connection_factory(profiler))
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.executemany('INSERT INTO t VALUES (?)', [(i,) for i in range(10)])
+    conn.commit()
+    yield profiler, conn
+    conn.close()
+
+
+def test_histogram():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) == 0.0
+    for ms in (0.2, 0.3, 0.4, 7.0):
+        histogram.add(ms)
+    assert histogram.quantile(0.5) == 0.5           # 구간 상한
+    assert histogram.quantile(1.0) == 7.0           # 최댓값보다 크지 않게
+    histogram.add(BUCKETS_MS[-1] * 10)
+    assert histogram.quantile(1.0) == BUCKETS_MS[-1] * 10
+    summary = histogram.to_dict()
+    assert summary['count'] == 5
+    assert sum(summary['buckets'].values()) == 5
+
+
+def test_normalize_sql_and_env():
+    assert normalize_sql('SELECT  *\n   FROM t ') == 'SELECT * FROM t'
+    assert profiler_from_env({}) is None
+    assert profiler_from_env({'HL_PROFILE': 'off'}) is None
+    assert profiler_from_env({'HL_PROFILE': '1', 'HL_SLOW_QUERY_MS': '5'}).slow_ms == 5.0
+
+
+def test_cursor_counts_rows_until_exhausted(profiled):
+    profiler, conn = profiled
+    assert query_stats(profiler, 'INSERT INTO t VALUES (?)') == (1, 10)
+
+    assert len(conn.execute('SELECT x FROM t').fetchall()) == 10
+    cursor = conn.execute('SELECT x FROM t WHERE x < 4')
+    assert len(cursor.fetchmany(3)) == 3
+    assert len(cursor.fetchmany(3)) == 1
+    assert sum(1 for _ in conn.execute('SELECT x FROM t WHERE x >= 5')) == 5
+    assert conn.execute('SELECT COUNT(*) FROM t').fetchone() == (10,)
+
+    assert query_stats(profiler, 'SELECT x FROM t') == (1, 10)
+    assert query_stats(profiler, 'SELECT x FROM t WHERE x < 4') == (1, 4)
+    assert query_stats(profiler, 'SELECT x FROM t WHERE x >= 5') == (1, 5)
+    assert query_stats(profiler, 'SELECT COUNT(*) FROM t') == (1, 1)
+
+
+def test_abandoned_cursor_is_recorded(profiled):
+    profiler, conn = profiled
+    cursor = conn.execute('SELECT x FROM t ORDER BY x')
+    cursor.fetchone()
+    del cursor
+    gc.collect()
+    assert query_stats(profiler, 'SELECT x FROM t ORDER BY x') == (1, 1)
+
+
+def test_slow_queries_keep_plan(profiled):
+    profiler, conn = profiled
+    profiler.slow_ms = 0
+    conn.execute('SELECT x FROM t WHERE x = ?', (3,)).fetchall()
+    conn.execute('SELECT x FROM t WHERE x = ?', (4,)).fetchall()
+    slow = [entry for entry in profiler.snapshot()['slow_queries'] if 'x = ?' in entry['sql']]
+    assert len(slow) == 2
+    assert slow[0]['plan'] and slow[0]['plan'] == slow[1]['plan']
+    assert slow[1]['params'] == '(4,)'
+
+
+def test_callbacks_and_dump(tmp_path, profiled):
+    profiler, conn = profiled
+    double = profiler.wrap('double', lambda x: x * 2)
+    assert double(4) == 8
+    with profiler.timed('block'):
+        pass
+    profiler.add_source('extra', lambda: {'answer': 42})
+    profiler.add_source('broken', lambda: 1 / 0)
+
+    path = str(tmp_path / 'profile.json')
+    profiler.dump(path)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    assert sorted(c['name'] for c in data['callbacks']) == ['block', 'double']
+    assert data['extra'] == {'answer': 42}
+    assert 'error' in data['broken']
+    assert data['counters']['connections'] == 1 and data['counters']['commits'] == 1
+
+    profiler.reset()
+    assert profiler.snapshot()['queries'] == []
+
+
+def test_database_manager_profiling(tmp_path):
+    profiler = Profiler()
+    db = DatabaseManager(str(tmp_path / 'ledger.db'), profiler=profiler)
+    try:
+        db.insert_transaction('2024-01-05', '지출', '식비', 12000, '')
+        db.get_month_overview('2024-01')
+        db.get_month_overview('2024-01')
+        snapshot = profiler.snapshot()
+    finally:
+        db.close()
+
+    assert snapshot['cache']['hits'] == 1
+    assert any(q['sql'].startswith('INSERT INTO transactions') for q in snapshot['queries'])
+    assert snapshot['counters']['commits'] >= 1
+
+
+def test_query_worker_times_job_and_callback(db):
+    profiler = Profiler()
+    worker = QueryWorker(db.engine, profiler)
+    results = []
+    try:
+        worker.submit('summary', db.get_month_overview, '2024-01', callback=results.append)
+        deadline = time.monotonic() + 5
+        while worker.is_pending() and time.monotonic() < deadline:
+            worker.poll()
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+
+    assert len(results) == 1
+    callbacks = {c['name']: c['count'] for c in profiler.snapshot()['callbacks']}
+    assert callbacks == {'job.summary': 1, 'callback.summary': 1}
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""DatabaseManager - 마이그레이션, 예전 ledger 이전, 월별 집계, verify_rollup"""
+
+import sqlite3
+
+import pytest
+
+from main.HL_engine import get_schema_version
+from main.HL_repository import DatabaseManager
+
+
+def rollup(db):
+    return db.engine.execute('SELECT * FROM monthly_rollup ORDER BY 1, 2, 3')
+
+
+def last_id(db):
+    return db.engine.execute('SELECT MAX(id) FROM transactions')[0][0]
+
+
+def test_migrations_reach_latest_version(db):
+    with db.engine.connection() as conn:
+        assert get_schema_version(conn) == len(DatabaseManager.MIGRATIONS)
+
+
+def test_reopen_is_idempotent(sample_db):
+    sample_db.close()
+    reopened = DatabaseManager(sample_db.db_path)
+    try:
+        with reopened.engine.connection() as conn:
+            assert get_schema_version(conn) == len(DatabaseManager.MIGRATIONS)
+        assert len(reopened.get_all_transactions()) == 5
+        assert reopened.verify_rollup() == []
+    finally:
+        reopened.close()
+
+
+def test_rollup_follows_insert_update_delete(sample_db):
+    db = sample_db
+    assert db.verify_rollup() == []
+    assert db.get_monthly_summary('2024-01') == (2500000, 15000)
+
+    db.insert_transaction('2024-01-31', '지출', '식비', 1000, '간식')
+    trans_id = last_id(db)
+    db.update_transaction(trans_id, '2024-03-01', '지출', '문화', 7000, '영화')
+    assert db.verify_rollup() == []
+    assert db.get_monthly_summary('2024-01') == (2500000, 15000)
+    assert db.get_monthly_summary('2024-03') == (0, 7000)
+
+    db.delete_transaction(trans_id)
+    assert db.verify_rollup() == []
+    assert db.get_monthly_summary('2024-03') == (0, 0)
+    assert sum(row[-1] for row in rollup(db)) == 5
+
+
+def test_verify_rollup_reports_and_rebuild_fixes(sample_db):
+    db = sample_db
+    with db.engine.transaction() as conn:
+        conn.execute("UPDATE monthly_rollup SET total = total + 1 WHERE year_month = '2024-02'")
+        conn.execute("DELETE FROM monthly_rollup WHERE year_month = '2024-01'")
+
+    mismatches = db.verify_rollup()
+    assert {row[0] for row in mismatches} == {'2024-01', '2024-02'}
+    assert ('2024-01', '수입', '급여') in mismatches
+
+    db.rebuild_rollup()
+    assert db.verify_rollup() == []
+    assert db.get_monthly_summary('2024-02') == (0, 53000)
+
+
+def test_migrate_ledger_once(tmp_path):
+    legacy = tmp_path / 'household_Ledger.db'
+    conn = sqlite3.connect(legacy)
+    conn.execute('CREATE TABLE ledger (serialNo INTEGER PRIMARY KEY AUTOINCREMENT, '
+                 'date TEXT, section TEXT, title TEXT, revenue, expense, remark TEXT)')
+    conn.executemany('INSERT INTO ledger VALUES (?, ?, ?, ?, ?, ?, ?)', [
+        (5, '2024-01-02', '지출', '지출.식비', 0, 1000, 'a'),
+        (9, '2024-01-03', '수입', '수입_급여', '5000', '', 'b'),
+        (12, '2024-01-04', '지출', '지출.교통비', 0, 12.5, '소수'),
+        (20, '2024-01-05', '지출', '', None, 300, 'c'),
+    ])
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(str(tmp_path / 'ledger.db'), str(legacy))
+    try:
+        rows = db.engine.execute('SELECT date, type, category, amount, remark FROM transaction_rows ORDER BY id')
+        assert rows == [('2024-01-02', '지출', '식비', 1000, 'a'),
+                        ('2024-01-03', '수입', '급여', 5000, 'b'),
+                        ('2024-01-05', '지출', '기타', 300, 'c')]
+        serials = db.engine.execute('SELECT serial_no FROM ledger_id_map ORDER BY serial_no')
+        assert [row[0] for row in serials] == [5, 9, 20]
+        assert [row[-1] for row in db.verify_amounts()] == ['ledger serialNo=12']
+        assert db.verify_rollup() == []
+
+        # 두 번째 열 때는 다시 옮기지 않는다
+        assert db.migrate_ledger(str(legacy)) is None
+    finally:
+        db.close()
+
+
+def test_invalid_date_rejected(db):
+    for bad in ('2024-02-30', '2024-13-01', '20240101', ''):
+        with pytest.raises(ValueError):
+            db.insert_transaction(bad, '지출', '식비', 100, '')
+    trans_id = db.insert_transaction('2024-02-29', '지출', '식비', 100, '')
+    with pytest.raises(ValueError):
+        db.update_transaction(trans_id, '2023-02-29', '지출', '식비', 100, '')
+    with pytest.raises(ValueError):
+        db.insert_transactions([('2024-03-01', '지출', '식비', 1, ''), ('2024-03-32', '지출', '식비', 1, '')])
+    assert [row[1] for row in db.get_all_transactions()] == ['2024-02-29']
+
+
+def baseline_db(path, amounts):
+    """스키마 버전 관리 이전 (REAL 금액) DB"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            remark TEXT
+        )
+    ''')
+    conn.executemany('INSERT INTO transactions (date, type, category, amount, remark) VALUES (?, ?, ?, ?, ?)',
+                     [(f'2024-01-{day:02d}', '지출', '식비', amount, '')
+                      for day, amount in enumerate(amounts, start=1)])
+    conn.commit()
+    return conn
+
+
+def test_upgrade_keeps_autoincrement_after_deleted_row(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = baseline_db(path, [1000, 2000, 3000, 4000, 5000])
+    conn.execute('DELETE FROM transactions WHERE id = 5')
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert [row[0] for row in db.get_all_transactions()] == [4, 3, 2, 1]
+        assert db.insert_transaction('2024-02-01', '지출', '식비', 100, '') == 6
+    finally:
+        db.close()
+
+
+def test_upgrade_does_not_reuse_rejected_id(tmp_path):
+    path = str(tmp_path / 'old.db')
+    baseline_db(path, [1000, 2000, 12.5]).close()
+
+    db = DatabaseManager(path)
+    try:
+        assert [row[0] for row in db.verify_amounts()] == [3]
+        new_id = db.insert_transaction('2024-02-01', '지출', '식비', 100, '')
+        assert new_id == 4
+        assert db.verify_rollup() == []
+    finally:
+        db.close()
+
+
+def test_failed_migration_changes_nothing(tmp_path, monkeypatch):
+    path = str(tmp_path / 'old.db')
+    conn = baseline_db(path, [1000, 2000])
+    schema = conn.execute('SELECT type, name, sql FROM sqlite_master ORDER BY name').fetchall()
+    conn.close()
+
+    def broken(conn):
+        conn.execute('CREATE TABLE half_done (x)')
+        raise RuntimeError("마이그레이션 실패")
+
+    migrations = list(DatabaseManager.MIGRATIONS)
+    migrations[7] = broken
+    monkeypatch.setattr(DatabaseManager, 'MIGRATIONS', migrations)
+    with pytest.raises(RuntimeError):
+        DatabaseManager(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        assert get_schema_version(conn) == 0
+        assert conn.execute('SELECT type, name, sql FROM sqlite_master ORDER BY name').fetchall() == schema
+        assert conn.execute('SELECT id, amount FROM transactions').fetchall() == [(1, 1000.0), (2, 2000.0)]
+    finally:
+        conn.close()
+
+    monkeypatch.undo()
+    db = DatabaseManager(path)
+    try:
+        assert db.get_monthly_summary('2024-01') == (0, 3000)
+    finally:
+        db.close()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""월별 추이 - 전월/전년 대비, 누적 잔액, 이동평균, 빈 달"""
+
+import pytest
+
+from main.HL_trends import TrendAnalyzer, shift_month
+
+
+ROWS = [
+    ('2023-01-10', '수입', '급여', 1000, ''),
+    ('2023-01-11', '지출', '식비', 300, ''),
+    ('2023-03-05', '지출', '식비', 600, ''),
+    ('2023-03-06', '지출', '교통비', 100, ''),
+    ('2024-01-10', '수입', '급여', 2000, ''),
+    ('2024-01-20', '지출', '식비', 500, ''),
+    ('2024-03-31', '지출', '식비', 900, ''),
+]
+
+
+@pytest.fixture
+def trends(db):
+    for row in ROWS:
+        db.insert_transaction(*row)
+    return TrendAnalyzer(db, window=3)
+
+
+def columns(report, *names):
+    return [tuple(getattr(month, name) for name in names) for month in report.months]
+
+
+def test_shift_month():
+    assert shift_month('2024-01', -1) == '2023-12'
+    assert shift_month('2023-11', 14) == '2025-01'
+    assert shift_month('2024-03-15', 0) == '2024-03'
+
+
+def test_first_year(trends):
+    report = trends.report('2023-01', '2023-03')
+    assert columns(report, 'year_month', 'income', 'expense', 'balance', 'cumulative') == [
+        ('2023-01', 1000, 300, 700, 700),
+        ('2023-02', 0, 0, 0, 700),       # 기록 없는 달도 0 으로 채운다
+        ('2023-03', 0, 700, -700, 0),
+    ]
+    # 첫 기록 이전 달과는 비교하지 않는다
+    assert columns(report, 'income_mom', 'expense_mom', 'balance_mom') == [
+        (None, None, None), (-1000, -300, -700), (0, 700, -700),
+    ]
+    assert columns(report, 'income_yoy', 'expense_yoy', 'balance_yoy') == [(None, None, None)] * 3
+    assert [month.expense_average for month in report.months] == \
+        pytest.approx([100, 100, 1000 / 3])
+
+
+def test_second_year(trends):
+    report = trends.report('2024-01', '2024-03')
+    assert columns(report, 'year_month', 'balance', 'cumulative') == [
+        ('2024-01', 1500, 1500), ('2024-02', 0, 1500), ('2024-03', -900, 600),
+    ]
+    assert columns(report, 'income_mom', 'expense_mom') == [(2000, 500), (-2000, -500), (0, 900)]
+    assert columns(report, 'income_yoy', 'expense_yoy', 'balance_yoy') == [
+        (1000, 200, 800), (0, 0, 0), (0, 200, -200),
+    ]
+    assert [month.expense_average for month in report.months] == \
+        pytest.approx([500 / 3, 500 / 3, 1400 / 3])
+
+
+def test_category_moving_averages(trends):
+    report = trends.report('2024-01', '2024-03')
+    by_name = {trend.category: trend for trend in report.categories}
+    # 범위 안에 기록이 없는 교통비는 빠진다
+    assert sorted(by_name) == ['급여', '식비']
+    assert by_name['급여'].type == '수입'
+    assert by_name['식비'].totals == (500, 0, 900)
+    assert by_name['식비'].averages == pytest.approx((500 / 3, 500 / 3, 1400 / 3))
+    assert by_name['급여'].averages == pytest.approx((2000 / 3,) * 3)
+
+    assert trends.report('2024-01', '2024-03', window=1).categories[1].averages == (500, 0, 900)
+
+
+def test_cache_follows_data_version(trends):
+    first = trends.report('2024-01', '2024-03')
+    assert trends.report('2024-01', '2024-03') is first
+
+    trends.db.insert_transaction('2024-02-01', '지출', '식비', 100, '')
+    second = trends.report('2024-01', '2024-03')
+    assert second is not first
+    assert [month.expense for month in second.months] == [500, 100, 900]
+
+    trends.clear()
+    assert trends.report('2024-01', '2024-03') is not second
+
+
+def test_empty_db(db):
+    report = TrendAnalyzer(db).report('2024-01', '2024-02')
+    assert columns(report, 'income', 'expense', 'cumulative', 'expense_mom') == [(0, 0, 0, None),
+                                                                                 (0, 0, 0, 0)]
+    assert report.categories == []
+
+
+@pytest.mark.parametrize('args', [('2024-13', '2024-12'), ('2024-03', '2024-01'),
+                                  ('2024-01', '2024-02', -1)])
+def test_invalid_arguments(trends, args):
+    with pytest.raises(ValueError):
+        trends.report(*args)